@@ -0,0 +1,84 @@
+"""
+Benchmark of the ordinal encoding/decoding of the chromosomes of GA (see Chromosome): the original list-based codec
+against the Fenwick tree encoding (scalar and batched) and the decoding used by the GA, on random tours.
+
+    python benchmarks/codec.py --sizes 50 200 1000 --population 2000
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from chromosome import Chromosome  # noqa: E402
+
+
+def list_encode(tour):
+    """
+    Original encoding: look up and remove each node from a canonical list, O(N^2).
+    """
+    canonical_tour = list(range(len(tour)))
+    res = []
+    for val in tour:
+        idx = canonical_tour.index(val)
+        res.append(idx)
+        canonical_tour.pop(idx)
+
+    return res
+
+
+def list_decode(ordinal):
+    """
+    Original decoding: take out each node from a canonical list, O(N^2).
+    """
+    canonical_tour = list(range(len(ordinal)))
+
+    return [canonical_tour.pop(idx) for idx in ordinal]
+
+
+def measure(function, *args):
+    """
+    :returns: tuple (result, seconds taken)
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def run(sizes, population, seed=None):
+    """
+    Encode and decode a population of random tours of each size with every codec, checking that all of them agree.
+    """
+    generator = np.random.default_rng(seed)
+    print(f'{"N":>6} {"P":>7} | {"encode: list":>12} {"fenwick":>8} {"batched":>8} | {"decode: list":>12} '
+          f'{"batched":>8}')
+
+    for size in sizes:
+        tours = np.argsort(generator.random((population, size)), axis=1).astype(np.int32)
+        rows = tours.tolist()
+
+        list_ordinals, list_encode_time = measure(lambda: [list_encode(tour) for tour in rows])
+        fenwick_ordinals, fenwick_time = measure(lambda: [Chromosome.encode_tour(tour) for tour in rows])
+        batched_ordinals, batched_encode_time = measure(Chromosome.encode_tours, tours)
+
+        list_tours, list_decode_time = measure(lambda: [list_decode(ordinal) for ordinal in list_ordinals])
+        batched_tours, batched_decode_time = measure(Chromosome.decode_ordinals, batched_ordinals)
+
+        assert fenwick_ordinals == list_ordinals and batched_ordinals.tolist() == list_ordinals, \
+            f'The encodings differ for N={size}'
+        assert list_tours == rows and batched_tours.tolist() == rows, f'The decodings differ for N={size}'
+
+        print(f'{size:>6} {population:>7} | {list_encode_time:>12.4f} {fenwick_time:>8.4f} {batched_encode_time:>8.4f} | '
+              f'{list_decode_time:>12.4f} {batched_decode_time:>8.4f}')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the ordinal encoding/decoding of the chromosomes')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 200, 1000], help='Numbers of nodes')
+    parser.add_argument('--population', type=int, default=2000, help='Number of tours of each size')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    run(args.sizes, args.population, args.seed)
@@ -0,0 +1,82 @@
+"""
+Benchmark of the construction of the distance matrix (see Matrix.generate_matrix()): the original Python double loop
+against the NumPy broadcast build in one go and the tiled build, on random coordinates. The peak of memory allocated by
+each build is traced with tracemalloc.
+
+    python benchmarks/matrix.py --sizes 50 500 2000 5000
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from utils.matrix import matrix  # noqa: E402
+
+
+def loop_matrix(coord_list):
+    """
+    Original build: one call to get_dist_two_nodes() per pair of nodes.
+    """
+    num_of_cities = len(coord_list)
+    distances = np.zeros(shape=(num_of_cities, num_of_cities))
+    for i, j in itertools.product(range(num_of_cities), range(num_of_cities)):
+        if i == j:
+            continue
+        distances[i][j] = matrix.Matrix.get_dist_two_nodes(coord_list, i, j)
+
+    return distances
+
+
+def measure(function, *args):
+    """
+    :returns: tuple (result, seconds taken, peak of memory allocated in MB)
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+
+    return result, elapsed, peak
+
+
+def run(sizes, block_size, loop_max, seed=None):
+    """
+    Build the distance matrix of random coordinates of each size with every method, checking that all of them agree.
+    """
+    generator = np.random.default_rng(seed)
+    print(f'{"N":>6} | {"loop (s)":>9} | {"broadcast (s)":>13} {"peak (MB)":>9} | {"tiled (s)":>9} {"peak (MB)":>9} | '
+          f'{"max diff":>8}')
+
+    for size in sizes:
+        search_space = matrix.Matrix(coord_list=generator.uniform(0, 1000, size=(size, 2)).tolist(), distance='oracle')
+
+        broadcast, broadcast_time, broadcast_peak = measure(search_space.generate_matrix, size)
+        tiled, tiled_time, tiled_peak = measure(search_space.generate_matrix, block_size)
+        assert np.array_equal(broadcast, tiled), f'The tiled build differs for N={size}'
+
+        loop_time, max_diff = '-', '-'
+        if size <= loop_max:
+            loop, elapsed, _ = measure(loop_matrix, search_space.coord_list)
+            loop_time, max_diff = f'{elapsed:.4f}', f'{np.abs(loop - broadcast).max():.1e}'
+            assert np.allclose(loop, broadcast, rtol=1e-12, atol=1e-9), f'The broadcast build differs for N={size}'
+
+        print(f'{size:>6} | {loop_time:>9} | {broadcast_time:>13.4f} {broadcast_peak:>9.1f} | {tiled_time:>9.4f} '
+              f'{tiled_peak:>9.1f} | {max_diff:>8}')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the construction of the distance matrix')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 500, 2000, 5000], help='Numbers of nodes')
+    parser.add_argument('--block_size', type=int, default=matrix.BLOCK_SIZE, help='Rows of each tile of the tiled build')
+    parser.add_argument('--loop_max', type=int, default=2000, help='Largest size built with the original loop (slow)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    run(args.sizes, args.block_size, args.loop_max, args.seed)
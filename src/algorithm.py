@@ -1,104 +1,260 @@
 from abc import ABCMeta, abstractmethod
-import random
-import matplotlib.pyplot as plt
+from dataclasses import dataclass, field
+import threading
+import time
+import numpy as np
 
+from utils.budget import budget
+from utils.construction import construction
+from utils.local_search import local_search
 from utils.matrix import matrix
+from utils.metrics import metrics
 from utils.n_ops import n_ops
+from utils.rng import rng
+
+
+@dataclass
+class Result:
+    """
+    Result of solving the TSP with one of the algorithms.
+    """
+    algorithm: str
+    tour: list
+    cost: float
+    cycles: int
+    wall_time: float
+    convergence: list = field(default_factory=list)  # history of the costs of the solutions accepted
+    metrics: dict = field(default_factory=dict)  # counters and stage timers of the run (see utils.metrics)
+    stop_reason: str = budget.CONVERGED  # why the run stopped: converged, time_limit, max_evaluations or cancelled
 
 
 class Algorithm:
     """
     Abstract class to be inherited by TS, SA and GA. It contains basic members related to TSP.
+
+    The search space (file) is either the name of a csv file in the data folder or a Matrix object, which allows to
+    solve search spaces given in memory (see from_coordinates() and from_distance_matrix()).
+
+    All the random numbers of the algorithm and its operators are drawn from its own random stream (see utils.rng),
+    seeded with the given seed, so that a run is reproducible and independent of any other run in the same process.
+
+    The initial solution is either a random permutation of the nodes or the tour built by one of the construction
+    heuristics (init), see utils.construction.
+
+    Besides its own stopping criterion, a run can be given a budget: a wall-clock time limit and/or a maximum number of
+    evaluations (see utils.budget). It can also be cancelled, and its best solution so far read at any moment from
+    another thread (see snapshot()), so that it can be used as an anytime algorithm.
     """
     __metaclass__ = ABCMeta
 
-    def __init__(self, file, stop, n_op):
-        self.matrix = matrix.Matrix(file)
-        self.x_coord, self.y_coord = zip(*self.matrix.coord_list)
+    def __init__(self, file, stop, n_op, init='random', seed=None):
+        # Start of the first run (see solve()), so that the setup of the algorithm is part of its budget
+        self.setup_start = time.perf_counter()
+
+        self.matrix = file if isinstance(file, matrix.Matrix) else matrix.Matrix(file)
 
-        self.x_min, self.x_max = min(self.x_coord), max(self.x_coord)
-        self.y_min, self.y_max = min(self.y_coord), max(self.y_coord)
+        self.random_stream = rng.RandomStream(seed)
+        self.generator = self.random_stream.generator
 
-        self.nodes = len(self.matrix.matrix[0])
+        self.nodes = len(self.matrix.matrix)
         self.stop = stop
-        self.n_op = n_ops.get_operator_by_name(n_op)
+        self.n_op = n_ops.get_operator_by_name(n_op, self.random_stream)
+        self.construct = construction.get_construction_by_name(init)
+
+        if isinstance(self.n_op, n_ops.NeighbourOperator):
+            self.n_op.neighbours = self.matrix.get_neighbours()
 
         self.cycles = 0
+        self.metrics = metrics.Metrics()
+        self.observers = []
+        self.local_search = None
+
+        self.cancelled = threading.Event()
+        self.budget = budget.Budget(cancelled=self.cancelled)
+
+        # Best solution found so far by the current run (see snapshot()), guarded by a lock
+        self.lock = threading.Lock()
+        self.best_tour = None
+        self.best_cost = None
+
+    @classmethod
+    def from_coordinates(cls, coord_list, **kwargs):
+        """
+        Create the algorithm to solve the search space given by the list of coordinates of each city. The rest of the
+        constructor arguments are given as keyword arguments.
+        """
+        return cls(file=matrix.Matrix(coord_list=coord_list), **kwargs)
+
+    @classmethod
+    def from_distance_matrix(cls, distances, coord_list=None, **kwargs):
+        """
+        Create the algorithm to solve the search space given by a precomputed matrix of distances. The rest of the
+        constructor arguments are given as keyword arguments.
+        """
+        return cls(file=matrix.Matrix(coord_list=coord_list, matrix=distances), **kwargs)
 
     @abstractmethod
-    def run(self):
+    def search(self):
         """
-        Run the algorithm until the stopping criterion is met.
+        Search the best solution until the stopping criterion is met.
+
+        :returns: tuple (best tour, its cost, history of the costs of the solutions accepted)
         """
         return
 
-    def generate_init_candidate(self, random_init=True):
+    def solve(self, polish=False, time_limit=None, max_evaluations=None):
         """
-        Generate an initial solution given the search space.
+        Solve the TSP without any side effect other than notifying the attached observers, if any.
+
+        The search stops at the stopping criterion of the algorithm, or earlier once the time limit (seconds) or the
+        maximum number of evaluations is reached, or the run is cancelled (see cancel()). The tour is not polished if
+        the run has been cancelled or its time limit or maximum number of evaluations has run out, even if the search
+        ended by its own criterion, as the polish is not bounded by the budget.
+
+        The first run is timed from the construction of the algorithm and keeps the metrics counted by it, so that its
+        setup (e.g. the initial population of the GA and its evaluations, or the candidate lists) is part of its budget
+        and of its wall time. The next runs start from scratch.
+
+        :param polish: improve the final tour with the local search engine (2-opt and Or-opt) until none of the moves it
+        evaluates improves it, an approximate local optimum (see utils.local_search)
+        :returns: Result of the search
         """
-        init_solution = []
-        if random_init:
-            init_solution = random.sample(range(self.nodes), self.nodes)
-        else:
-            # TODO: greedy start
-            pass
+        self.cycles = 0
+        if self.setup_start is None:
+            self.metrics.reset()
+        with self.lock:
+            self.best_tour, self.best_cost = None, None
+        self.budget = budget.Budget(time_limit, max_evaluations, self.cancelled, self.setup_start)
+        self.setup_start = None
+        start = self.budget.start
 
-        assert len(set(init_solution)) == self.nodes, \
-            f'The randomly generated initial solution does not contain all the {self.nodes} items'
-        return init_solution
+        tour, cost, convergence = self.search()
 
-    def evaluate_solution(self, tour):
+        # The search may end by its own criterion just as its budget runs out (e.g. SA with the budget cooling schedule,
+        # whose temperature reaches Tmin when the budget is exhausted): it has then been stopped by the budget
+        if self.budget.reason is None:
+            self.should_stop()
+
+        # The best solution notified may be better than the one returned by the search (SA returns its current one)
+        with self.lock:
+            if self.best_cost is not None and self.best_cost < cost:
+                tour, cost = self.best_tour, self.best_cost
+
+        if polish and self.budget.reason is None:
+            with self.metrics.timer('polish'):
+                tour, polished_cost = self.polish_tour(tour, cost)
+            if polished_cost < cost:
+                cost = polished_cost
+                convergence = list(convergence) + [cost]
+
+        wall_time = time.perf_counter() - start
+        result = Result(algorithm=self.__doc__, tour=list(tour), cost=float(cost), cycles=self.cycles,
+                        wall_time=wall_time, convergence=[float(i) for i in convergence],
+                        metrics=self.metrics.to_dict(wall_time), stop_reason=self.budget.reason or budget.CONVERGED)
+        self.notify_finish(result.tour, result.cost, result.convergence)
+
+        return result
+
+    def run(self, polish=False, time_limit=None, max_evaluations=None):
         """
-        Calculate the cost of the given solution based on the matrix of distances
+        Run the algorithm until the stopping criterion is met (or the budget given is exhausted), reporting its progress
+        in the console.
+        """
+        limits = ''.join([f', or after {time_limit} seconds' if time_limit else '',
+                          f', or after {max_evaluations} evaluations' if max_evaluations else ''])
+        print(f'\nRunning {self.__doc__}. Stopping if no improvement after {self.stop} iterations{limits} \n')
+
+        result = self.solve(polish, time_limit, max_evaluations)
+
+        stopped = '' if result.stop_reason == budget.CONVERGED else f' (stopped: {result.stop_reason})'
+        print(f'Cost: {round(result.cost)} after {result.cycles} iterations in {result.wall_time:.2f} seconds{stopped}')
+        return result
+
+    def should_stop(self, evaluations=None, now=None):
+        """
+        Check whether the budget of the run is exhausted (or the run has been cancelled), given the number of
+        evaluations done so far (by default, the evaluations counted in the metrics).
+        """
+        if evaluations is None:
+            evaluations = self.metrics.counters['evaluations']
+
+        return self.budget.exhausted(evaluations, now)
+
+    def cancel(self):
+        """
+        Stop the run as soon as possible with the best solution found so far. It can be called from any thread (e.g. a
+        signal handler or another task), but it only takes effect at the next iteration of the algorithm.
+        """
+        self.cancelled.set()
+
+    def snapshot(self):
+        """
+        Get the best solution found so far by the current run. It can be read at any moment from any thread.
+
+        :returns: Result of the search so far (stop_reason is None while it runs), or None if there is no solution yet
         """
-        cost = sum(self.matrix.matrix[tour[i]][tour[i + 1]] for i in range(len(tour) - 1))
+        with self.lock:
+            if self.best_tour is None:
+                return None
+            tour, cost = self.best_tour, self.best_cost
 
-        cost += self.matrix.matrix[tour[-1]][tour[0]]
-        return cost
+        return Result(algorithm=self.__doc__, tour=tour, cost=float(cost), cycles=self.cycles,
+                      wall_time=self.budget.get_elapsed_time(), stop_reason=None)
 
-    def plot_path(self, tour, title='', subtitle=''):
+    def generate_init_candidate(self):
         """
-        Plot the given path of nodes to visualise the result.
+        Generate an initial solution given the search space, with the construction heuristic selected (a random
+        permutation of the nodes by default).
         """
-        plt.xlim(self.x_min - self.x_max * 0.1, self.x_max + self.x_max * 0.1)
-        plt.ylim(self.y_min - self.y_max * 0.1, self.y_max + self.y_max * 0.1)
+        with self.metrics.timer('init'):
+            init_solution = self.construct(self.matrix, self.random_stream)
 
-        plt.scatter(self.x_coord, self.y_coord, color='black')
+        assert len(set(init_solution)) == self.nodes, \
+            f'The initial solution does not contain all the {self.nodes} items'
+        return init_solution
+
+    def polish_tour(self, tour, cost=None):
+        """
+        Apply the local search engine (see utils.local_search) to the given tour, which is not modified.
 
-        path_x = [self.x_coord[val] for val in tour]
-        path_y = [self.y_coord[val] for val in tour]
+        :returns: tuple (approximately locally optimal tour, its cost)
+        """
+        if self.local_search is None:
+            self.local_search = local_search.LocalSearch(self.matrix.matrix, self.matrix.get_neighbours())
 
-        # adding the last city to come back to the starting point
-        path_x.append(path_x[0])
-        path_y.append(path_y[0])
+        return self.local_search.optimise(tour, cost)
 
-        plt.suptitle(title, fontsize=16)
-        plt.title(subtitle, fontsize=14)
+    def evaluate_solution(self, tour):
+        """
+        Calculate the cost of the given solution based on the matrix of distances
+        """
+        self.metrics.count('evaluations')
 
-        plt.plot(path_x, path_y, color='green')
+        tour = np.asarray(tour)
+        return float(self.matrix.matrix[tour, np.roll(tour, -1)].sum())
 
-    def plot_search_space(self, title='', subtitle=''):
+    def attach(self, observer):
         """
-        Plot search space of all the cities without the tours.
+        Attach an observer (see utils.observer) to be notified of the progress of the algorithm.
         """
-        plt.rcParams["figure.figsize"] = (10, 8)
-        plt.tight_layout()
-        plt.xlim(self.x_min - self.x_max * 0.1, self.x_max + self.x_max * 0.1)
-        plt.ylim(self.y_min - self.y_max * 0.1, self.y_max + self.y_max * 0.1)
+        self.observers.append(observer)
 
-        plt.suptitle(title, fontsize=16)
-        plt.title(subtitle, fontsize=14)
+    def notify(self, tour, cost):
+        """
+        Notify the observers of the best solution found so far. Each observer decides, based on its own rate limit,
+        whether it is updated or not. A copy of the solution is kept for snapshot() if it is the best one of the run.
+        """
+        if self.best_cost is None or cost < self.best_cost:
+            tour = list(tour)
+            with self.lock:
+                self.best_tour, self.best_cost = tour, cost
 
-        plt.scatter(self.x_coord, self.y_coord, color='black')
-        plt.show()
+        for observer in self.observers:
+            observer.notify(self, tour, cost)
 
-    @staticmethod
-    def plot_convergence(costs_list, title, x_label='', y_label=''):
+    def notify_finish(self, tour, cost, costs_list):
         """
-        Plot learning process (decrease of travelling cost) of algorithm over time.
+        Notify the observers of the final solution and the history of costs once the stopping criterion is met.
         """
-        plt.suptitle(title, fontsize=16)
-        plt.xlabel(x_label, fontsize=12)
-        plt.ylabel(y_label, fontsize=12)
-        plt.plot(costs_list)
-        plt.show()
+        for observer in self.observers:
+            observer.finish(self, tour, cost, costs_list)
@@ -0,0 +1,292 @@
+import argparse
+import json
+import time
+import numpy as np
+
+from algorithm import Result
+from utils.construction import construction
+from utils.local_search.local_search import EPSILON
+from utils.matrix import matrix
+from utils.neighbourhood import neighbourhood
+from utils.rng import rng
+
+# Maximum number of elements of the distance matrices of a batch (B x N x N), which bounds its memory
+MAX_BATCH_ELEMENTS = 1 << 24
+
+METHODS = ('sa', 'two_opt')
+
+
+class BatchSolver:
+    """
+    Solve many small search spaces (instances) at once: instead of running an algorithm per instance, the instances of
+    the same size are stacked into 3-D arrays (instances x tour positions, and instances x N x N for the distances), and
+    every step of the search advances all of them in lockstep with a few NumPy operations. For small instances, where
+    the overhead of Python per move dominates, this gives a much higher throughput than looping over the algorithms.
+
+    Methods:
+    - 'sa': Simulated Annealing, each step proposing a random inversion (2-opt move) to every instance, accepted
+      according to its acceptance probability at the temperature of the step (geometric cooling from t_max to t_min).
+      An instance stops accepting moves once none has been accepted for stop steps. The best tour of each instance is
+      kept, and optionally improved by the 2-opt method (polish).
+    - 'two_opt': steepest descent over the inversions (2-opt moves), the best inversion of every instance being applied
+      at each step, until no instance can be improved.
+
+    The instances are given as lists of coordinates or as Matrix objects (dense distances), and can be of different
+    sizes: each size is solved as a separate batch, split into smaller ones if their distances do not fit in
+    max_elements.
+
+    The same instances with the same seed give the same results. However, a single generator draws the random numbers
+    of the whole batch at each step (initial tours, moves and acceptances), so the draws of an instance, and so its
+    result, depend on the other instances solved alongside it and on how the batches are split: solving an instance on
+    its own gives a different result than solving it in a batch. With no random draws (the 'two_opt' method with a
+    deterministic initial tour, e.g. 'greedy'), the result of each instance is the same either way.
+    """
+    def __init__(self, instances, method='sa', t_max=10, t_min=0.0005, alpha=0.995, stop=100, polish=False,
+                 init='random', seed=None, max_elements=MAX_BATCH_ELEMENTS):
+        assert method in METHODS, f'Unknown method: {method}. To choose from: {", ".join(METHODS)}'
+
+        self.instances = [i if isinstance(i, matrix.Matrix) else np.asarray(i, dtype=float) for i in instances]
+        self.method = method
+        self.t_max = t_max
+        self.t_min = t_min
+        self.alpha = alpha
+        self.stop = stop
+        self.polish = polish
+        self.init = init
+        self.construct = construction.get_construction_by_name(init)
+        self.max_elements = max_elements
+
+        self.random_stream = rng.RandomStream(seed)
+        self.generator = self.random_stream.generator
+
+    def solve(self):
+        """
+        Solve all the instances.
+
+        :returns: list of Result, in the order of the instances. The wall time of each result is the time of its batch
+        divided by the number of instances in it (amortised time per instance).
+        """
+        results = [None] * len(self.instances)
+
+        for indexes in self.get_batches():
+            start = time.perf_counter()
+
+            matrices = self.get_matrices(indexes)
+            tours = self.get_init_tours(indexes, matrices)
+
+            if self.method == 'sa':
+                tours, costs, cycles, evaluations, accepted = self.anneal(tours, matrices)
+                if self.polish:
+                    tours, costs, two_opt_cycles, two_opt_evaluations, improved = self.two_opt(tours, matrices)
+                    cycles, evaluations, accepted = cycles + two_opt_cycles, evaluations + two_opt_evaluations, \
+                        accepted + improved
+            else:
+                tours, costs, cycles, evaluations, accepted = self.two_opt(tours, matrices)
+
+            wall_time = (time.perf_counter() - start) / len(indexes)
+            for k, i in enumerate(indexes):
+                results[i] = Result(algorithm=f'Batch {self.method}', tour=tours[k].tolist(), cost=float(costs[k]),
+                                    cycles=cycles, wall_time=wall_time,
+                                    metrics={'counters': {'evaluations': int(evaluations[k]),
+                                                          'accepted': int(accepted[k])}})
+
+        return results
+
+    def get_batches(self):
+        """
+        Group the instances by size, in batches whose distance matrices do not exceed the maximum number of elements.
+
+        :returns: list of lists of indexes of instances
+        """
+        sizes = {}
+        for i, instance in enumerate(self.instances):
+            sizes.setdefault(len(instance.matrix) if isinstance(instance, matrix.Matrix) else len(instance), []).append(i)
+
+        batches = []
+        for size, indexes in sizes.items():
+            batch_size = max(self.max_elements // (size * size), 1)
+            batches.extend(indexes[i:i + batch_size] for i in range(0, len(indexes), batch_size))
+
+        return batches
+
+    def get_matrices(self, indexes):
+        """
+        Get the stack of the distance matrices of the given instances (of the same size), the ones given as coordinates
+        being computed at once.
+
+        :returns: array of shape B x N x N
+        """
+        instances = [self.instances[i] for i in indexes]
+        size = len(instances[0].matrix) if isinstance(instances[0], matrix.Matrix) else len(instances[0])
+        matrices = np.empty((len(instances), size, size))
+
+        coord = [k for k, instance in enumerate(instances) if not isinstance(instance, matrix.Matrix)]
+        if coord:
+            matrices[coord] = get_batch_matrices(np.stack([instances[k] for k in coord]))
+
+        for k, instance in enumerate(instances):
+            if isinstance(instance, matrix.Matrix):
+                matrices[k] = instance.matrix[:]  # dense matrix, also from the other distance backends
+
+        return matrices
+
+    def get_init_tours(self, indexes, matrices):
+        """
+        Get the initial tours of the given instances: random permutations generated at once, or the tours built by the
+        construction heuristic selected (see utils.construction), one instance at a time.
+
+        :returns: array of shape B x N
+        """
+        if self.init == 'random':
+            return np.argsort(self.generator.random(matrices.shape[:2]), axis=1)
+
+        tours = []
+        for k, i in enumerate(indexes):
+            instance = self.instances[i]
+            if not isinstance(instance, matrix.Matrix):
+                instance = matrix.Matrix(coord_list=instance.tolist(), matrix=matrices[k])
+            tours.append(self.construct(instance, self.random_stream))
+
+        return np.asarray(tours)
+
+    def anneal(self, tours, matrices):
+        """
+        Simulated Annealing of a batch of instances in lockstep. At each step, every instance gets a random inversion,
+        accepted according to its acceptance probability, e(-∆E/T), at the temperature of the step.
+
+        :returns: tuple (best tours, their costs, number of steps, evaluations and moves accepted per instance)
+        """
+        batch, size = tours.shape
+        rows = np.arange(batch)
+        cols = np.arange(size)
+
+        costs = get_batch_costs(tours, matrices)
+        best_tours, best_costs = tours.copy(), costs.copy()
+        evaluations, accepted = np.zeros(batch, dtype=int), np.zeros(batch, dtype=int)
+        count = np.zeros(batch, dtype=int)  # steps since the last move accepted, per instance
+
+        temperature = self.t_max
+        cycles = 0
+        while self.t_min < temperature and (active := count < self.stop).any():
+            # Random inversion of the sub-array i..j of each tour: the whole tour and single nodes are not valid moves
+            positions = self.generator.integers(0, size, size=(batch, 2))
+            node_i, node_j = positions.min(axis=1), positions.max(axis=1)
+            valid = active & (node_j > node_i) & (node_j - node_i < size - 1)
+
+            prev_i, first = tours[rows, node_i - 1], tours[rows, node_i]
+            last, next_j = tours[rows, node_j], tours[rows, (node_j + 1) % size]
+            deltas = matrices[rows, prev_i, last] + matrices[rows, first, next_j] \
+                - matrices[rows, prev_i, first] - matrices[rows, last, next_j]
+
+            probability = np.exp(-np.maximum(deltas, 0) / temperature)
+            accept = valid & (self.generator.random(batch) < probability)
+
+            if (moved := np.flatnonzero(accept)).size:
+                tours[moved] = invert_batch(tours[moved], node_i[moved], node_j[moved], cols)
+                costs[moved] += deltas[moved]
+
+                improved = moved[costs[moved] < best_costs[moved] - EPSILON]
+                best_tours[improved], best_costs[improved] = tours[improved], costs[improved]
+
+            evaluations += active
+            accepted += accept
+            count = np.where(accept, 0, count + 1)
+
+            temperature *= self.alpha
+            cycles += 1
+
+        return best_tours, best_costs, cycles, evaluations, accepted
+
+    def two_opt(self, tours, matrices):
+        """
+        Steepest descent over the inversions of a batch of instances in lockstep: at each step, the deltas of all the
+        inversions of every instance still improving are computed at once (see utils.neighbourhood), and the best one of
+        each instance is applied if it improves it.
+
+        :returns: tuple (locally optimal tours, their costs, number of steps, evaluations and moves applied per instance)
+        """
+        batch, size = tours.shape
+        cols = np.arange(size)
+
+        costs = get_batch_costs(tours, matrices)
+        evaluations, improved = np.zeros(batch, dtype=int), np.zeros(batch, dtype=int)
+        active = np.arange(batch) if size > 3 else np.arange(0)
+
+        cycles = 0
+        while active.size:
+            deltas = neighbourhood.get_batch_inversion_deltas(tours[active], matrices[active]).reshape(len(active), -1)
+            best = np.argmin(deltas, axis=1)
+            best_deltas = deltas[np.arange(len(active)), best]
+
+            evaluations[active] += neighbourhood.get_neighbourhood_size(size, 'two_opt')
+            improving = best_deltas < -EPSILON
+            active, best, best_deltas = active[improving], best[improving], best_deltas[improving]
+
+            tours[active] = invert_batch(tours[active], best // size, best % size, cols)
+            costs[active] += best_deltas
+            improved[active] += 1
+            cycles += 1
+
+        return tours, costs, cycles, evaluations, improved
+
+
+# functional methods
+def get_batch_matrices(coord):
+    """
+    Get the distance matrices of a stack of search spaces of the same size given by their coordinates.
+
+    :param coord: array of shape B x N x 2
+    :returns: array of shape B x N x N
+    """
+    diff = coord[:, :, None, :] - coord[:, None, :, :]
+    return np.sqrt(np.einsum('bijk,bijk->bij', diff, diff))
+
+
+def get_batch_costs(tours, matrices):
+    """
+    Get the cost of every tour of a stack of tours (B x N), each one with its own distance matrix.
+    """
+    rows = np.arange(len(tours))[:, None]
+    return matrices[rows, tours, np.roll(tours, -1, axis=1)].sum(axis=1)
+
+
+def invert_batch(tours, node_i, node_j, cols):
+    """
+    Invert the sub-array node_i..node_j (positions) of each tour of a stack of tours, all at once.
+    """
+    node_i, node_j = node_i[:, None], node_j[:, None]
+    inside = (cols >= node_i) & (cols <= node_j)
+
+    return np.take_along_axis(tours, np.where(inside, node_i + node_j - cols, cols), axis=1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Solve many small search spaces at once, in lockstep')
+    parser.add_argument('--files', nargs='+', default=None, help='csv or .tsp files of the data folder to solve')
+    parser.add_argument('--random', type=int, default=100, help='Number of random search spaces to solve (if no files '
+                                                                'are given)')
+    parser.add_argument('--nodes', type=int, default=50, help='Number of nodes of the random search spaces')
+    parser.add_argument('--method', default='sa', choices=METHODS)
+    parser.add_argument('--alpha', type=float, default=0.995, help='Cooling factor of SA (geometric)')
+    parser.add_argument('--polish', action='store_true', help='Improve the tours of SA with the 2-opt method')
+    parser.add_argument('--init', default='random', choices=construction.CONSTRUCTIONS)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', help='JSON file to write the tours and costs to')
+    args = parser.parse_args()
+
+    if args.files:
+        search_spaces = [matrix.Matrix(file) for file in args.files]
+    else:
+        search_spaces = list(rng.get_generator(args.seed).uniform(0, 100, size=(args.random, args.nodes, 2)))
+
+    start = time.perf_counter()
+    batch_results = BatchSolver(search_spaces, method=args.method, alpha=args.alpha, polish=args.polish, init=args.init,
+                                seed=args.seed).solve()
+    wall = time.perf_counter() - start
+
+    print(f'Solved {len(batch_results)} search spaces in {wall:.2f} seconds '
+          f'({len(batch_results) / wall:.1f} per second). Mean cost: {np.mean([i.cost for i in batch_results]):.2f}')
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as out_file:
+            json.dump([{'tour': i.tour, 'cost': i.cost, 'cycles': i.cycles} for i in batch_results], out_file, indent=2)
@@ -0,0 +1,203 @@
+import argparse
+import json
+import multiprocessing
+import platform
+import sys
+import time
+import numpy as np
+
+from main import algorithms
+from utils.definitions.definitions import get_abs_path
+from utils.matrix import matrix
+from utils.tsplib import tsplib
+
+# Folder of the TSPLIB files (.tsp and optionally .opt.tour), which are to be downloaded from TSPLIB
+TSPLIB_DIR = get_abs_path('data', 'tsplib')
+
+# Instances run by default
+INSTANCES = ('eil51', 'berlin52', 'st70', 'eil76', 'kroA100')
+
+# Seeds run by default for each algorithm and instance
+SEEDS = (1, 2, 3)
+
+
+def get_peak_rss():
+    """
+    Get the peak resident set size of the current process in MB, or None if not available in this platform.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10  # bytes on macOS, KB on Linux
+
+
+def run_job(job):
+    """
+    Solve an instance with an algorithm and a seed. It is run in a fresh process, so that its peak memory is its own.
+
+    :returns: dictionary with the result of the job
+    """
+    instance, algorithm, seed, kwargs, polish, time_limit = job
+
+    search_space = matrix.Matrix(str(TSPLIB_DIR.joinpath(f'{instance}.tsp')))
+    result = algorithms[algorithm](file=search_space, seed=seed, **kwargs).solve(polish, time_limit)
+
+    # The cost is evaluated again from the tour, so that a wrong cost is not reported as an improvement
+    tour = np.asarray(result.tour)
+    cost = float(search_space.matrix[tour, np.roll(tour, -1)].sum())
+    assert np.isclose(cost, result.cost), f'Cost reported {result.cost} differs from the cost of the tour {cost}'
+
+    optimum = get_optimum(instance, search_space)
+    evaluations = result.metrics['counters'].get('evaluations', 0)
+
+    return {
+        'instance': instance,
+        'algorithm': algorithm,
+        'seed': seed,
+        'nodes': len(search_space.matrix),
+        'cost': cost,
+        'optimum': optimum,
+        'gap': None if optimum is None else 100 * (cost - optimum) / optimum,
+        'wall_time': result.wall_time,
+        'stop_reason': result.stop_reason,
+        'iterations': result.cycles,
+        'iterations_per_second': result.cycles / result.wall_time if result.wall_time > 0 else None,
+        'evaluations': evaluations,
+        'evaluations_per_second': evaluations / result.wall_time if result.wall_time > 0 else None,
+        'peak_rss_mb': get_peak_rss(),
+    }
+
+
+def get_optimum(instance, search_space):
+    """
+    Get the length of the optimal tour of the instance: from the table of known optima, or from its .opt.tour file.
+    """
+    if (optimum := tsplib.OPTIMA.get(instance)) is not None:
+        return optimum
+
+    if (path_tour := TSPLIB_DIR.joinpath(f'{instance}.opt.tour')).exists():
+        tour = np.asarray(tsplib.load_tour(path_tour))
+        return float(search_space.matrix[tour, np.roll(tour, -1)].sum())
+
+    return None
+
+
+class Benchmark:
+    """
+    Regression benchmark: every algorithm is run on every TSPLIB instance with every seed, each run in a fresh process,
+    reporting the gap to the optimum, the wall time, the iterations and evaluations per second and the peak memory.
+
+    With a time limit, every run gets the same time budget, which compares the algorithms at a fixed time.
+    """
+    def __init__(self, instances=INSTANCES, algorithm_keys=tuple(algorithms), seeds=SEEDS, kwargs=None, polish=False,
+                 workers=1, time_limit=None):
+        self.instances = list(instances)
+        self.algorithm_keys = list(algorithm_keys)
+        self.seeds = list(seeds)
+        self.kwargs = kwargs or {}
+        self.polish = polish
+        self.workers = workers
+        self.time_limit = time_limit
+
+        missing = [i for i in self.instances if not TSPLIB_DIR.joinpath(f'{i}.tsp').exists()]
+        assert not missing, f'TSPLIB files not found in {TSPLIB_DIR}: {", ".join(f"{i}.tsp" for i in missing)}'
+
+    def run(self):
+        """
+        Run all the jobs. Workers are spawned (not forked) and replaced after each job.
+
+        :returns: dictionary with the environment, the result of each job and a summary per algorithm and instance
+        """
+        jobs = [(instance, algorithm, seed, self.kwargs.get(algorithm, {}), self.polish, self.time_limit)
+                for instance in self.instances for algorithm in self.algorithm_keys for seed in self.seeds]
+
+        start = time.perf_counter()
+        with multiprocessing.get_context('spawn').Pool(self.workers, maxtasksperchild=1) as pool:
+            results = pool.map(run_job, jobs, chunksize=1)
+
+        return {
+            'environment': self.get_environment(),
+            'wall_time': time.perf_counter() - start,
+            'jobs': results,
+            'summary': self.get_summary(results),
+        }
+
+    def get_summary(self, results):
+        """
+        Get the mean and the best of the gap, and the mean of the rest of the metrics, per algorithm and instance.
+        """
+        summary = []
+        for instance in self.instances:
+            for algorithm in self.algorithm_keys:
+                jobs = [i for i in results if i['instance'] == instance and i['algorithm'] == algorithm]
+                gaps = [i['gap'] for i in jobs if i['gap'] is not None]
+
+                summary.append({
+                    'instance': instance,
+                    'algorithm': algorithm,
+                    'mean_gap': float(np.mean(gaps)) if gaps else None,
+                    'best_gap': min(gaps) if gaps else None,
+                    'mean_wall_time': float(np.mean([i['wall_time'] for i in jobs])),
+                    'mean_iterations_per_second': float(np.mean([i['iterations_per_second'] or 0 for i in jobs])),
+                    'mean_evaluations_per_second': float(np.mean([i['evaluations_per_second'] or 0 for i in jobs])),
+                    'max_peak_rss_mb': max((i['peak_rss_mb'] or 0 for i in jobs), default=None),
+                })
+
+        return summary
+
+    @staticmethod
+    def get_environment():
+        return {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'cpu_count': multiprocessing.cpu_count(),
+        }
+
+
+def parse_kwargs(values):
+    """
+    Parse the constructor arguments given as algorithm.argument=value (e.g. ga.population_rate=5).
+    """
+    kwargs = {}
+    for value in values or []:
+        key, value = value.split('=', 1)
+        algorithm, argument = key.split('.', 1)
+
+        for cast in (int, float):
+            try:
+                value = cast(value)
+                break
+            except ValueError:
+                pass
+
+        kwargs.setdefault(algorithm, {})[argument] = value
+
+    return kwargs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the algorithms on TSPLIB instances. The .tsp files are to '
+                                                 f'be placed in {TSPLIB_DIR}')
+    parser.add_argument('--instances', nargs='+', default=INSTANCES, help='Names of the instances')
+    parser.add_argument('--algorithms', nargs='+', default=list(algorithms), choices=list(algorithms))
+    parser.add_argument('--seeds', nargs='+', type=int, default=SEEDS)
+    parser.add_argument('--args', nargs='*', help='Constructor arguments as algorithm.argument=value, e.g. sa.stop=500')
+    parser.add_argument('--polish', action='store_true', help='Improve the final tours with local search')
+    parser.add_argument('--workers', type=int, default=1, help='Jobs run in parallel (1 for stable timings)')
+    parser.add_argument('--time_limit', type=float, default=None, help='Time limit of each run in seconds')
+    parser.add_argument('--output', help='JSON file to write the report to (by default, the standard output)')
+    args = parser.parse_args()
+
+    report = Benchmark(args.instances, args.algorithms, args.seeds, parse_kwargs(args.args), args.polish,
+                       args.workers, args.time_limit).run()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as out_file:
+            json.dump(report, out_file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
@@ -1,3 +1,9 @@
+import numpy as np
+
+# Number of chromosomes encoded at once by the batched form of the encoding process.
+CODEC_BLOCK_SIZE = 2048
+
+
 class Chromosome:
     """
     This class represents the chromosome element for GA. It is adapted to TSP so that the encoding/decoding process is
@@ -8,55 +14,159 @@ class Chromosome:
     Extra sanity checking could be applied to operate with both types of tour's implementations. But for performance's
     sake, let's assume the tour to follow this format.
     """
-    def __init__(self, matrix, tour=None, ordinal=None, elite=False):
+    def __init__(self, matrix, tour=None, ordinal=None, elite=False, cost=None):
         self.fitness = 0
         self.elite_parents = elite
 
         if tour is not None:
             self.tour = tour
-            self.cost = self.evaluate_solution(matrix)
-            self.ordinal = self.encode()
+            self.cost = self.evaluate_solution(matrix) if cost is None else cost
+            self.ordinal = self.encode() if ordinal is None else ordinal
         elif ordinal is not None:
             self.ordinal = ordinal
             self.tour = self.decode()
             self.cost = self.evaluate_solution(matrix)
 
     def evaluate_solution(self, matrix):
-        cost = sum(matrix[self.tour[i]][self.tour[i + 1]] for i in range(len(self.tour) - 1))
-
-        # adding the cost from last city in the route to the starting city
-        cost += matrix[self.tour[-1]][self.tour[0]]
+        """
+        Calculate the cost of the tour. It can be skipped by giving the cost to the constructor, if it is already known
+        (e.g. from the cost of the original tour and the variation produced by a neighbourhood operator).
+        """
+        tour = np.asarray(self.tour)
 
-        return cost
+        # including the cost from last city in the route to the starting city
+        return float(matrix[tour, np.roll(tour, -1)].sum())
 
     def encode(self):
         """
         Encode current tour of nodes to ordinal representation
         """
-        canonical_tour = list(range(len(self.tour)))
-        count = 0
+        return self.encode_tour(self.tour)
+
+    def decode(self):
+        """
+        Decode ordinal representation to the tour of nodes
+        """
+        return self.decode_ordinal(self.ordinal)
+
+    # functional methods
+    @staticmethod
+    def encode_tour(tour):
+        """
+        Encode the given tour of nodes to ordinal representation.
+
+        The ordinal of each node is the number of nodes smaller than it that have not been visited yet. These are counted
+        with a Fenwick tree (binary indexed tree) that flags the nodes still available, which takes O(N log N) instead
+        of the O(N^2) of looking up and removing each node from a canonical list.
+        """
+        size = len(tour)
+        tree = [i & -i for i in range(size + 1)]  # Fenwick tree of a list of ones (all the nodes are available)
         res = []
-        while canonical_tour:
-            val = self.tour[count]
-            idx = canonical_tour.index(val)
+        for val in tour:
+            # Count available nodes smaller than val (prefix sum of the flags up to position val)
+            i, idx = val, 0
+            while i:
+                idx += tree[i]
+                i &= i - 1
             res.append(idx)
-            canonical_tour.pop(idx)
-            count += 1
+
+            # Flag val as visited
+            i = val + 1
+            while i <= size:
+                tree[i] -= 1
+                i += i & -i
 
         return res
 
-    def decode(self):
+    @staticmethod
+    def decode_ordinal(ordinal):
         """
-        Decode ordinal representation to the tour of nodes
+        Decode the given ordinal representation to the tour of nodes.
+
+        Each node is the (ordinal + 1)-th node still available, taken out of a canonical list. Although removing it is
+        O(N), list.pop() moves the rest of the list with a single memmove, which is faster than descending a Fenwick tree
+        in Python (or all the rows at once in NumPy) for any practical number of nodes (see benchmarks/codec.py).
         """
-        canonical_tour = list(range(len(self.ordinal)))
-        count = 0
-        res = []
-        while canonical_tour:
-            idx = self.ordinal[count]
-            val = canonical_tour[idx]
-            res.append(val)
-            canonical_tour.pop(idx)
-            count += 1
+        canonical_tour = list(range(len(ordinal)))
+
+        return [canonical_tour.pop(idx) for idx in ordinal]
+
+    @staticmethod
+    def encode_tours(tours):
+        """
+        Batched form of encode_tour(): encode every given tour (one per row of a 2-D array) at once. There is a Fenwick
+        tree per row, and each step of the algorithm is applied to all the rows with a single array operation. Rows are
+        processed in blocks of CODEC_BLOCK_SIZE to keep the trees small enough to stay in cache.
+        """
+        tours = np.asarray(tours)
+        res = np.empty(tours.shape, dtype=tours.dtype)
+        for start in range(0, len(tours), CODEC_BLOCK_SIZE):
+            res[start:start + CODEC_BLOCK_SIZE] = Chromosome.encode_block(tours[start:start + CODEC_BLOCK_SIZE])
+
+        return res
+
+    @staticmethod
+    def decode_ordinals(ordinals):
+        """
+        Decode every given ordinal representation (one per row of a 2-D array), one row at a time with decode_ordinal(),
+        which is faster than a batched Fenwick tree as the one of encode_tours().
+        """
+        ordinals = np.asarray(ordinals)
+        res = np.empty(ordinals.shape, dtype=ordinals.dtype)
+        for row, ordinal in enumerate(ordinals.tolist()):
+            res[row] = Chromosome.decode_ordinal(ordinal)
+
+        return res
+
+    @staticmethod
+    def encode_block(tours):
+        """
+        Encode a block of tours, one per row. See encode_tours().
+        """
+        rows, size = tours.shape
+        tree, base, capacity = Chromosome.get_batched_fenwick_tree(rows, size)
+
+        res = np.empty(tours.shape, dtype=tours.dtype)
+        for count in range(size):
+            val = tours[:, count].astype(np.int64)
+
+            i, idx = val.copy(), np.zeros(rows, dtype=np.int32)
+            for _ in range(capacity.bit_length()):
+                idx += tree[base + i]
+                i &= i - 1
+            res[:, count] = idx
+
+            Chromosome.remove_from_batched_fenwick_tree(tree, base, capacity, val + 1)
 
         return res
+
+    @staticmethod
+    def get_batched_fenwick_tree(rows, size):
+        """
+        Get a flattened array of Fenwick trees, one per row, and the offset of each row within it. The trees are padded
+        to a power of two (capacity) so that no bound checks are needed: padding positions are never available, and a
+        last extra position per row absorbs the updates beyond the capacity.
+
+        :returns: tuple (tree, base, capacity)
+        """
+        capacity = 1 << max(size - 1, 0).bit_length()
+        positions = np.arange(capacity + 2)
+        lowest_bit = positions & -positions
+
+        # Number of available positions (1..size) within the range covered by each node of the tree
+        row = np.clip(np.minimum(positions, size) - (positions - lowest_bit), 0, None)
+        row[-1] = 0
+
+        tree = np.tile(row.astype(np.int32), rows)
+        base = np.arange(rows, dtype=np.int64) * (capacity + 2)
+
+        return tree, base, capacity
+
+    @staticmethod
+    def remove_from_batched_fenwick_tree(tree, base, capacity, i):
+        """
+        Decrement by one the given position (one per row) of each Fenwick tree.
+        """
+        for _ in range(capacity.bit_length()):
+            tree[base + np.minimum(i, capacity + 1)] -= 1
+            i = i + (i & -i)
@@ -1,8 +1,10 @@
-import random
-import matplotlib.pyplot as plt
+import numpy as np
 
-from chromosome import Chromosome
 from algorithm import Algorithm
+from population import Population
+from utils.crossover_ops import crossover_ops
+from utils.fingerprint import fingerprint
+from utils.selection_ops import selection_ops
 
 # TODO: consider to dynamically update GA parameters based on learning through control variables
 
@@ -10,48 +12,91 @@ from algorithm import Algorithm
 class GeneticAlgorithm(Algorithm):
     """Genetic Algorithm"""
     def __init__(self, file='', stop=50, operator="inversion", elitism=0.8, mutation_rate=1,
-                 crossover_rate=1, population_rate=20):
-        super().__init__(file, stop, operator)
+                 crossover_rate=1, population_rate=20, selection='roulette', tournament_size=3, cache_size=0,
+                 crossover='one_point', init='random', init_rate=0.1, seed=None):
+        super().__init__(file, stop, operator, init, seed)
         self.elitism_rate = elitism
         self.mutation_rate = mutation_rate
         self.crossover_rate = crossover_rate
-        self.population = []
+        self.select = selection_ops.get_selection_by_name(selection)
+        self.tournament_size = tournament_size
+
+        # Costs of the tours already evaluated, shared across generations (None if disabled)
+        self.cache = fingerprint.FingerprintCache(cache_size) if cache_size > 0 else None
+
+        # Crossover operator working on tours (None for the one-point crossover on the ordinal representation)
+        assert crossover in ('one_point', 'ox', 'pmx', 'eax'), \
+            f'Unknown crossover: {crossover}. To choose from: one_point, ox, pmx, eax'
+        self.crossover_op = crossover_ops.get_crossover_by_name(crossover, self.random_stream)
+
+        if isinstance(self.crossover_op, crossover_ops.EdgeAssemblyCrossover):
+            self.crossover_op.neighbours = self.matrix.get_neighbours()
+
+        self.population = None
         self.population_size = self.nodes * population_rate
-        self.create_population(self.population_size)  # Initial population of P chromosomes (generation 0).
 
-    def create_population(self, size):
+        # Initial population of P chromosomes (generation 0), a fraction of them seeded by the construction heuristic
+        seeded = int(self.population_size * init_rate) if init != 'random' else 0
+        self.create_population(self.population_size, seeded)
+
+    def create_population(self, size, seeded=0):
         """
-        Create initial population of chromosomes based on generate_init_candidate() criteria.
+        Create initial population of chromosomes made of random permutations of the nodes, generated at once for the
+        whole population. The first chromosomes (seeded) are built from the tour of the construction heuristic instead
+        (see get_seeded_tours()).
         """
-        for _ in range(size):
-            solution = self.generate_init_candidate()
-            chromosome = Chromosome(self.matrix.matrix, tour=solution)
-            self.population.append(chromosome)
+        tours = np.argsort(self.generator.random((size, self.nodes)), axis=1)
+        if seeded > 0:
+            tours[:seeded] = self.get_seeded_tours(min(seeded, size))
+        population = Population(self.matrix.matrix, tours, cache=self.cache)
+        self.count_evaluations(population)
+
+        if self.population is None:
+            self.population = population
+        else:
+            self.population.extend(population)
 
         self.fitness_function()
 
+    def get_seeded_tours(self, size):
+        """
+        Get the given number of tours built from the tour of the construction heuristic: the first one is the tour as it
+        is, and each of the others gets a random move of the neighbourhood operator, so that they are not duplicates.
+
+        :returns: 2-D array of tours
+        """
+        tours = np.tile(np.asarray(self.generate_init_candidate()), (size, 1))
+        for tour in tours[1:]:
+            self.n_op.apply_move(tour, self.n_op.generate_move(tour))
+
+        return tours
+
+    def count_evaluations(self, population):
+        """
+        Count the tours of a new population that have been evaluated, and those whose cost was found in the cache.
+        """
+        self.metrics.count('evaluations', population.evaluated)
+        if self.cache is not None:
+            self.metrics.count('cache_hits', len(population) - population.evaluated)
+
     def fitness_function(self):
         """
         Since TSP is a minimisation problem, high fitness values are to be associated with short-length paths. This
-        fitness function makes the conversion. It also sorts population by descending order of fitness scores.
+        fitness function makes the conversion. It also reorders the population so that the elite chromosomes come first,
+        the best one being the first of all (the population is partitioned, not sorted).
         """
-        max_cost = max(i.cost for i in self.population)
-        for chromosome in self.population:
-            chromosome.fitness = max_cost - chromosome.cost
-        self.population.sort(key=lambda i: i.fitness, reverse=True)
+        self.population.fitness = self.population.costs.max() - self.population.costs
+        elite = int(self.population_size * self.elitism_rate)
+        self.population.reorder(selection_ops.get_elites(self.population.fitness, elite))
 
     def remove_duplicates(self):
         """
-        Remove chromosomes with the same tour that have been created along the reproduction process.
+        Remove chromosomes with the same tour that have been created along the reproduction process, including the
+        tours that describe the same cycle from a different starting node or in the opposite direction.
         """
-        unique_population, temp_list = [], []
-
-        for chromosome in self.population:
-            if chromosome.tour not in temp_list:
-                temp_list.append(chromosome.tour)
-                unique_population.append(chromosome)
-
-        self.population = unique_population.copy()
+        size = len(self.population)
+        self.population.reorder(self.population.get_unique_rows())
+        self.metrics.count('duplicates', size - len(self.population))
 
     def fill_missing_population(self):
         """
@@ -62,78 +107,62 @@ class GeneticAlgorithm(Algorithm):
 
     def selection(self):
         """
-        Roulette Wheel selection:
-        1. Sum up the fitness values of all chromosomes in the population.
-        2. Generate a random number between 0 and the sum of the fitness values.
-        3. Select the first chromosome whose fitness value added to the sum of the fitness
-           values of the previous chromosomes is greater than or equal to the random number.
-
-        Warning: this approach may lead to premature convergence, as super-chromosomes with high fitness values will
-        quickly dominate the population.
+        Keep the elite chromosomes and fill the rest of the population with chromosomes selected at once by the selected
+        scheme (see utils.selection_ops): roulette wheel, stochastic universal sampling (sus) or k-tournament.
         """
         # Selecting elite chromosomes
-        elite = int(self.population_size * self.elitism_rate)
-        selection = self.population[:elite]
-
-        # Step 1
-        total_fitness = sum(i.fitness for i in self.population)
-
-        while len(selection) < self.population_size:
-            # Step 2
-            rand = random.randint(0, int(total_fitness))
-            i = random.choice(self.population)
+        elite = min(int(self.population_size * self.elitism_rate), len(self.population))
+        selected = self.select(self.population.fitness, self.population_size - elite, self.tournament_size,
+                               self.generator)
 
-            # Step 3
-            if i.fitness >= rand:
-                selection.append(i)
-
-        self.population = selection.copy()
+        self.population.reorder(np.concatenate((np.arange(elite), selected)))
         self.fitness_function()
 
     def crossover(self):
         """
-        One-point crossover to produce two offspring. It selects at random a pair of parents for mating, ensuring that
-        a number of parents based on the crossover rate are selected and mated.
+        Crossover to produce two offspring: either one-point crossover on the ordinal representation of the chromosomes,
+        or one of the crossover operators working on tours (see utils.crossover_ops). It selects at random a pair of
+        parents for mating, ensuring that a number of parents based on the crossover rate are selected and mated.
         """
-        # Get a random number of chromosomes that are selected to be parents
-        occurrences = random.sample(range(self.population_size), int(self.population_size * self.crossover_rate))
+        # Get a random number of chromosomes that are selected to be parents. As they are in random order, consecutive
+        # parents are mated. If the number of parents is odd, the last one is not mated and stays in the population.
+        occurrences = self.generator.choice(self.population_size, int(self.population_size * self.crossover_rate),
+                                            replace=False)
+        pairs = len(occurrences) // 2
+        parents_1, parents_2 = occurrences[:pairs], occurrences[pairs:2 * pairs]
 
         # Get elites of current population, their offspring are expected not to receive mutation.
-        elites = self.population[:int(self.population_size * self.elitism_rate)]
-
-        parents = [self.population[i] for i in occurrences]
-        parents_size = len(parents)
-
-        # Removing selected parents for mating from population so that their offspring replace their position.
-        for occurrence in sorted(occurrences, reverse=True):
-            self.population.pop(occurrence)
-
-        offspring = []
+        elites = int(self.population_size * self.elitism_rate)
 
-        while len(offspring) < parents_size and parents:
-            # Select two parents randomly for mating
-            parent_1 = parents.pop(random.randint(0, len(parents) - 1))
-            parent_2 = parents.pop(random.randint(0, len(parents) - 1))
+        # Mark offspring which parents (at least one) are elite
+        elite_parents = (parents_1 < elites) | (parents_2 < elites)
+        elite_parents = np.concatenate((elite_parents, elite_parents))
 
-            # One-point divider
-            i = random.randint(0, self.nodes)
+        if self.crossover_op is None:
+            # One-point divider for each pair of parents
+            dividers = self.generator.integers(0, self.nodes + 1, size=pairs)
+            first_part = np.arange(self.nodes) < dividers[:, np.newaxis]
 
             # Crossover
-            crossover = parent_1.ordinal[:i] + parent_2.ordinal[i:]
-            child_1 = Chromosome(self.matrix.matrix, ordinal=crossover)
-            crossover = parent_2.ordinal[:i] + parent_1.ordinal[i:]
-            child_2 = Chromosome(self.matrix.matrix, ordinal=crossover)
+            ordinals = self.population.ordinals
+            child_1 = np.where(first_part, ordinals[parents_1], ordinals[parents_2])
+            child_2 = np.where(first_part, ordinals[parents_2], ordinals[parents_1])
 
-            # Mark offspring which parents (at least one) are elite
-            if parent_1 in elites or parent_2 in elites:
-                child_1.elite_parents = True
-                child_2.elite_parents = True
+            offspring = Population.from_ordinals(self.matrix.matrix, np.concatenate((child_1, child_2)),
+                                                 elite_parents=elite_parents, cache=self.cache)
+        else:
+            tours = self.population.tours
+            child_1, child_2 = self.crossover_op.crossover(tours[parents_1], tours[parents_2], self.matrix.matrix)
 
-            offspring.extend((child_1, child_2))
+            offspring = Population(self.matrix.matrix, np.concatenate((child_1, child_2)),
+                                   elite_parents=elite_parents, cache=self.cache)
 
-        # Add new offspring to the population alongside the chromosomes not selected for reproduction (older generation)
-        for chromosome in offspring:
-            self.population.append(chromosome)
+        self.count_evaluations(offspring)
+
+        # Removing mated parents from population so that their offspring replace their position, and adding the new
+        # offspring to the population alongside the chromosomes not selected for reproduction (older generation)
+        self.population.reorder(np.setdiff1d(np.arange(self.population_size), occurrences[:2 * pairs]))
+        self.population.extend(offspring)
 
         assert (new_size := len(self.population)) == (initial_size := self.population_size), \
             f'Error: size of new population: {new_size} is different from initial size: {initial_size}'
@@ -143,41 +172,87 @@ class GeneticAlgorithm(Algorithm):
         Introducing diversity by introducing perturbations in a number of randomly selected offspring (determined by the
         mutation rate). Insert the resulting offspring in the new population.
         """
-        occurrences = random.sample(range(self.population_size), int(self.population_size * self.mutation_rate))
+        occurrences = self.generator.choice(self.population_size, int(self.population_size * self.mutation_rate),
+                                            replace=False).tolist()
+        mutated = [occurrence for occurrence in occurrences if not self.population.elite_parents[occurrence]]
+
+        for occurrence in mutated:
+            # Each tour is mutated in place within the population array
+            tour = self.population.tours[occurrence]
+            move, delta = self.n_op.generate_candidate_move(tour, self.matrix.matrix)
+            self.n_op.apply_move(tour, move)
+            self.population.costs[occurrence] += delta
 
-        for occurrence in occurrences:
-            chromosome = self.population[occurrence]
-            if not chromosome.elite_parents:
-                new_tour = self.n_op.generate_candidate_solution(chromosome.tour.copy())
-                mutated = Chromosome(self.matrix.matrix, tour=new_tour)
-                self.population[occurrence] = mutated
+        self.population.update_ordinals(mutated)
+        self.metrics.count('operator_calls', len(mutated))
+        self.metrics.count('evaluations', len(mutated))
 
         # End mutation by recalculating the fitness scores and sorting the population
         self.fitness_function()
 
-    def run(self):
-        print(f'\nRunning {self.__doc__}. Stopping if no improvement after {self.stop} iterations \n')
-        best_chromosome = self.population[0]
-        best_costs = []
-
-        plt.rcParams["figure.figsize"] = (10, 8)
-        plt.tight_layout()
-
-        count = 0
-        while count < self.stop:
+    def next_generation(self):
+        """
+        Evolve the population by one generation, restructuring it if necessary for the next reproduction stage. The time
+        spent in each stage is recorded in the metrics.
+        """
+        with self.metrics.timer('selection'):
             self.selection()
+        with self.metrics.timer('crossover'):
             self.crossover()
+        with self.metrics.timer('mutation'):
             self.mutation()
 
-            if self.population[0].cost < best_chromosome.cost:
-                best_chromosome = self.population[0]
-                print(f'Better chromosome found. Cost: {round(best_chromosome.cost)}')
+        with self.metrics.timer('dedupe'):
+            self.remove_duplicates()
+        with self.metrics.timer('refill'):
+            self.fill_missing_population()
+
+    def get_migrants(self, size):
+        """
+        Get a copy of the best chromosomes of the population, to migrate to another population (see island_model).
+        """
+        rows = selection_ops.get_elites(self.population.fitness, size)[:size]
+        rows = rows[np.argsort(self.population.costs[rows], kind='stable')]
+
+        return [self.population.get_chromosome(i) for i in rows]
+
+    def receive_migrants(self, migrants):
+        """
+        Replace the worst chromosomes of the population with the given migrants (chromosomes coming from another
+        population), keeping the population size.
+        """
+        if not migrants:
+            return
+
+        immigrants = Population(self.matrix.matrix, [chromosome.tour for chromosome in migrants],
+                                ordinals=[chromosome.ordinal for chromosome in migrants],
+                                costs=[chromosome.cost for chromosome in migrants])
+
+        survivors = max(len(self.population) - len(immigrants), 0)
+        self.population.reorder(selection_ops.get_elites(self.population.fitness, survivors)[:survivors])
+        self.population.extend(immigrants)
+
+        self.remove_duplicates()
+        self.fill_missing_population()
+        self.fitness_function()
+
+    def search(self):
+        """
+        Run the Genetic Algorithm to stop when there is no improvement after a number of generations.
+        """
+        best_chromosome = self.population.get_chromosome(0)
+        best_costs = [best_chromosome.cost]
+        self.notify(best_chromosome.tour, best_chromosome.cost)
+
+        count = 0
+        while count < self.stop and not self.should_stop():
+            self.next_generation()
+
+            if self.population.costs[0] < best_chromosome.cost:
+                best_chromosome = self.population.get_chromosome(0)
                 best_costs.append(best_chromosome.cost)
 
-                plt.cla()
-                self.plot_path(best_chromosome.tour, f'{self.__doc__} using {self.n_op.__doc__}',
-                               f'Iteration: {self.cycles} \nCost: {round(best_chromosome.cost)}')
-                plt.pause(0.05)
+                self.notify(best_chromosome.tour, best_chromosome.cost)
 
                 count = 0
             else:
@@ -185,11 +260,4 @@ class GeneticAlgorithm(Algorithm):
 
             self.cycles += 1
 
-            # Restructure population if necessary for next reproduction stage
-            self.remove_duplicates()
-            self.fill_missing_population()
-
-        plt.show(block=True)
-
-        self.plot_convergence(best_costs, f'{self.__doc__} minimisation convergence',
-                              x_label=f'Total iterations: {self.cycles}', y_label='Cost')
+        return best_chromosome.tour, best_chromosome.cost, best_costs
@@ -1,58 +1,81 @@
-import matplotlib.pyplot as plt
-
 from algorithm import Algorithm
+from utils.neighbourhood import neighbourhood
 
 
 class HillClimbing(Algorithm):
     """Hill Climbing Algorithm"""
-    def __init__(self, file='', stop=20, operator="inversion", climb_type='steepest'):
-        super().__init__(file, stop, operator)
+    def __init__(self, file='', stop=20, operator="inversion", climb_type='steepest', neighbourhood='swap',
+                 init='random', seed=None):
+        super().__init__(file, stop, operator, init, seed)
         self.climb_type = climb_type
+        self.neighbourhood = neighbourhood
 
         self.evaluate = {
             'steepest': self.evaluate_neighbourhood_space,
-            'simple': self.evaluate_solution
+            'simple': self.evaluate_candidate,
+            'local_search': self.evaluate_local_search
         }
 
-    def evaluate_neighbourhood_space(self, tour):
+    def evaluate_neighbourhood_space(self, tour, cost):
         """
         Steepest Ascend only: Evaluate all possible solutions within the neighbourhood space and select the best one.
+        The neighbourhood is either the exchanges of adjacent nodes ('swap') or the 2-opt moves ('two_opt'), all of
+        them scored at once from the variation of cost they produce (see utils.neighbourhood).
         """
-        cost = self.evaluate_solution(tour) * 10  # this makes a number big enough to hit the first condition
-        best_candidate_solution = tour.copy()
+        if self.neighbourhood == 'two_opt':
+            move, best_delta = neighbourhood.get_best_inversion(tour, self.matrix.matrix)
+        else:
+            move, best_delta = neighbourhood.get_best_swap(tour, self.matrix.matrix)
+
+        self.metrics.count('evaluations', neighbourhood.get_neighbourhood_size(len(tour), self.neighbourhood))
 
-        for i in range(len(tour) - 1):
-            candidate = tour.copy()
-            candidate[i], candidate[i + 1] = candidate[i + 1], candidate[i]
+        if move is None:
+            return cost
 
-            cost_candidate = self.evaluate_solution(candidate)
+        # Modifying the original tour by ref
+        node_a, node_b = move
+        if self.neighbourhood == 'two_opt':
+            tour[node_a:node_b + 1] = tour[node_a:node_b + 1][::-1]
+        else:
+            tour[node_a], tour[node_b] = tour[node_b], tour[node_a]
 
-            if cost_candidate < cost:
-                cost = cost_candidate
-                best_candidate_solution = candidate.copy()
+        return cost + best_delta
 
+    def evaluate_local_search(self, tour, cost):
+        """
+        Local search only: the candidate solution is improved by 2-opt and Or-opt moves until an (approximate) local
+        optimum (see utils.local_search), so that the operator acts as the perturbation of an iterated local search.
+        """
         # Modifying the original tour by ref
-        tour[:] = best_candidate_solution
+        tour[:], cost = self.polish_tour(tour, cost)
 
         return cost
 
-    def run(self):
+    @staticmethod
+    def evaluate_candidate(tour, cost):
+        """
+        Simple only: the candidate solution is evaluated as it is.
+        """
+        return cost
+
+    def search(self):
         """
         Run the Hill Climbing algorithm.
         """
-        print(f'\nRunning {self.__doc__}. Stopping if no improvement after {self.stop} iterations \n')
         best_solution = self.generate_init_candidate()
         best_cost = self.evaluate_solution(best_solution)
         cost_candidates = [best_cost]
-
-        plt.rcParams["figure.figsize"] = (10, 8)
-        plt.tight_layout()
+        self.notify(best_solution, best_cost)
 
         count = 0
-        while count < self.stop:
-            solution_candidate = self.n_op.generate_candidate_solution(best_solution.copy())
+        while count < self.stop and not self.should_stop():
+            solution_candidate = best_solution.copy()
+            move, delta = self.n_op.generate_candidate_move(solution_candidate, self.matrix.matrix)
+            self.n_op.apply_move(solution_candidate, move)
+            self.metrics.count('operator_calls')
+            self.metrics.count('evaluations')
 
-            cost_candidate = self.evaluate[self.climb_type](solution_candidate)
+            cost_candidate = self.evaluate[self.climb_type](solution_candidate, best_cost + delta)
 
             if cost_candidate < best_cost:
                 best_solution = solution_candidate.copy()
@@ -60,15 +83,12 @@ class HillClimbing(Algorithm):
                 cost_candidates.append(cost_candidate)
                 count = 0
 
-            plt.cla()
-            self.plot_path(best_solution, f'{self.__doc__} using {self.n_op.__doc__}',
-                           f'Iteration: {self.cycles} \nCost: {round(cost_candidates[-1])}')
-            plt.pause(0.05)
+                self.notify(best_solution, best_cost)
+                self.metrics.count('accepted')
+            else:
+                self.metrics.count('rejected')
 
             self.cycles += 1
             count += 1
 
-        plt.show(block=True)
-
-        self.plot_convergence(cost_candidates, f'{self.__doc__} minimisation convergence',
-                              x_label=f'Total iterations: {self.cycles}', y_label='Cost')
+        return best_solution, best_cost, cost_candidates
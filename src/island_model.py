@@ -0,0 +1,227 @@
+import inspect
+import multiprocessing
+import time
+
+from algorithm import Algorithm
+from genetic_algorithm import GeneticAlgorithm
+from multi_start import SharedMatrix
+from utils.budget import budget
+
+# Arguments of the GA given to every island: all of them, but the search space and the seed (one for each island)
+ISLAND_ARGS = tuple(arg for arg in inspect.signature(GeneticAlgorithm.__init__).parameters
+                    if arg not in ('self', 'file', 'seed'))
+
+
+def run_island(descriptor, connection, seed, kwargs, migrants):
+    """
+    Evolve one island (an independent GA population) in a worker process. The island waits for the orders of the
+    coordinator: each order is a tuple (number of generations, immigrants, deadline, maximum number of evaluations)
+    that is answered with the island's best chromosomes (emigrants) and its metrics once the generations have evolved,
+    or earlier once the deadline (time.time(), as the clock is shared by the processes) or the maximum number of
+    evaluations (counted since the island started) is reached. None ends the process.
+    """
+    # The shared memory must be referenced as long as the matrix is used. It is released when the process ends.
+    shared, search_space = SharedMatrix.attach(descriptor)
+
+    island = GeneticAlgorithm(file=search_space, seed=seed, **kwargs)
+
+    while (order := connection.recv()) is not None:
+        generations, immigrants, deadline, max_evaluations = order
+        time_limit = None if deadline is None else deadline - time.time()
+        if time_limit is not None and time_limit <= 0:
+            generations, time_limit = 0, None
+        island.budget = budget.Budget(time_limit, max_evaluations)
+
+        island.receive_migrants(immigrants)
+        for _ in range(generations):
+            if island.should_stop():
+                break
+            island.next_generation()
+
+        connection.send((island.get_migrants(migrants), island.metrics.to_dict()))
+
+    connection.close()
+    del island, search_space
+    shared.close()
+
+
+class IslandGeneticAlgorithm(Algorithm):
+    """Island Model Genetic Algorithm"""
+    def __init__(self, file='', stop=50, operator="inversion", elitism=0.8, mutation_rate=1, crossover_rate=1,
+                 population_rate=5, islands=4, topology='ring', migration_interval=10, migrants=2, selection='roulette',
+                 tournament_size=3, cache_size=0, crossover='one_point', init='random', init_rate=0.1, seed=None):
+        island_args = {arg: value for arg, value in locals().items() if arg in ISLAND_ARGS}
+        assert len(island_args) == len(ISLAND_ARGS), \
+            f'Arguments of the GA missing in the island model: {", ".join(set(ISLAND_ARGS) - set(island_args))}'
+
+        super().__init__(file, stop, operator, init, seed)
+        self.island_args = island_args
+        self.islands = islands
+        self.migration_interval = migration_interval
+        self.migrants = migrants
+
+        self.topologies_dict = {
+            'ring': self.get_ring_immigrants,
+            'full': self.get_fully_connected_immigrants
+        }
+
+        assert topology in self.topologies_dict, f'Unknown topology: {topology}. To choose from: ring, full'
+        self.get_immigrants = self.topologies_dict.get(topology)
+
+    def get_ring_immigrants(self, emigrants, island):
+        """
+        Ring topology: each island receives the emigrants of the previous island.
+        """
+        return emigrants[island - 1]
+
+    def get_fully_connected_immigrants(self, emigrants, island):
+        """
+        Fully connected topology: each island receives the best emigrants among those of all the other islands.
+        """
+        candidates = [chromosome for i, chromosomes in enumerate(emigrants) if i != island for chromosome in chromosomes]
+
+        return sorted(candidates, key=lambda chromosome: chromosome.cost)[:self.migrants]
+
+    @staticmethod
+    def get_evaluations(island_metrics):
+        """
+        Get the number of evaluations of all the islands, given the metrics they reported last.
+        """
+        return sum(metrics['counters'].get('evaluations', 0) for metrics in island_metrics)
+
+    def get_orders(self, immigrants, island_metrics, failed_metrics):
+        """
+        Get the order of each island still running for the next migration interval: its immigrants, and the budget it
+        has left so that it stops evolving within the interval once the budget of the run is exhausted. That is the
+        deadline of the run, and the evaluations left shared evenly among the islands, on top of the ones each island
+        has done so far (given the metrics they reported last).
+
+        :returns: list of tuples (generations, immigrants, deadline, maximum number of evaluations)
+        """
+        evaluations = self.get_evaluations(island_metrics + failed_metrics)
+        stopped = self.should_stop(evaluations)
+        time_limit = None if self.budget.time_limit is None else self.budget.deadline - time.perf_counter()
+        deadline = None if time_limit is None else time.time() + time_limit
+
+        orders = []
+        for island, island_immigrants in enumerate(immigrants):
+            max_evaluations = None
+            if self.budget.max_evaluations is not None:
+                evaluations_left = max(self.budget.max_evaluations - evaluations, 0)
+                share = evaluations_left // len(immigrants) + (island < evaluations_left % len(immigrants))
+                max_evaluations = island_metrics[island]['counters'].get('evaluations', 0) + share if share else 0
+
+            if stopped or (time_limit is not None and time_limit <= 0) or max_evaluations == 0:
+                # No budget left: the island only sends its emigrants
+                orders.append((0, island_immigrants, None, None))
+            else:
+                orders.append((self.migration_interval, island_immigrants, deadline, max_evaluations))
+
+        return orders
+
+    def exchange(self, connections, orders):
+        """
+        Send every island its order (see get_orders()), to evolve for a migration interval after receiving its
+        immigrants, and wait for their replies. An island that has ended unexpectedly (e.g. killed or out of memory)
+        breaks its pipe.
+
+        :returns: list with the reply of each island (tuple of emigrants and metrics), or None if it has ended
+        """
+        ordered = []
+        for connection, order in zip(connections, orders):
+            try:
+                connection.send(order)
+                ordered.append(True)
+            except OSError:  # BrokenPipeError
+                ordered.append(False)
+
+        replies = []
+        for connection, island_ordered in zip(connections, ordered):
+            try:
+                replies.append(connection.recv() if island_ordered else None)
+            except (EOFError, OSError):
+                replies.append(None)
+
+        return replies
+
+    def search(self):
+        """
+        Run several GA populations (islands) in parallel worker processes. Every migration interval, the best
+        chromosomes of each island migrate to its neighbours, as given by the migration topology. This keeps several
+        sub-populations exploring different regions of the search space, which delays premature convergence.
+        Stop when the best chromosome among all islands does not improve after a number of generations. The budget of
+        the run is given to the islands with their orders, so that they stop evolving as soon as it is exhausted, the
+        evaluations being those of all the islands.
+
+        If an island ends unexpectedly, the run goes on with the other ones (counted as failed_islands in the metrics).
+        It fails if every island has ended.
+        """
+        # Independent seed for each island, derived from the seed of the algorithm
+        seeds = self.random_stream.spawn(self.islands)
+
+        with SharedMatrix(self.matrix) as shared_matrix:
+            connections, processes = [], []
+            for seed in seeds:
+                connection, island_connection = multiprocessing.Pipe()
+                process = multiprocessing.Process(target=run_island, args=(shared_matrix.descriptor, island_connection,
+                                                                           seed, self.island_args, self.migrants))
+                process.start()
+                island_connection.close()  # only the island keeps its end, so that the pipe breaks if it fails
+                connections.append(connection)
+                processes.append(process)
+
+            islands = list(connections)  # connections of the islands still running
+            try:
+                best_chromosome, best_costs = None, []
+                immigrants = [[] for _ in range(self.islands)]
+                island_metrics = [{'counters': {}, 'stages': {}}] * self.islands
+                failed_metrics = []  # last metrics reported by the islands that have ended unexpectedly
+
+                count = 0
+                # The first exchange always takes place, so that there is a best chromosome even if the run is
+                # cancelled (the islands then send the best chromosomes of their initial population)
+                while best_chromosome is None or (count < self.stop and not self.should_stop(
+                        self.get_evaluations(island_metrics + failed_metrics))):
+                    replies = self.exchange(islands, self.get_orders(immigrants, island_metrics, failed_metrics))
+
+                    if None in replies:
+                        failed = [i for i, reply in enumerate(replies) if reply is None]
+                        self.metrics.count('failed_islands', len(failed))
+                        failed_metrics.extend(island_metrics[i] for i in failed)
+                        islands = [island for island, reply in zip(islands, replies) if reply is not None]
+                        replies = [reply for reply in replies if reply is not None]
+                        if not replies:
+                            raise RuntimeError('Every island of the island model has ended unexpectedly')
+
+                    emigrants, island_metrics = map(list, zip(*replies))
+
+                    self.cycles += self.migration_interval
+
+                    island_best = min((chromosomes[0] for chromosomes in emigrants),
+                                      key=lambda chromosome: chromosome.cost)
+
+                    if best_chromosome is None or island_best.cost < best_chromosome.cost:
+                        best_chromosome = island_best
+                        best_costs.append(best_chromosome.cost)
+
+                        self.notify(best_chromosome.tour, best_chromosome.cost)
+                        count = 0
+                    else:
+                        count += self.migration_interval
+
+                    # Migration
+                    immigrants = [self.get_immigrants(emigrants, island) for island in range(len(islands))]
+
+                # Metrics of all the islands (each island reports its metrics accumulated since it started)
+                for metrics in island_metrics + failed_metrics:
+                    self.metrics.merge(metrics)
+            finally:
+                for connection in connections:
+                    try:
+                        connection.send(None)
+                    except OSError:  # the island has already ended
+                        pass
+                for process in processes:
+                    process.join()
+
+        return best_chromosome.tour, best_chromosome.cost, best_costs
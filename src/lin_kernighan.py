@@ -0,0 +1,64 @@
+from algorithm import Algorithm
+from utils.local_search import local_search
+
+
+class LinKernighan(Algorithm):
+    """Lin-Kernighan Algorithm"""
+    def __init__(self, file='', stop=100, operator='double_bridge', max_depth=10, breadth=5, init='greedy', seed=None):
+        super().__init__(file, stop, operator, init, seed)
+        self.local_search = local_search.LinKernighanSearch(self.matrix.matrix, self.matrix.get_neighbours(),
+                                                            max_depth, breadth)
+
+    def search(self):
+        """
+        Run the iterated Lin-Kernighan algorithm to stop when no better solution is found after a number of kicks.
+        The initial solution is improved by Lin-Kernighan and Or-opt moves until a local optimum (see
+        utils.local_search), or until the budget of the run is exhausted. Then, at each iteration, the best solution is
+        perturbed by the selected operator (a double bridge kick by default) and improved again, only looking at the
+        nodes around the kick. The new solution is kept if it is better.
+        """
+        best_solution, best_cost = self.local_search.optimise(self.generate_init_candidate(),
+                                                              should_stop=self.should_stop)
+        best_solution = list(best_solution)
+        cost_candidates = [best_cost]
+        self.notify(best_solution, best_cost)
+
+        count = 0
+        while count < self.stop and not self.should_stop():
+            solution_candidate = best_solution.copy()
+            move, delta = self.n_op.generate_candidate_move(solution_candidate, self.matrix.matrix)
+            active = self.get_move_nodes(solution_candidate, move)
+            self.n_op.apply_move(solution_candidate, move)
+            self.metrics.count('operator_calls')
+
+            solution_candidate, cost_candidate = self.local_search.optimise(solution_candidate, best_cost + delta,
+                                                                            active, self.should_stop)
+            self.metrics.count('evaluations')
+
+            if cost_candidate < best_cost - local_search.EPSILON:
+                best_solution = list(solution_candidate)
+                best_cost = cost_candidate
+                cost_candidates.append(best_cost)
+                count = 0
+
+                self.notify(best_solution, best_cost)
+                self.metrics.count('accepted')
+            else:
+                self.metrics.count('rejected')
+
+            self.cycles += 1
+            count += 1
+
+        return best_solution, best_cost, cost_candidates
+
+    # functional methods
+    @staticmethod
+    def get_move_nodes(tour, move):
+        """
+        Get the nodes at the positions of the given move (before applying it) and next to them, which are the ones
+        whose edges may change.
+        """
+        size = len(tour)
+        positions = [i for i in move if not isinstance(i, bool)]
+
+        return list({tour[(i + k) % size] for i in positions for k in (-1, 0, 1)})
@@ -1,17 +1,27 @@
 import sys
 import argparse
 import inspect
+import json
+import signal
 
 from genetic_algorithm import GeneticAlgorithm
 from simulated_annealing import SimulatedAnnealing
 from tabu_search import TabuSearch
 from hill_climbing import HillClimbing
+from island_model import IslandGeneticAlgorithm
+from lin_kernighan import LinKernighan
+from multi_start import MultiStartRunner
+from utils.distances import distances
+from utils.matrix import matrix
+from utils.metrics import metrics
 
 algorithms = {
     'sa': SimulatedAnnealing,
     'ts': TabuSearch,
     'ga': GeneticAlgorithm,
-    'hc': HillClimbing
+    'hc': HillClimbing,
+    'iga': IslandGeneticAlgorithm,
+    'lk': LinKernighan
 }
 
 
@@ -30,6 +40,29 @@ class ArgumentParser:
 
         parser.add_argument('algorithm', action='store_true', help='Choose algorithm to solve TSP. '
                                                                    'Refer to docs for more information')
+        parser.add_argument('--headless', action='store_true', help='Run without plotting (matplotlib is not '
+                                                                    'imported)')
+        parser.add_argument('--restarts', action='store', type=int, default=1,
+                            help='Number of independent restarts run in parallel, keeping the best one (headless)')
+        parser.add_argument('--workers', action='store', type=int, default=None,
+                            help='Number of worker processes for the restarts. By default: one per CPU')
+        parser.add_argument('--seed', action='store', type=int, default=None,
+                            help='Seed of the run (or of the restarts), for reproducible results')
+        parser.add_argument('--polish', action='store_true', help='Improve the final tour with 2-opt and Or-opt local '
+                                                                  'search')
+        parser.add_argument('--time_limit', action='store', type=float, default=None,
+                            help='Wall-clock time limit of the run (or of each restart) in seconds')
+        parser.add_argument('--max_evaluations', action='store', type=int, default=None,
+                            help='Maximum number of evaluations of the run (or of each restart)')
+        parser.add_argument('--distance', action='store', default='dense', choices=distances.DISTANCES,
+                            help='Distance backend: dense matrix, condensed float32 triangle or on-the-fly oracle (for '
+                                 'very large search spaces)')
+        parser.add_argument('--metrics', action='store', default=None,
+                            help='JSON file to export the metrics of the run to (counters and time of each stage), '
+                                 'updated periodically while it runs')
+        parser.add_argument('--profile', action='store_true', help='Profile the run with cProfile (slower)')
+        parser.add_argument('--trace_memory', action='store_true', help='Trace the memory allocations of the run with '
+                                                                        'tracemalloc (slower)')
 
         subparsers = parser.add_subparsers(description='Sub description', dest='algo_select')
 
@@ -42,30 +75,93 @@ class ArgumentParser:
         args = parser.parse_args()
         args_dict = vars(args)
 
-        # Extracting the first two elements of args_dict to get the constructor_args
-        constructor_args = dict(list(args_dict.items())[2:])
+        # Extracting the arguments of the main parser to get the constructor_args
+        constructor_args = {key: value for key, value in args_dict.items()
+                            if key not in ('algorithm', 'algo_select', 'headless', 'restarts', 'workers', 'seed',
+                                           'polish', 'time_limit', 'max_evaluations', 'distance', 'metrics', 'profile',
+                                           'trace_memory')}
 
-        self.run_tsp_solver(algorithms.get(args.algo_select), constructor_args)
+        # Loading the search space with the distance backend selected
+        constructor_args['file'] = matrix.Matrix(constructor_args['file'], distance=args.distance)
+
+        if args.restarts > 1:
+            self.run_multi_start(algorithms.get(args.algo_select), constructor_args, args.restarts, args.workers,
+                                 args.seed, args.polish, args.metrics, args.time_limit, args.max_evaluations)
+        else:
+            constructor_args['seed'] = args.seed
+            self.run_tsp_solver(algorithms.get(args.algo_select), constructor_args, args.headless, args.polish,
+                                args.metrics, args.profile, args.trace_memory, args.time_limit, args.max_evaluations)
 
     @staticmethod
-    def run_tsp_solver(algorithm, args):
+    def run_tsp_solver(algorithm, args, headless=False, polish=False, metrics_file=None, profile=False,
+                       trace_memory=False, time_limit=None, max_evaluations=None):
         """
-        Run the algorithm given the type of algorithm and its constructor arguments
+        Run the algorithm given the type of algorithm and its constructor arguments. Unless running headless, the
+        progress of the algorithm is plotted. Optionally, its metrics are exported and the run is profiled.
+
+        Pressing Ctrl+C once stops the run with the best solution found so far, and a second time interrupts it.
         """
         tsp_solver = algorithm(**args)
-        tsp_solver.run()
+
+        def cancel(*_):
+            tsp_solver.cancel()
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+
+        signal.signal(signal.SIGINT, cancel)
+
+        if not headless:
+            from utils.plot import plot  # imported on demand, so that matplotlib is not needed in headless mode
+            tsp_solver.attach(plot.PlotObserver())
+
+        if metrics_file:
+            tsp_solver.attach(metrics.MetricsObserver(metrics_file))
+
+        if profile or trace_memory:
+            with metrics.Profiler(cpu=profile, memory=trace_memory) as profiler:
+                tsp_solver.run(polish, time_limit, max_evaluations)
+            print(profiler.report())
+        else:
+            tsp_solver.run(polish, time_limit, max_evaluations)
+
+    @staticmethod
+    def run_multi_start(algorithm, args, restarts, workers=None, seed=None, polish=False, metrics_file=None,
+                        time_limit=None, max_evaluations=None):
+        """
+        Run a number of restarts of the algorithm in parallel given its constructor arguments, and report the best one
+        """
+        runner = MultiStartRunner(algorithm, restarts=restarts, workers=workers, seed=seed, polish=polish,
+                                  time_limit=time_limit, max_evaluations=max_evaluations, **args)
+        print(f'\nRunning {restarts} restarts of {algorithm.__doc__} with {runner.workers} workers\n')
+
+        result = runner.run()
+
+        for key, value in result.get_statistics().items():
+            print(f'{key}: {round(value, 2)}')
+
+        if metrics_file:
+            with open(metrics_file, 'w', encoding='utf-8') as out_file:
+                json.dump([{'seed': seed, 'cost': restart.cost, 'cycles': restart.cycles,
+                            'wall_time': restart.wall_time, 'stop_reason': restart.stop_reason,
+                            'metrics': restart.metrics}
+                           for seed, restart in zip(result.seeds, result.results)], out_file, indent=2)
 
     @staticmethod
     def get_algorithm_args(parser, algo_select):
         """
-        Get constructor arguments from the selected algorithm.
+        Get constructor arguments from the selected algorithm. The seed is given by the main parser instead (--seed).
         """
         constructor_args_dict = dict(zip(inspect.getfullargspec(algo_select.__init__).args[1:], inspect.getfullargspec(algo_select.__init__).defaults))
 
         for arg, default in constructor_args_dict.items():
+            if arg == 'seed':
+                continue
+
             if isinstance(default, int):
                 parser.add_argument(f'--{arg}', action='store', help=str(default), type=int, default=default)
 
+            elif isinstance(default, float):
+                parser.add_argument(f'--{arg}', action='store', help=str(default), type=float, default=default)
+
             else:
                 parser.add_argument(f'--{arg}', action='store', help=str(default), default=default)
 
@@ -0,0 +1,160 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+import os
+import statistics
+import time
+import numpy as np
+
+from algorithm import Result
+from utils.distances import distances
+from utils.matrix import matrix
+from utils.rng import rng
+
+# Search space of the worker process, attached once to the shared memory by init_worker()
+_worker_matrix = None
+_worker_shared_memory = None
+
+
+@dataclass
+class MultiStartResult:
+    """
+    Result of running several independent restarts of an algorithm.
+    """
+    best: Result
+    results: list = field(default_factory=list)  # Result of each restart, in order of seeds
+    seeds: list = field(default_factory=list)
+    wall_time: float = 0.0
+
+    @property
+    def costs(self):
+        return [result.cost for result in self.results]
+
+    def get_statistics(self):
+        """
+        Get the statistics of the costs and wall times of all the restarts.
+        """
+        costs = self.costs
+        times = [result.wall_time for result in self.results]
+
+        return {
+            'restarts': len(self.results),
+            'best_cost': min(costs),
+            'mean_cost': statistics.mean(costs),
+            'std_cost': statistics.pstdev(costs),
+            'worst_cost': max(costs),
+            'mean_run_time': statistics.mean(times),
+            'wall_time': self.wall_time
+        }
+
+
+class SharedMatrix:
+    """
+    Distance matrix copied once into shared memory, so that worker processes map it without copying or pickling it.
+    To be used as a context manager: the shared memory is released on exit.
+
+    With the condensed distance backend, its array of distances is shared instead. The distance oracle has no array of
+    distances, so only its coordinates are given to the workers.
+    """
+    def __init__(self, search_space):
+        self.search_space = search_space
+
+        if isinstance(search_space.matrix, distances.CondensedDistance):
+            array = search_space.matrix.data
+        elif isinstance(search_space.matrix, distances.Distance):
+            array = np.empty(0)
+        else:
+            array = np.ascontiguousarray(search_space.matrix)
+
+        self.shared_memory = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        shared = np.ndarray(array.shape, dtype=array.dtype, buffer=self.shared_memory.buf)
+        shared[:] = array
+
+        self.descriptor = (self.shared_memory.name, array.shape, array.dtype.str, search_space.coord_list,
+                           search_space.distance, len(search_space.matrix))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.shared_memory.close()
+        self.shared_memory.unlink()
+
+    @staticmethod
+    def attach(descriptor):
+        """
+        Attach to the shared memory described by the given descriptor.
+
+        :returns: tuple (shared memory, Matrix whose distances are a view of the shared memory)
+        """
+        name, shape, dtype, coord_list, distance, nodes = descriptor
+        shared = shared_memory.SharedMemory(name=name)
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shared.buf)
+        array.flags.writeable = False
+
+        if distance == 'condensed':
+            array = distances.CondensedDistance(array, nodes)
+        elif distance == 'oracle':
+            array = distances.CoordinateDistance(coord_list)
+
+        return shared, matrix.Matrix(coord_list=coord_list, matrix=array, distance=distance)
+
+
+def init_worker(descriptor):
+    """
+    Initialise a worker process by attaching it to the shared distance matrix.
+    """
+    global _worker_matrix, _worker_shared_memory
+    _worker_shared_memory, _worker_matrix = SharedMatrix.attach(descriptor)
+
+
+def run_restart(algorithm, seed, kwargs, polish=False, time_limit=None, max_evaluations=None):
+    """
+    Solve the search space of the worker process with the given algorithm, seeded with the given seed, within the
+    given budget (see Algorithm.solve()).
+    """
+    return algorithm(file=_worker_matrix, seed=seed, **kwargs).solve(polish, time_limit, max_evaluations)
+
+
+class MultiStartRunner:
+    """
+    Run a number of independent restarts of a (stochastic) algorithm, each one with its own seed, across a pool of
+    worker processes, and keep the best result.
+
+    The search space is loaded (and its distance matrix computed) only once. The matrix is then shared with the workers
+    through shared memory, instead of being pickled to every process.
+
+    The time limit and the maximum number of evaluations, if given, apply to each restart.
+    """
+    def __init__(self, algorithm, restarts=8, workers=None, seed=None, file='', polish=False, time_limit=None,
+                 max_evaluations=None, **kwargs):
+        self.algorithm = algorithm
+        self.restarts = restarts
+        self.polish = polish
+        self.time_limit = time_limit
+        self.max_evaluations = max_evaluations
+        self.workers = workers or min(restarts, os.cpu_count() or 1)
+        self.search_space = file if isinstance(file, matrix.Matrix) else matrix.Matrix(file)
+        self.kwargs = kwargs
+
+        # Independent seed for each restart
+        self.seeds = rng.spawn_seeds(seed, restarts)
+
+    def run(self):
+        """
+        Run all the restarts.
+
+        :returns: MultiStartResult
+        """
+        start = time.perf_counter()
+
+        with SharedMatrix(self.search_space) as shared_matrix, \
+                ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker,
+                                    initargs=(shared_matrix.descriptor,)) as executor:
+            futures = [executor.submit(run_restart, self.algorithm, seed, self.kwargs, self.polish, self.time_limit,
+                                       self.max_evaluations) for seed in self.seeds]
+            results = [future.result() for future in futures]
+
+        best = min(results, key=lambda result: result.cost)
+
+        return MultiStartResult(best=best, results=results, seeds=self.seeds, wall_time=time.perf_counter() - start)
@@ -0,0 +1,143 @@
+import numpy as np
+
+from chromosome import Chromosome
+from utils.fingerprint import fingerprint
+
+# Number of chromosomes evaluated at once, so that the temporary array of edge costs stays bounded.
+EVALUATION_BLOCK_SIZE = 4096
+
+
+class Population:
+    """
+    This class represents the population of chromosomes for GA in a compact form. Instead of keeping a Chromosome object
+    (and two Python lists) per individual, the tours and their ordinal representations are stored row by row in two
+    contiguous 2-D arrays of integers, while costs, fitness scores and the elite flags are stored in 1-D arrays.
+
+    Every chromosome is then referred to by its row index, so that the stages of GA (selection, crossover and mutation)
+    operate on arrays of indexes. A Chromosome object can still be obtained from any row with get_chromosome().
+
+    Optionally, a FingerprintCache shared across generations avoids evaluating again the tours already seen. The number
+    of tours actually evaluated is kept in evaluated.
+    """
+    def __init__(self, matrix, tours, ordinals=None, costs=None, elite_parents=None, cache=None):
+        self.matrix = matrix
+        self.cache = cache
+        self.evaluated = 0
+        self.tours = np.asarray(tours, dtype=np.int32).reshape(-1, len(matrix))
+        self.ordinals = self.encode(self.tours) if ordinals is None else np.asarray(ordinals, dtype=np.int32)
+        self.costs = self.evaluate(self.tours) if costs is None else np.asarray(costs, dtype=float)
+        self.fitness = np.zeros(len(self.tours))
+
+        if elite_parents is None:
+            elite_parents = np.zeros(len(self.tours), dtype=bool)
+        self.elite_parents = np.asarray(elite_parents, dtype=bool)
+
+    @classmethod
+    def from_ordinals(cls, matrix, ordinals, elite_parents=None, cache=None):
+        """
+        Create a population from the ordinal representation of its chromosomes.
+        """
+        ordinals = np.asarray(ordinals, dtype=np.int32)
+        return cls(matrix, cls.decode(ordinals), ordinals=ordinals, elite_parents=elite_parents, cache=cache)
+
+    def __len__(self):
+        return len(self.tours)
+
+    def evaluate(self, tours):
+        """
+        Calculate the cost of every given tour (one per row) based on the matrix of distances. If there is a cache, only
+        the tours not found in it are evaluated, and then stored in it.
+        """
+        if self.cache is None:
+            self.evaluated += len(tours)
+            return self.evaluate_tours(tours)
+
+        fingerprints = fingerprint.get_fingerprints(tours)
+        costs = self.cache.lookup(fingerprints)
+
+        if len(missing := np.flatnonzero(np.isnan(costs))):
+            costs[missing] = self.evaluate_tours(tours[missing])
+            self.cache.store([fingerprints[i] for i in missing], costs[missing])
+        self.evaluated += len(missing)
+
+        return costs
+
+    def evaluate_tours(self, tours):
+        """
+        Calculate the cost of every given tour (one per row) based on the matrix of distances, in blocks of rows.
+        """
+        costs = np.empty(len(tours))
+        for start in range(0, len(tours), EVALUATION_BLOCK_SIZE):
+            block = tours[start:start + EVALUATION_BLOCK_SIZE]
+            costs[start:start + EVALUATION_BLOCK_SIZE] = self.matrix[block, np.roll(block, -1, axis=1)].sum(axis=1)
+
+        return costs
+
+    def get_unique_rows(self):
+        """
+        Get the rows of the first occurrence of each different tour. Tours are compared by their fingerprint, so that
+        the same cycle with a different starting node or direction is also a duplicate.
+        """
+        seen = set()
+        unique_rows = []
+        for row, tour_fingerprint in enumerate(fingerprint.get_fingerprints(self.tours)):
+            if tour_fingerprint not in seen:
+                seen.add(tour_fingerprint)
+                unique_rows.append(row)
+
+        return unique_rows
+
+    def reorder(self, rows):
+        """
+        Keep only the chromosomes at the given rows, in the given order. Rows can be repeated.
+        """
+        self.tours = self.tours[rows]
+        self.ordinals = self.ordinals[rows]
+        self.costs = self.costs[rows]
+        self.fitness = self.fitness[rows]
+        self.elite_parents = self.elite_parents[rows]
+
+        return self
+
+    def extend(self, population):
+        """
+        Add the chromosomes of another population at the end of this one.
+        """
+        self.tours = np.concatenate((self.tours, population.tours))
+        self.ordinals = np.concatenate((self.ordinals, population.ordinals))
+        self.costs = np.concatenate((self.costs, population.costs))
+        self.fitness = np.concatenate((self.fitness, population.fitness))
+        self.elite_parents = np.concatenate((self.elite_parents, population.elite_parents))
+
+        return self
+
+    def update_ordinals(self, rows):
+        """
+        Encode again the tours at the given rows after they have been modified in place.
+        """
+        self.ordinals[rows] = self.encode(self.tours[rows])
+
+    def get_chromosome(self, row):
+        """
+        Get the chromosome stored at the given row.
+        """
+        chromosome = Chromosome(self.matrix, tour=self.tours[row].tolist(), ordinal=self.ordinals[row].tolist(),
+                                elite=bool(self.elite_parents[row]), cost=float(self.costs[row]))
+        chromosome.fitness = float(self.fitness[row])
+
+        return chromosome
+
+    # functional methods
+    @staticmethod
+    def encode(tours):
+        """
+        Encode every given tour (one per row) to ordinal representation
+        """
+        return Chromosome.encode_tours(tours)
+
+    @staticmethod
+    def decode(ordinals):
+        """
+        Decode every given ordinal representation (one per row) to the tour of nodes
+        """
+        return Chromosome.decode_ordinals(ordinals)
@@ -0,0 +1,527 @@
+import argparse
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import signal
+import threading
+import numpy as np
+
+from main import algorithms
+from utils.definitions.definitions import get_abs_path
+from utils.distances import distances
+from utils.matrix import matrix
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Maximum number of jobs waiting for a worker. Once reached, the requests of the clients are not read any further
+# until a job starts (backpressure).
+MAX_PENDING = 64
+
+# Minimum time between two updates of the best tour of a job sent to its client, in seconds
+PROGRESS_INTERVAL = 0.5
+
+# Number of search spaces (with their distance matrix) kept in memory by each worker
+SEARCH_SPACE_CACHE = 16
+
+# Maximum size of a message (one line of JSON), e.g. the coordinates of a large search space
+MAX_MESSAGE_SIZE = 64 * 2 ** 20
+
+# State of the worker process, set once by init_worker()
+_progress_queue = None
+_cancelled = None
+_search_spaces = OrderedDict()
+
+
+def init_worker(progress_queue, cancelled):
+    """
+    Initialise a worker process with the queue where it reports the progress of its jobs and the (shared) cancellation
+    flags of the jobs running, one per dispatcher of the service (see SolverService.run()).
+    """
+    global _progress_queue, _cancelled
+    _progress_queue, _cancelled = progress_queue, cancelled
+
+
+def warm_up():
+    """
+    Task run once per worker at start, so that the worker processes (and the imports of the algorithms) are ready
+    before the first job arrives.
+    """
+    return os.getpid()
+
+
+def get_search_space_key(job):
+    """
+    Get the key of the search space of a job in the cache of the workers: the name of its file with its modification
+    time and size (so that a file edited while the service runs is loaded again), or the hash of its coordinates or
+    distances, along with the distance backend.
+    """
+    distance = job.get('distance', 'dense')
+    if 'file' in job:
+        try:
+            stat = os.stat(get_abs_path('data', job['file']))
+        except OSError:  # missing file, reported when loading it
+            return 'file', job['file'], None, None, distance
+        return 'file', job['file'], stat.st_mtime_ns, stat.st_size, distance
+
+    source = 'coordinates' if 'coordinates' in job else 'distances'
+    digest = hashlib.blake2b(json.dumps(job[source]).encode(), digest_size=16).hexdigest()
+    return source, digest, distance
+
+
+def get_search_space(job):
+    """
+    Get the search space of a job: a file of the data folder (file), a list of coordinates (coordinates) or a matrix
+    of distances (distances). The last search spaces used are kept in memory, so that the jobs on the same search space
+    do not load it and compute its distances again. Files are also cached on disk (see utils.instance_cache).
+    """
+    key = get_search_space_key(job)
+    if key in _search_spaces:
+        _search_spaces.move_to_end(key)
+        return _search_spaces[key]
+
+    distance = job.get('distance', 'dense')
+    if 'file' in job:
+        search_space = matrix.Matrix(job['file'], distance=distance)
+    elif 'coordinates' in job:
+        search_space = matrix.Matrix(coord_list=job['coordinates'], distance=distance)
+    else:
+        search_space = matrix.Matrix(matrix=job['distances'], distance=distance)
+
+    _search_spaces[key] = search_space
+    if len(_search_spaces) > SEARCH_SPACE_CACHE:
+        _search_spaces.popitem(last=False)
+
+    return search_space
+
+
+def run_job(key, slot, job, time_limit=None, interval=PROGRESS_INTERVAL):
+    """
+    Solve a job in the worker process. While the algorithm runs, a thread reports its best tour so far and cancels it
+    once the cancellation flag of its slot is set (see watch_job()).
+
+    :returns: dictionary with the Result of the algorithm
+    """
+    algorithm = algorithms[job['algorithm']](file=get_search_space(job), seed=job.get('seed'), **job.get('args', {}))
+
+    done = threading.Event()
+    watcher = threading.Thread(target=watch_job, args=(key, slot, algorithm, done, interval, job.get('progress', True)),
+                               daemon=True)
+    watcher.start()
+    try:
+        result = algorithm.solve(job.get('polish', False), time_limit, job.get('max_evaluations'))
+    finally:
+        done.set()
+        watcher.join()
+
+    return asdict(result)
+
+
+def watch_job(key, slot, algorithm, done, interval, progress=True):
+    """
+    Every interval seconds until done, cancel the algorithm if its job has been cancelled, and report its best tour so
+    far (see Algorithm.snapshot()) if it has improved since the last report.
+    """
+    best_cost = None
+    while not done.wait(interval):
+        if _cancelled[slot]:
+            algorithm.cancel()
+
+        if progress and (snapshot := algorithm.snapshot()) is not None and \
+                (best_cost is None or snapshot.cost < best_cost):
+            best_cost = snapshot.cost
+            _progress_queue.put((key, {'cost': snapshot.cost, 'tour': [int(i) for i in snapshot.tour],
+                                       'cycles': snapshot.cycles, 'wall_time': snapshot.wall_time}))
+
+
+class JobError(ValueError):
+    """
+    Malformed job or message sent by a client, reported to the client as an error.
+    """
+
+
+def check_job(job):
+    """
+    Check that a job is well-formed before queueing it. Jobs come from the network, so they are checked explicitly
+    rather than with asserts (which are removed when running with -O).
+
+    :raises JobError: if the job is malformed
+    """
+    if not isinstance(job, dict):
+        raise JobError('Each job must be a JSON object')
+    if not is_job_id(job.get('id', 0)):
+        raise JobError(f'The id of a job must be a string or an integer. Id given: {job["id"]}')
+    if job.get('algorithm') not in algorithms:
+        raise JobError(f'Unknown algorithm: {job.get("algorithm")}. To choose from: {", ".join(algorithms)}')
+
+    sources = [source for source in ('file', 'coordinates', 'distances') if source in job]
+    if len(sources) != 1:
+        raise JobError('Each job needs one search space: file, coordinates or distances')
+    if 'file' in job and not isinstance(job['file'], str):
+        raise JobError('The file of a job must be a string')
+    if not isinstance(job.get('coordinates', job.get('distances', [])), list):
+        raise JobError(f'The {sources[0]} of a job must be a list')
+
+    if job.get('distance', 'dense') not in distances.DISTANCES:
+        raise JobError(f'Unknown distance backend: {job.get("distance")}. To choose from: '
+                       f'{", ".join(distances.DISTANCES)}')
+    if not isinstance(job.get('args', {}), dict) or {'file', 'seed'} & set(job.get('args', {})):
+        raise JobError('The arguments of the algorithm (args) must be an object, without file nor seed')
+    if not isinstance(job.get('seed'), (int, type(None))) or isinstance(job.get('seed'), bool):
+        raise JobError(f'The seed of a job must be an integer. Seed given: {job.get("seed")}')
+
+    for limit in ('time_limit', 'max_evaluations'):
+        value = job.get(limit)
+        if value is not None and (not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0):
+            raise JobError(f'The {limit} of a job must be a positive number. Value given: {value}')
+
+
+def is_job_id(job_id):
+    """
+    Whether the given value can be the id of a job (a string or an integer).
+    """
+    return isinstance(job_id, (str, int)) and not isinstance(job_id, bool)
+
+
+def encode(message):
+    """
+    Encode a message as a line of JSON.
+    """
+    def to_builtin(value):
+        if isinstance(value, (np.generic, np.ndarray)):
+            return value.tolist()
+        raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+    return (json.dumps(message, default=to_builtin) + '\n').encode()
+
+
+class Client:
+    """
+    Connection of a client to the service, with the jobs it has submitted that have not finished yet (by job id).
+    """
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.lock = asyncio.Lock()
+        self.jobs = {}
+
+    async def send(self, message):
+        """
+        Send a message to the client, waiting until the client reads it if its buffer is full. The messages to a client
+        that has disconnected are dropped.
+        """
+        async with self.lock:
+            if self.writer.is_closing():
+                return
+            try:
+                self.writer.write(encode(message))
+                await self.writer.drain()
+            except ConnectionError:
+                pass
+
+
+@dataclass(eq=False)
+class Job:
+    """
+    Job submitted by a client: the algorithm to run on a search space (spec), and its latest progress not sent yet.
+    """
+    key: int  # unique in the service, whereas the id is given by the client
+    id: object
+    spec: dict
+    client: Client
+    time_limit: float = None
+    slot: int = None  # dispatcher running the job, whose cancellation flag it watches
+    progress: dict = None
+    updated: asyncio.Event = field(default_factory=asyncio.Event)
+    cancelled: bool = False
+
+
+class SolverService:
+    """
+    Long-running service that solves the jobs sent by its clients with the algorithms, over TCP or a Unix socket.
+
+    The protocol is made of JSON messages, one per line. A client sends batches of jobs to solve:
+
+        {"type": "solve", "jobs": [{"id": 1, "algorithm": "sa", "file": "TSP_50_nodes.csv", "seed": 7,
+                                    "args": {"operator": "two_opt"}, "time_limit": 5}, ...]}
+
+    and can cancel a job with {"type": "cancel", "id": 1}. The search space of a job is a file of the data folder
+    (file), a list of coordinates (coordinates) or a matrix of distances (distances). Optionally, a job takes a distance
+    backend (distance), a maximum number of evaluations (max_evaluations), polish and progress (false not to receive
+    the progress of the job).
+
+    For each job, the service answers {"type": "queued", "id": ...} once it is queued, then {"type": "progress", ...}
+    with the best tour so far while it runs (at most every interval seconds), and finally {"type": "result", ...} with
+    the Result of the algorithm, or {"type": "error", ...}.
+
+    The jobs are run by a pool of worker processes started once, which keep the last search spaces used in memory. A
+    bounded queue of pending jobs applies backpressure: once it is full, the requests of the clients are not read until
+    a job starts. Progress updates are conflated, so that a slow client only receives the latest one. The time limit of
+    each job is capped by the time limit of the service, if any. The jobs of a client that disconnects are cancelled.
+    """
+    def __init__(self, workers=None, max_pending=MAX_PENDING, time_limit=None, interval=PROGRESS_INTERVAL):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.time_limit = time_limit
+        self.interval = interval
+
+        self.context = multiprocessing.get_context('spawn')
+        self.keys = itertools.count()
+        self.jobs = {}  # jobs running, by key
+        self.clients = {}  # task handling each client, by client
+        self.tasks = set()
+
+        self.loop = None
+        self.queue = None
+        self.pool = None
+        self.cancelled = None
+        self.progress_queue = None
+        self.stopping = None
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None):
+        """
+        Start the workers and serve the clients on the given host and port, or on the given Unix socket (path), until
+        stop() is called (or SIGINT or SIGTERM are received). The jobs running are then cancelled.
+        """
+        self.loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self.loop.add_signal_handler(signal_number, self.stop)
+            except (NotImplementedError, RuntimeError):  # not supported in this platform, or not in the main thread
+                pass
+
+        self.queue = asyncio.Queue(self.max_pending)
+        self.cancelled = self.context.RawArray('b', self.workers)
+        self.progress_queue = self.context.Queue()
+        self.pool = self.create_pool()
+
+        reader = threading.Thread(target=self.read_progress, daemon=True)
+        reader.start()
+        dispatchers = [asyncio.create_task(self.dispatch(slot)) for slot in range(self.workers)]
+
+        try:
+            await asyncio.gather(*[self.loop.run_in_executor(self.pool, warm_up) for _ in range(self.workers)])
+
+            if path:
+                server = await asyncio.start_unix_server(self.handle_client, path, limit=MAX_MESSAGE_SIZE)
+            else:
+                server = await asyncio.start_server(self.handle_client, host, port, limit=MAX_MESSAGE_SIZE)
+
+            print(f'Serving on {path or f"{host}:{port}"} with {self.workers} workers')
+            async with server:
+                await self.stopping.wait()
+                for client in self.clients:
+                    client.writer.close()
+                await asyncio.gather(*self.clients.values(), return_exceptions=True)
+        finally:
+            running = [job.slot for job in self.jobs.values()]
+            for dispatcher in dispatchers:
+                dispatcher.cancel()
+            await asyncio.gather(*dispatchers, return_exceptions=True)
+
+            for slot in running:
+                self.cancelled[slot] = True
+            self.pool.shutdown(cancel_futures=True)
+            self.progress_queue.put(None)
+            reader.join()
+            if path and os.path.exists(path):
+                os.unlink(path)
+
+    def stop(self):
+        self.stopping.set()
+
+    def create_pool(self):
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=self.context, initializer=init_worker,
+                                   initargs=(self.progress_queue, self.cancelled))
+
+    async def handle_client(self, reader, writer):
+        """
+        Read the messages of a client until it disconnects, then cancel its jobs.
+        """
+        client = Client(reader, writer)
+        self.clients[client] = asyncio.current_task()
+        try:
+            while line := await reader.readline():
+                try:
+                    message = json.loads(line)
+                except ValueError as err:
+                    await client.send({'type': 'error', 'error': f'Invalid JSON: {err}'})
+                    continue
+
+                await self.handle_message(client, message)
+        except (ConnectionError, ValueError):  # disconnected or message too long
+            pass
+        finally:
+            for job in list(client.jobs.values()):
+                self.cancel(job)
+            self.clients.pop(client, None)
+            writer.close()
+
+    async def handle_message(self, client, message):
+        if not isinstance(message, dict) or message.get('type') not in ('solve', 'cancel'):
+            await client.send({'type': 'error', 'error': 'Unknown message. Types of message: solve, cancel'})
+
+        elif message['type'] == 'cancel':
+            if is_job_id(message.get('id')) and (job := client.jobs.get(message['id'])) is not None:
+                self.cancel(job)
+
+        elif not isinstance(message.get('jobs', []), list):
+            await client.send({'type': 'error', 'error': 'The jobs of a solve message must be a list'})
+
+        else:
+            for spec in message.get('jobs', []):
+                await self.submit(client, spec)
+
+    async def submit(self, client, spec):
+        """
+        Queue a job, waiting for a free place in the queue if it is full.
+        """
+        key = next(self.keys)
+        job_id = spec.get('id', key) if isinstance(spec, dict) else None
+
+        try:
+            check_job(spec)
+            if job_id in client.jobs:
+                raise JobError(f'There is already a job with id {job_id}')
+        except JobError as err:
+            await client.send({'type': 'error', 'id': job_id, 'error': str(err)})
+            return
+
+        limits = [limit for limit in (spec.get('time_limit'), self.time_limit) if limit]
+        job = Job(key=key, id=job_id, spec=spec, client=client, time_limit=min(limits, default=None))
+
+        client.jobs[job_id] = job
+        await self.queue.put(job)
+        await client.send({'type': 'queued', 'id': job_id})
+
+    def cancel(self, job):
+        """
+        Cancel a job: it is skipped if it has not started yet, otherwise the algorithm is stopped (see watch_job()). The
+        flag is set in shared memory, so that the event loop never waits for the workers.
+        """
+        job.cancelled = True
+        if job.key in self.jobs:
+            self.cancelled[job.slot] = True
+
+    async def dispatch(self, slot):
+        """
+        Run the jobs of the queue one after another in a worker. There is one dispatcher per worker, each one with its
+        own slot in the cancellation flags.
+        """
+        while True:
+            job = await self.queue.get()
+            if job.cancelled:
+                job.client.jobs.pop(job.id, None)
+                await job.client.send({'type': 'error', 'id': job.id, 'error': 'Cancelled before starting'})
+                continue
+
+            await self.run(job, slot)
+
+    async def run(self, job, slot):
+        """
+        Run a job in a worker, forwarding its progress to its client while it runs. The result is then sent by a task
+        of its own, so that the worker gets the next job even if the client is slow to read it.
+
+        The job watches the cancellation flag of the slot of its dispatcher, cleared before it starts: the previous job
+        of the slot has finished by then, so that a flag set for it does not cancel the next one.
+        """
+        job.slot = slot
+        self.cancelled[slot] = False
+        self.jobs[job.key] = job
+        forward = asyncio.create_task(self.forward_progress(job))
+        pool = self.pool
+
+        try:
+            result = await self.loop.run_in_executor(pool, run_job, job.key, slot, job.spec, job.time_limit,
+                                                     self.interval)
+            message = {'type': 'result', 'id': job.id, **result}
+        except BrokenProcessPool:
+            # A worker has died (e.g. out of memory): the pool is started again for the next jobs, only once
+            if self.pool is pool:
+                pool.shutdown(wait=False)
+                self.pool = self.create_pool()
+            message = {'type': 'error', 'id': job.id, 'error': 'The worker running the job has died'}
+        except Exception as err:  # any error of the algorithm (e.g. wrong arguments) is reported to the client
+            message = {'type': 'error', 'id': job.id, 'error': f'{type(err).__name__}: {err}'}
+        finally:
+            forward.cancel()
+            del self.jobs[job.key]
+            job.client.jobs.pop(job.id, None)
+
+        task = asyncio.create_task(job.client.send(message))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def forward_progress(self, job):
+        """
+        Send the progress of a job to its client whenever it is updated. Updates received while the previous one is
+        being sent replace each other, so that only the latest one is sent.
+        """
+        while True:
+            await job.updated.wait()
+            job.updated.clear()
+            await job.client.send({'type': 'progress', 'id': job.id, **job.progress})
+
+    def read_progress(self):
+        """
+        Thread that receives the progress reported by the workers and hands it over to the event loop.
+        """
+        while (item := self.progress_queue.get()) is not None:
+            self.loop.call_soon_threadsafe(self.update_progress, *item)
+
+    def update_progress(self, key, progress):
+        if (job := self.jobs.get(key)) is not None:
+            job.progress = progress
+            job.updated.set()
+
+
+async def request(jobs, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None):
+    """
+    Minimal client: send a batch of jobs to the service and yield the messages received until every job has finished.
+    """
+    if path:
+        reader, writer = await asyncio.open_unix_connection(path, limit=MAX_MESSAGE_SIZE)
+    else:
+        reader, writer = await asyncio.open_connection(host, port, limit=MAX_MESSAGE_SIZE)
+
+    try:
+        writer.write(encode({'type': 'solve', 'jobs': jobs}))
+        await writer.drain()
+
+        pending = len(jobs)
+        while pending and (line := await reader.readline()):
+            message = json.loads(line)
+            if message['type'] in ('result', 'error'):
+                pending -= 1
+            yield message
+    finally:
+        writer.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Service solving the TSP jobs sent by its clients (JSON lines over TCP '
+                                                 'or a Unix socket)')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix', default=None, help='Path of a Unix socket to serve on, instead of TCP')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes. By default: one per CPU')
+    parser.add_argument('--max_pending', type=int, default=MAX_PENDING, help='Maximum number of jobs waiting for a '
+                                                                             'worker')
+    parser.add_argument('--time_limit', type=float, default=None, help='Maximum time limit of each job in seconds')
+    parser.add_argument('--interval', type=float, default=PROGRESS_INTERVAL, help='Minimum time between two progress '
+                                                                                  'updates of a job in seconds')
+    args = parser.parse_args()
+
+    service = SolverService(args.workers, args.max_pending, args.time_limit, args.interval)
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
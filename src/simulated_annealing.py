@@ -1,6 +1,5 @@
-import random
 import math
-import matplotlib.pyplot as plt
+import time
 
 from algorithm import Algorithm
 
@@ -8,12 +7,13 @@ from algorithm import Algorithm
 class SimulatedAnnealing(Algorithm):
     """Simulated Annealing Algorithm"""
     def __init__(self, file='', stop=100, operator="inversion", t_max=10, t_min=0.0005, alpha=0.995,
-                 cooling_schedule='slow'):
-        super().__init__(file, stop, operator)
+                 cooling_schedule='slow', init='random', seed=None):
+        super().__init__(file, stop, operator, init, seed)
         self.t_max = t_max
         self.t_min = t_min
         self.current_temp = t_max
         self.alpha = alpha
+        self.cooling_schedule = cooling_schedule
 
         self.cooling_schedules_dict = {
             'linear': lambda: self.current_temp - self.alpha,
@@ -22,54 +22,76 @@ class SimulatedAnnealing(Algorithm):
             'exp_mult': lambda: self.current_temp * math.pow(self.alpha, self.cycles),
             'linear_mult': lambda: self.current_temp / (1 + self.alpha * self.cycles),
             'quad_mult': lambda: self.current_temp / (1 + self.alpha * math.pow(self.cycles, 2)),
-            'log_mult': lambda: self.current_temp / (1 + self.alpha * math.log(1 + self.cycles))
+            'log_mult': lambda: self.current_temp / (1 + self.alpha * math.log(1 + self.cycles)),
+            'budget': lambda: self.t_max * math.pow(self.t_min / self.t_max, self.budget.get_progress(self.cycles))
         }
 
         self.decrease_temperature = self.cooling_schedules_dict.get(cooling_schedule)
 
-    def run(self):
+    def search(self):
         """
         Run the Simulated Annealing algorithm to stop when T < Tmin.
         The algorithm generates candidates based on the selected neighbourhood
         operator and will tend to accept less bad moves over time,
         according to the acceptance probability.
+
+        With the budget cooling schedule, the temperature is fitted to the budget of the run (time limit and/or maximum
+        number of evaluations) instead of decreasing by alpha at each iteration: it decreases geometrically from Tmax to
+        Tmin as the budget is used, reaching Tmin when it is exhausted, whatever the speed of the iterations. The run
+        then ends with the budget, not after a number of iterations without accepting any move.
         """
-        print(f'\nRunning {self.__doc__}. Stopping if no improvement after {self.stop} iterations \n')
+        assert self.cooling_schedule != 'budget' or self.budget.limited, \
+            'The budget cooling schedule needs a time limit or a maximum number of evaluations'
+
         best_solution = self.generate_init_candidate()
         best_cost = self.evaluate_solution(best_solution)
         self.current_temp = self.t_max
         cost_candidates = [best_cost]
+        self.notify(best_solution, best_cost)
 
-        plt.rcParams["figure.figsize"] = (10, 8)
-        plt.tight_layout()
+        # Metrics of the loop, added up locally and reported once it ends, so that instrumenting it is cheap
+        accepted, move_time, accept_time = 0, 0.0, 0.0
+        cycles = self.cycles
+        stop = math.inf if self.cooling_schedule == 'budget' else self.stop
 
         count = 0
-        while self.t_min < self.current_temp and count < self.stop:
-            solution_candidate = self.n_op.generate_candidate_solution(best_solution.copy())
-            cost_candidate = self.evaluate_solution(solution_candidate)
+        while self.t_min < self.current_temp and count < stop:
+            start = time.perf_counter()
+            if self.should_stop(self.cycles - cycles, start):
+                break
+
+            move, delta = self.n_op.generate_candidate_move(best_solution, self.matrix.matrix)
+            cost_candidate = best_cost + delta
+            generated = time.perf_counter()
+            move_time += generated - start
 
             acc_prob = self.calculate_acceptance_probability(best_cost, cost_candidate)
 
-            if acc_prob > random.random():
-                best_solution = solution_candidate.copy()
+            if acc_prob > self.random_stream.random():
+                self.n_op.apply_move(best_solution, move)
                 best_cost = cost_candidate
                 cost_candidates.append(cost_candidate)
 
-                plt.cla()
-                self.plot_path(best_solution, f'{self.__doc__} using {self.n_op.__doc__}',
-                               f'Iteration: {self.cycles} \nCost: {round(best_cost)}')
-                plt.pause(0.05)
+                self.notify(best_solution, best_cost)
+                accepted += 1
                 count = 0
 
+            accept_time += time.perf_counter() - generated
+
             self.cycles += 1
             count += 1
 
             self.current_temp = self.decrease_temperature()
 
-        plt.show(block=True)
+        iterations = self.cycles - cycles
+        self.metrics.count('operator_calls', iterations)
+        self.metrics.count('evaluations', iterations)
+        self.metrics.count('accepted', accepted)
+        self.metrics.count('rejected', iterations - accepted)
+        self.metrics.add_time('move', move_time, iterations)
+        self.metrics.add_time('accept', accept_time, iterations)
 
-        self.plot_convergence(cost_candidates, f'{self.__doc__} minimisation convergence',
-                              x_label=f'Total iterations: {self.cycles}', y_label='Cost')
+        return best_solution, best_cost, cost_candidates
 
     def calculate_acceptance_probability(self, cost_1, cost_2):
         """
@@ -1,67 +1,102 @@
-import matplotlib.pyplot as plt
-
 from algorithm import Algorithm
+from utils.neighbourhood import neighbourhood
+from utils.tabu_memory import tabu_memory
 
 
 class TabuSearch(Algorithm):
     """Tabu Search Algorithm"""
-    def __init__(self, file='', stop=100, operator="inversion", tabu_size=20):
-        super().__init__(file, stop, operator)
+    def __init__(self, file='', stop=100, operator="inversion", tabu_size=20, neighbourhood='swap', init='random',
+                 seed=None):
+        super().__init__(file, stop, operator, init, seed)
         self.tabu_tenure = tabu_size
-        self.tabu_list = []
+        self.tabu_memory = tabu_memory.TabuMemory(tabu_size)
+        self.neighbourhood = neighbourhood
 
-    def run(self):
+    def search(self):
         """
-        Run the Tabu Search algorithm to stop when...
-        The algorithm generates candidates based on the selected neighbourhood
-        operator and will tend to accept less bad moves over time,
-        according to the acceptance probability.
+        Run the Tabu Search algorithm to stop when no better solution is found after a number of iterations.
+        At each iteration, the candidate solution is generated from the current one by applying the selected
+        neighbourhood operator (if it improves it) followed by the best move of the neighbourhood space that is not
+        tabu, even if it is worse. Tabu moves are only allowed if they improve the best solution (aspiration criterion),
+        and the most frequent moves are avoided once the search stagnates (diversification).
         """
-        print(f'\nRunning {self.__doc__}. Stopping if no improvement after {self.stop} iterations \n')
-        best_solution = self.generate_init_candidate()
-        best_cost = self.evaluate_solution(best_solution)
-        cost_best_candidate = best_cost
+        self.tabu_memory = tabu_memory.TabuMemory(self.tabu_tenure)
+        current_solution = self.generate_init_candidate()
+        current_cost = self.evaluate_solution(current_solution)
+        best_solution, best_cost = current_solution.copy(), current_cost
         cost_candidates = [best_cost]
-
-        plt.rcParams["figure.figsize"] = (10, 8)
-        plt.tight_layout()
+        self.notify(best_solution, best_cost)
 
         count = 0
-        while count < self.stop:
-            sol_best_candidate = self.n_op.generate_candidate_solution(best_solution.copy())
-
-            # Evaluate all possible solutions within the neighbourhood space
-            tabu_move = []
-            for i in range(len(sol_best_candidate) - 1):
-                solution_candidate = sol_best_candidate.copy()
-                solution_candidate[i], solution_candidate[i + 1] = solution_candidate[i + 1], solution_candidate[i]
-
-                if tabu_move not in self.tabu_list and \
-                        (cost_candidate := self.evaluate_solution(solution_candidate)) < cost_best_candidate:
-                    sol_best_candidate = solution_candidate.copy()
-                    cost_best_candidate = cost_candidate
-                    tabu_move = [solution_candidate[i], solution_candidate[i + 1]]
-
-            if cost_best_candidate < (best_cost := self.evaluate_solution(best_solution)):
-                best_solution = sol_best_candidate.copy()
+        while count < self.stop and not self.should_stop():
+            self.tabu_memory.step()
+
+            move, delta = self.n_op.generate_candidate_move(current_solution, self.matrix.matrix)
+            self.metrics.count('operator_calls')
+            self.metrics.count('evaluations')
+
+            if delta < 0:
+                self.n_op.apply_move(current_solution, move)
+                current_cost += delta
+                self.metrics.count('accepted')
+            else:
+                self.metrics.count('rejected')
+
+            # Evaluate all possible solutions within the neighbourhood space, applying the best admissible one
+            diversify = count > self.stop // 2
+            with self.metrics.timer('neighbourhood'):
+                move, delta = self.get_best_move(current_solution, current_cost, best_cost, diversify)
+            self.metrics.count('evaluations', neighbourhood.get_neighbourhood_size(self.nodes, self.neighbourhood))
+
+            if move is not None:
+                self.tabu_memory.add(*self.apply_neighbourhood_move(current_solution, move))
+                current_cost += delta
+                self.metrics.count('accepted')
+
+            if current_cost < best_cost:
+                best_solution = current_solution.copy()
+                best_cost = current_cost
                 cost_candidates.append(best_cost)
-                self.cycles += 1
                 count = 0
 
-                plt.cla()
-                self.plot_path(best_solution, f'{self.__doc__} using {self.n_op.__doc__}',
-                               f'Iteration: {self.cycles} \nCost: {round(cost_candidates[-1])}')
-                plt.pause(0.05)
+                self.notify(best_solution, best_cost)
 
-                self.tabu_list.append(tabu_move)
+            self.cycles += 1
+            count += 1
 
-            # Updating the tabu list so that old tabu moves can be accepted again
-            if len(self.tabu_list) > self.tabu_tenure:
-                self.tabu_list.pop(0)
+        return best_solution, best_cost, cost_candidates
 
-            count += 1
+    def get_best_move(self, tour, cost, best_cost, diversify=False):
+        """
+        Get the best admissible move of the neighbourhood ('swap' for exchanges of adjacent nodes or 'two_opt'). All the
+        moves are scored at once (see utils.neighbourhood).
+
+        :param diversify: avoid the moves made most frequently so far
+        :returns: tuple (move, delta) or (None, None)
+        """
+        def admissible(move, delta):
+            if cost + delta < best_cost:
+                return True
+
+            node_a, node_b = tour[move[0]], tour[move[1]]
+            return not self.tabu_memory.is_tabu(node_a, node_b) and \
+                not (diversify and self.tabu_memory.is_frequent(node_a, node_b))
+
+        if self.neighbourhood == 'two_opt':
+            return neighbourhood.get_best_inversion(tour, self.matrix.matrix, admissible)
 
-        plt.show(block=True)
+        return neighbourhood.get_best_swap(tour, self.matrix.matrix, admissible)
+
+    def apply_neighbourhood_move(self, tour, move):
+        """
+        Apply a move obtained from get_best_move() to the given tour in place.
+
+        :returns: the nodes of the move, to be made tabu
+        """
+        node_a, node_b = move
+        if self.neighbourhood == 'two_opt':
+            tour[node_a:node_b + 1] = tour[node_a:node_b + 1][::-1]
+        else:
+            tour[node_a], tour[node_b] = tour[node_b], tour[node_a]
 
-        self.plot_convergence(cost_candidates, f'{self.__doc__} minimisation convergence',
-                              x_label=f'Total iterations: {self.cycles}', y_label='Cost')
+        return [tour[node_a], tour[node_b]]
@@ -0,0 +1,70 @@
+import math
+import threading
+import time
+
+# Reasons why a run stops (see Budget.exhausted())
+CONVERGED = 'converged'  # stopping criterion of the algorithm (e.g. no improvement after a number of iterations)
+TIME_LIMIT = 'time_limit'
+MAX_EVALUATIONS = 'max_evaluations'
+CANCELLED = 'cancelled'
+
+
+class Budget:
+    """
+    Budget of a run of an algorithm: a wall-clock deadline (time_limit, in seconds) and/or a maximum number of
+    evaluations (max_evaluations), on top of the stopping criterion of the algorithm. None means no limit.
+
+    The run can also be cancelled from another thread through the given event (see Algorithm.cancel()). The algorithms
+    check the budget once per iteration and, once exhausted, stop with the best solution found so far.
+
+    The time is counted from start (perf_counter), by default the creation of the budget.
+    """
+    def __init__(self, time_limit=None, max_evaluations=None, cancelled=None, start=None):
+        assert time_limit is None or time_limit > 0, f'The time limit must be positive. Time limit given: {time_limit}'
+        assert max_evaluations is None or max_evaluations > 0, \
+            f'The maximum number of evaluations must be positive. Maximum given: {max_evaluations}'
+
+        self.time_limit = time_limit
+        self.max_evaluations = max_evaluations
+        self.cancelled = cancelled or threading.Event()
+        self.start = time.perf_counter() if start is None else start
+        self.deadline = math.inf if time_limit is None else self.start + time_limit
+        self.reason = None
+
+    @property
+    def limited(self):
+        """
+        Whether the run is limited by time or by number of evaluations.
+        """
+        return self.time_limit is not None or self.max_evaluations is not None
+
+    def get_elapsed_time(self):
+        return time.perf_counter() - self.start
+
+    def exhausted(self, evaluations=0, now=None):
+        """
+        Check whether the run has to stop, given the number of evaluations done so far. The reason is kept in reason.
+
+        :param now: current time (perf_counter), if already known by the caller
+        """
+        if self.cancelled.is_set():
+            self.reason = CANCELLED
+        elif (now or time.perf_counter()) >= self.deadline:
+            self.reason = TIME_LIMIT
+        elif self.max_evaluations is not None and evaluations >= self.max_evaluations:
+            self.reason = MAX_EVALUATIONS
+
+        return self.reason is not None
+
+    def get_progress(self, evaluations=0, now=None):
+        """
+        Get the fraction of the budget used so far (from 0 to 1): the highest of the fraction of the time limit elapsed
+        and the fraction of the maximum number of evaluations done.
+        """
+        progress = 0.0
+        if self.time_limit is not None:
+            progress = ((now or time.perf_counter()) - self.start) / self.time_limit
+        if self.max_evaluations is not None:
+            progress = max(progress, evaluations / self.max_evaluations)
+
+        return min(progress, 1.0)
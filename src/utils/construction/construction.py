@@ -0,0 +1,347 @@
+import numpy as np
+
+from ..neighbours import neighbours
+
+# Initial tours available, to choose from by name
+CONSTRUCTIONS = ('random', 'nearest_neighbour', 'greedy', 'christofides', 'hilbert')
+
+# Number of bits per axis of the grid on which the nodes are ordered along the Hilbert curve
+HILBERT_ORDER = 16
+
+
+def get_construction_by_name(construction_name):
+    """
+    Get the construction heuristic with the given name. All of them are called as construction(search_space,
+    random_stream), search_space being a Matrix and random_stream the one of the algorithm (see utils.rng).
+    """
+    construction_dict = {
+        'random': random_tour,
+        'nearest_neighbour': nearest_neighbour,
+        'greedy': greedy_edge,
+        'christofides': christofides,
+        'hilbert': hilbert_curve
+    }
+
+    assert construction_name in construction_dict, \
+        f'Unknown initial tour: {construction_name}. To choose from: {", ".join(CONSTRUCTIONS)}'
+    return construction_dict.get(construction_name)
+
+
+def random_tour(search_space, random_stream):
+    """
+    Random permutation of the nodes.
+
+    :returns: tour as a list of nodes
+    """
+    return random_stream.generator.permutation(len(search_space.matrix)).tolist()
+
+
+def nearest_neighbour(search_space, random_stream):
+    """
+    Nearest Neighbour: starting at a random node, the tour goes on to the nearest node not visited yet. The nearest
+    nodes are looked up in the candidate lists (see Matrix.get_neighbours(), built with a grid index from the
+    coordinates), and only when all the candidates of a node have been visited are the distances to every node not
+    visited yet computed. Tours are about 25% longer than the optimal ones.
+
+    :returns: tour as a list of nodes
+    """
+    matrix = search_space.matrix
+    nodes = len(matrix)
+    if nodes < 3:
+        return list(range(nodes))
+
+    candidates = search_space.get_neighbours().tolist()
+    visited = np.zeros(nodes, dtype=bool)
+
+    node = random_stream.randrange(nodes)
+    tour = [node]
+    visited[node] = True
+
+    for _ in range(nodes - 1):
+        for city in candidates[node]:
+            if not visited[city]:
+                break
+        else:
+            pending = np.flatnonzero(~visited)
+            city = int(pending[np.argmin(matrix[np.full(len(pending), node), pending])])
+
+        node = city
+        tour.append(node)
+        visited[node] = True
+
+    return tour
+
+
+def greedy_edge(search_space, random_stream=None):
+    """
+    Greedy Edge (greedy matching): the edges are added by increasing length, as long as no node gets more than two of
+    them and they do not close a cycle. Only the edges of the candidate lists are considered (O(N k log N k)), so some
+    fragments of the tour remain, which are then joined in nearest neighbour order. Tours are about 15-20% longer than
+    the optimal ones.
+
+    :returns: tour as a list of nodes
+    """
+    matrix = search_space.matrix
+    nodes = len(matrix)
+    if nodes < 3:
+        return list(range(nodes))
+
+    adjacent = [[] for _ in range(nodes)]
+    fragments = UnionFind(nodes)
+
+    for node_a, node_b in zip(*get_candidate_edges(search_space.get_neighbours(), matrix)):
+        if len(adjacent[node_a]) < 2 and len(adjacent[node_b]) < 2 and fragments.union(node_a, node_b):
+            adjacent[node_a].append(node_b)
+            adjacent[node_b].append(node_a)
+
+    join_fragments(matrix, adjacent)
+
+    return get_tour(adjacent)
+
+
+def christofides(search_space, random_stream=None):
+    """
+    Christofides-lite: the minimum spanning tree (Prim, O(N^2) computing a row of distances at a time) plus a greedy
+    matching of its nodes of odd degree (instead of a minimum-weight perfect matching) make an Eulerian multigraph,
+    whose Eulerian circuit is shortcut into a tour (skipping the nodes already visited).
+
+    :returns: tour as a list of nodes
+    """
+    matrix = search_space.matrix
+    nodes = len(matrix)
+    if nodes < 3:
+        return list(range(nodes))
+
+    # Minimum spanning tree
+    edges = []
+    in_tree = np.zeros(nodes, dtype=bool)
+    in_tree[0] = True
+    dist = np.array(matrix[0], dtype=float)
+    dist[0] = np.inf
+    parent = np.zeros(nodes, dtype=np.int64)
+
+    for _ in range(nodes - 1):
+        node = int(np.argmin(dist))
+        edges.append((int(parent[node]), node))
+        in_tree[node] = True
+        dist[node] = np.inf
+
+        row = np.asarray(matrix[node], dtype=float)
+        closer = (row < dist) & ~in_tree
+        dist[closer] = row[closer]
+        parent[closer] = node
+
+    # Greedy matching of the nodes of odd degree
+    degree = np.bincount(np.asarray(edges).ravel(), minlength=nodes)
+    edges.extend(get_greedy_matching(search_space, np.flatnonzero(degree % 2)))
+
+    # Eulerian circuit, shortcut into a tour
+    circuit = get_eulerian_circuit(edges, nodes)
+
+    return list(dict.fromkeys(circuit))
+
+
+def hilbert_curve(search_space, random_stream=None):
+    """
+    Space-filling curve: the nodes are visited in the order of their position along the Hilbert curve, which keeps
+    nodes close in the plane close in the tour. It takes O(N log N) and needs the coordinates of the nodes. Tours are
+    about 40% longer than the optimal ones (for uniformly distributed nodes), but they are built almost instantly.
+
+    :returns: tour as a list of nodes
+    """
+    assert search_space.coord_list is not None, 'The Hilbert curve needs the coordinates of the nodes.'
+
+    coord = np.asarray(search_space.coord_list, dtype=float)
+    side = 1 << HILBERT_ORDER
+
+    lower = coord.min(axis=0)
+    span = max(float((coord.max(axis=0) - lower).max()), np.finfo(float).tiny)
+    cells = ((coord - lower) / span * (side - 1)).astype(np.int64)
+    x_cell, y_cell = cells[:, 0], cells[:, 1]
+
+    # Distance of each node along the curve, from the most significant bit of the grid to the least significant one
+    distance = np.zeros(len(coord), dtype=np.int64)
+    bit = side >> 1
+    while bit > 0:
+        x_bit = (x_cell & bit) > 0
+        y_bit = (y_cell & bit) > 0
+        distance += bit * bit * ((3 * x_bit) ^ y_bit)
+
+        # Rotating the quadrant, so that the curve within it has the same orientation as the whole curve
+        flip = ~y_bit & x_bit
+        x_cell = np.where(flip, side - 1 - x_cell, x_cell)
+        y_cell = np.where(flip, side - 1 - y_cell, y_cell)
+        x_cell, y_cell = np.where(y_bit, x_cell, y_cell), np.where(y_bit, y_cell, x_cell)
+
+        bit >>= 1
+
+    return np.argsort(distance, kind='stable').tolist()
+
+
+# functional methods
+def get_candidate_edges(candidates, matrix, labels=None):
+    """
+    Get the edges between each node and its candidates (nearest neighbours), each edge only once.
+
+    :param labels: nodes of the matrix that the rows of candidates stand for, if they are a subset of them
+    :returns: tuple of two lists (first nodes, second nodes) of the edges, sorted by increasing length
+    """
+    nodes, k = candidates.shape
+    node_a = np.repeat(np.arange(nodes, dtype=np.int64), k)
+    node_b = np.asarray(candidates, dtype=np.int64).ravel()
+
+    keys = np.unique(np.minimum(node_a, node_b) * nodes + np.maximum(node_a, node_b))
+    node_a, node_b = keys // nodes, keys % nodes
+    lengths = matrix[node_a, node_b] if labels is None else matrix[labels[node_a], labels[node_b]]
+    order = np.argsort(np.asarray(lengths, dtype=float), kind='stable')
+
+    return node_a[order].tolist(), node_b[order].tolist()
+
+
+def get_greedy_matching(search_space, odd_nodes):
+    """
+    Match the given nodes (an even number of them) in pairs greedily: the candidate edges between them are taken by
+    increasing length, and the nodes left unmatched are paired with their nearest unmatched node.
+
+    :returns: list of the edges of the matching
+    """
+    matrix = search_space.matrix
+    if not len(odd_nodes):
+        return []
+
+    if search_space.coord_list is not None:
+        candidates = neighbours.get_nearest_neighbours(np.asarray(search_space.coord_list)[odd_nodes])
+    else:
+        candidates = neighbours.get_nearest_neighbours_from_matrix(
+            np.asarray(matrix[odd_nodes[:, np.newaxis], odd_nodes[np.newaxis, :]], dtype=float))
+
+    matched = np.zeros(len(odd_nodes), dtype=bool)
+    matching = []
+    for node_a, node_b in zip(*get_candidate_edges(candidates, matrix, odd_nodes)):
+        if not matched[node_a] and not matched[node_b]:
+            matched[node_a] = matched[node_b] = True
+            matching.append((int(odd_nodes[node_a]), int(odd_nodes[node_b])))
+
+    pending = np.flatnonzero(~matched)
+    while len(pending):
+        node, pending = pending[0], pending[1:]
+        nearest = np.argmin(matrix[np.full(len(pending), odd_nodes[node]), odd_nodes[pending]])
+        matching.append((int(odd_nodes[node]), int(odd_nodes[pending[nearest]])))
+        pending = np.delete(pending, nearest)
+
+    return matching
+
+
+def get_eulerian_circuit(edges, nodes):
+    """
+    Get an Eulerian circuit (Hierholzer's algorithm) of the connected multigraph given by its edges, every node having
+    an even degree.
+
+    :returns: list of the nodes of the circuit
+    """
+    incident = [[] for _ in range(nodes)]
+    for edge, (node_a, node_b) in enumerate(edges):
+        incident[node_a].append(edge)
+        incident[node_b].append(edge)
+
+    used = bytearray(len(edges))
+    stack, circuit = [0], []
+    while stack:
+        node = stack[-1]
+        while incident[node] and used[incident[node][-1]]:
+            incident[node].pop()
+
+        if incident[node]:
+            edge = incident[node].pop()
+            used[edge] = 1
+            node_a, node_b = edges[edge]
+            stack.append(node_b if node_a == node else node_a)
+        else:
+            circuit.append(stack.pop())
+
+    return circuit
+
+
+def join_fragments(matrix, adjacent):
+    """
+    Join the fragments (paths) given by the adjacent nodes of each node into a single tour, modifying them in place.
+    From the end of a fragment, the tour goes on to the nearest end of the fragments not joined yet.
+    """
+    nodes = len(adjacent)
+    ends = [i for i in range(nodes) if len(adjacent[i]) < 2]
+
+    # Other end of the fragment of each end (a node without any edge being a fragment on its own)
+    other_end = {}
+    for end in ends:
+        if end in other_end:
+            continue
+
+        previous, node = end, adjacent[end][0] if adjacent[end] else end
+        while len(adjacent[node]) == 2:
+            previous, node = node, adjacent[node][0] if adjacent[node][0] != previous else adjacent[node][1]
+        other_end[end], other_end[node] = node, end
+
+    ends = np.array(ends)
+    position = {end: i for i, end in enumerate(ends.tolist())}
+    pending = np.ones(len(ends), dtype=bool)
+
+    first = int(ends[0])
+    current = other_end[first]
+    pending[position[first]] = pending[position[current]] = False
+
+    while pending.any():
+        candidates = ends[pending]
+        nearest = int(candidates[np.argmin(matrix[np.full(len(candidates), current), candidates])])
+
+        adjacent[current].append(nearest)
+        adjacent[nearest].append(current)
+
+        current = other_end[nearest]
+        pending[position[nearest]] = pending[position[current]] = False
+
+    adjacent[current].append(first)
+    adjacent[first].append(current)
+
+
+def get_tour(adjacent, start=0):
+    """
+    Get the tour given by the two adjacent nodes of each node.
+
+    :returns: tour as a list of nodes
+    """
+    tour = [start]
+    previous, node = start, adjacent[start][0]
+    while node != start:
+        tour.append(node)
+        previous, node = node, adjacent[node][0] if adjacent[node][0] != previous else adjacent[node][1]
+
+    return tour
+
+
+class UnionFind:
+    """
+    Disjoint sets of nodes (the fragments of a tour being built), merged by union and identified by find.
+    """
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, node):
+        parent = self.parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+
+        return node
+
+    def union(self, node_a, node_b):
+        """
+        Merge the sets of both nodes.
+
+        :returns: False if they already were in the same set
+        """
+        root_a, root_b = self.find(node_a), self.find(node_b)
+        if root_a == root_b:
+            return False
+
+        self.parent[root_a] = root_b
+        return True
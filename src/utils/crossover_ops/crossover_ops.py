@@ -0,0 +1,294 @@
+from abc import ABCMeta, abstractmethod
+import numpy as np
+
+from ..rng import rng
+
+
+def get_crossover_by_name(crossover_name, random_stream=None):
+    """
+    Get the crossover operator working on tours with the given name. The one-point crossover ('one_point') works on the
+    ordinal representation of the chromosomes instead, so it is carried out by GA itself and there is no operator.
+    """
+    crossover_dict = {'ox': OrderCrossover,
+                      'pmx': PartiallyMappedCrossover,
+                      'eax': EdgeAssemblyCrossover}
+
+    return crossover_dict[crossover_name](random_stream=random_stream) if crossover_name in crossover_dict else None
+
+
+class Crossover:
+    """
+    Abstract class to be inherited by the different crossover operators working directly on tours (OX, PMX, EAX...), so
+    that the offspring are always valid permutations of the nodes. The random numbers are drawn from the given random
+    stream (see utils.rng).
+    """
+    __metaclass__ = ABCMeta
+
+    def __init__(self, random_stream=None):
+        self.random_stream = random_stream or rng.RandomStream()
+
+    @abstractmethod
+    def crossover(self, parents_1, parents_2, matrix):
+        """
+        Mate each pair of parents (the tours at the same row of both arrays) to produce two offspring.
+
+        :returns: tuple of two arrays of tours (one row per pair of parents)
+        """
+        return
+
+    # functional methods
+    def get_segments(self, pairs, size):
+        """
+        Get a random segment of positions [start, end) for each pair of parents.
+
+        :returns: boolean array of shape pairs x size, True for the positions within the segment of each row
+        """
+        cuts = np.sort(self.random_stream.generator.integers(0, size + 1, size=(pairs, 2)), axis=1)
+        positions = np.arange(size)
+
+        return (positions >= cuts[:, :1]) & (positions < cuts[:, 1:])
+
+    @staticmethod
+    def get_segment_genes(parents, segments):
+        """
+        Get which genes (nodes) of each parent lie within its segment.
+
+        :returns: boolean array of shape pairs x size, indexed by node
+        """
+        genes = np.zeros(parents.shape, dtype=bool)
+        np.put_along_axis(genes, parents, segments, axis=1)
+
+        return genes
+
+
+class OrderCrossover(Crossover):
+    """Order Crossover (OX)"""
+
+    def crossover(self, parents_1, parents_2, matrix):
+        """
+        Each child keeps a random segment of one parent in place, and the rest of its positions are filled with the
+        remaining nodes in the order they appear in the other parent (starting after the segment). It preserves the
+        relative order of the nodes, and so most of the adjacencies of both parents. All the pairs are mated at once.
+        """
+        segments = self.get_segments(len(parents_1), parents_1.shape[1])
+
+        return self.order(parents_1, parents_2, segments), self.order(parents_2, parents_1, segments)
+
+    def order(self, parents_1, parents_2, segments):
+        pairs, size = parents_1.shape
+        if not pairs:
+            return parents_1.copy()
+
+        # Positions after the end of the segment, wrapping around the end of the tour
+        ends = np.where(segments.any(axis=1), size - np.argmax(segments[:, ::-1], axis=1), 0)
+        rotation = (ends[:, np.newaxis] + np.arange(size)) % size
+
+        # Nodes of the second parent (in rotated order) that are not in the segment of the first parent
+        rotated_parents = np.take_along_axis(parents_2, rotation, axis=1)
+        missing = ~np.take_along_axis(self.get_segment_genes(parents_1, segments), rotated_parents, axis=1)
+
+        # Positions outside the segment (in rotated order), as many as missing nodes in each row
+        free = ~np.take_along_axis(segments, rotation, axis=1)
+
+        children = parents_1.copy()
+        children[np.nonzero(free)[0], rotation[free]] = rotated_parents[missing]
+
+        return children
+
+
+class PartiallyMappedCrossover(Crossover):
+    """Partially Mapped Crossover (PMX)"""
+
+    def crossover(self, parents_1, parents_2, matrix):
+        """
+        Each child keeps a random segment of one parent in place, and the rest of its positions are taken from the other
+        parent. The nodes that would be repeated are replaced following the mapping between both segments. All the pairs
+        are mated at once, resolving the repetitions of every row in the same iteration.
+        """
+        segments = self.get_segments(len(parents_1), parents_1.shape[1])
+
+        return self.map(parents_1, parents_2, segments), self.map(parents_2, parents_1, segments)
+
+    def map(self, parents_1, parents_2, segments):
+        pairs, size = parents_1.shape
+        if not pairs:
+            return parents_1.copy()
+
+        segment_genes = self.get_segment_genes(parents_1, segments)
+        positions_1 = np.argsort(parents_1, axis=1)  # position of each node in the first parent
+
+        genes = parents_2.copy()
+        rows = np.arange(pairs)[:, np.newaxis]
+
+        # A node of the second parent outside the segment is repeated if it is in the segment of the first parent: it
+        # is replaced by the node of the second parent at the position of the repeated node in the first parent
+        while (repeated := ~segments & segment_genes[rows, genes]).any():
+            row, col = np.nonzero(repeated)
+            genes[row, col] = parents_2[row, positions_1[row, genes[row, col]]]
+
+        return np.where(segments, parents_1, genes)
+
+
+class EdgeAssemblyCrossover(Crossover):
+    """Edge Assembly Crossover (EAX)"""
+
+    def __init__(self, neighbours=None, random_stream=None):
+        super().__init__(random_stream)
+        self.neighbours = neighbours
+
+    def crossover(self, parents_1, parents_2, matrix):
+        """
+        Each child is the first parent where the edges of a random AB-cycle (a cycle alternating edges of both parents)
+        are replaced, which results in a set of sub-tours that are then merged greedily. It keeps almost all the edges of
+        both parents, and the new edges are short ones. Each pair is mated separately.
+        """
+        assert self.neighbours is not None, 'The candidate lists of nearest neighbours have not been given.'
+
+        children_1 = [self.assemble(tour_a, tour_b, matrix) for tour_a, tour_b in zip(parents_1, parents_2)]
+        children_2 = [self.assemble(tour_b, tour_a, matrix) for tour_a, tour_b in zip(parents_1, parents_2)]
+
+        return (np.array(children_1, dtype=parents_1.dtype).reshape(parents_1.shape),
+                np.array(children_2, dtype=parents_1.dtype).reshape(parents_1.shape))
+
+    def assemble(self, tour_a, tour_b, matrix):
+        """
+        Produce a child from the tours of parents A and B.
+        """
+        adjacent_a, adjacent_b = self.get_adjacent_nodes(tour_a), self.get_adjacent_nodes(tour_b)
+
+        # Edges of each parent that are not shared with the other one
+        edges_a = [[j for j in adjacent_a[i] if j not in adjacent_b[i]] for i in range(len(tour_a))]
+        edges_b = [[j for j in adjacent_b[i] if j not in adjacent_a[i]] for i in range(len(tour_a))]
+
+        ab_cycles = self.get_ab_cycles(edges_a, edges_b)
+        if not ab_cycles:
+            return list(tour_a)
+
+        # Intermediate solution: replacing the edges of A in the AB-cycle by those of B
+        ab_cycle = self.random_stream.choice(ab_cycles)
+        adjacent = [list(i) for i in adjacent_a]
+        for i in range(len(ab_cycle) - 1):
+            node_a, node_b = ab_cycle[i], ab_cycle[i + 1]
+            if i % 2 == 0:
+                adjacent[node_a].remove(node_b)
+                adjacent[node_b].remove(node_a)
+            else:
+                adjacent[node_a].append(node_b)
+                adjacent[node_b].append(node_a)
+
+        self.merge_sub_tours(adjacent, matrix)
+
+        return self.get_tour(adjacent, int(tour_a[0]))
+
+    def get_ab_cycles(self, edges_a, edges_b):
+        """
+        Decompose the edges that are not shared into AB-cycles. Every node has as many edges of A as of B, so a walk
+        alternating edges of A and B can always go on until it gets back to its first node through an edge of B.
+
+        :returns: list of AB-cycles, each one as the list of its nodes (first and last being the same)
+        """
+        ab_cycles = []
+        for start in range(len(edges_a)):
+            while edges_a[start]:
+                ab_cycle, node = [start], start
+                while True:
+                    for edges in (edges_a, edges_b):
+                        next_node = edges[node].pop(self.random_stream.randrange(len(edges[node])))
+                        edges[next_node].remove(node)
+                        ab_cycle.append(next_node)
+                        node = next_node
+
+                    if node == start:
+                        break
+
+                ab_cycles.append(ab_cycle)
+
+        return ab_cycles
+
+    def merge_sub_tours(self, adjacent, matrix):
+        """
+        Merge the sub-tours of the intermediate solution one by one, from the smallest one, into a single tour. Each one
+        is merged with the best 2-opt exchange of an edge (u, v) of the sub-tour and an edge (w, x) of another one, w
+        being one of the nearest neighbours of u (any node if none of them is outside the sub-tour).
+        """
+        sub_tours = dict(enumerate(self.get_sub_tours(adjacent)))
+        labels = np.empty(len(adjacent), dtype=int)
+        for label, sub_tour in sub_tours.items():
+            labels[sub_tour] = label
+
+        while len(sub_tours) > 1:
+            label = min(sub_tours, key=lambda i: len(sub_tours[i]))
+
+            best = None
+            for candidates in (self.neighbours, None):
+                for node_u in sub_tours[label]:
+                    nodes_w = np.flatnonzero(labels != label) if candidates is None else candidates[node_u]
+
+                    for node_w in nodes_w:
+                        if labels[node_w] == label:
+                            continue
+
+                        for node_v in adjacent[node_u]:
+                            for node_x in adjacent[node_w]:
+                                # (u, v) and (w, x) replaced by either (u, w) and (v, x), or (u, x) and (v, w)
+                                removed = matrix[node_u, node_v] + matrix[node_w, node_x]
+                                for node_1, node_2 in ((node_w, node_x), (node_x, node_w)):
+                                    delta = matrix[node_u, node_1] + matrix[node_v, node_2] - removed
+                                    if best is None or delta < best[0]:
+                                        best = delta, node_u, node_v, node_w, node_x, node_1, node_2
+
+                if best is not None:
+                    break
+
+            _, node_u, node_v, node_w, node_x, node_1, node_2 = best
+            for node_a, node_b in ((node_u, node_v), (node_w, node_x)):
+                adjacent[node_a].remove(node_b)
+                adjacent[node_b].remove(node_a)
+            for node_a, node_b in ((node_u, node_1), (node_v, node_2)):
+                adjacent[node_a].append(node_b)
+                adjacent[node_b].append(node_a)
+
+            other = labels[node_w]
+            labels[sub_tours[label]] = other
+            sub_tours[other] += sub_tours.pop(label)
+
+    def get_sub_tours(self, adjacent):
+        """
+        Get the sub-tours (cycles) formed by the given adjacent nodes of each node.
+        """
+        sub_tours = []
+        visited = np.zeros(len(adjacent), dtype=bool)
+        for node in range(len(adjacent)):
+            if not visited[node]:
+                sub_tour = self.get_tour(adjacent, node)
+                visited[sub_tour] = True
+                sub_tours.append(sub_tour)
+
+        return sub_tours
+
+    # functional methods
+    @staticmethod
+    def get_adjacent_nodes(tour):
+        """
+        Get the two nodes adjacent to each node of the tour (previous and next).
+        """
+        tour = [int(i) for i in tour]
+        adjacent = [None] * len(tour)
+        for i, node in enumerate(tour):
+            adjacent[node] = (tour[i - 1], tour[(i + 1) % len(tour)])
+
+        return adjacent
+
+    @staticmethod
+    def get_tour(adjacent, start):
+        """
+        Follow the cycle containing the given node through the adjacent nodes of each node.
+        """
+        tour, previous, node = [start], None, start
+        while True:
+            next_node = adjacent[node][0] if adjacent[node][0] != previous else adjacent[node][1]
+            if next_node == start:
+                return tour
+
+            tour.append(next_node)
+            previous, node = node, next_node
@@ -0,0 +1,172 @@
+from collections import OrderedDict
+import math
+import numpy as np
+
+# Distance backends available to choose from
+DISTANCES = ('dense', 'condensed', 'oracle')
+
+# Number of rows of distances kept by the coordinate-based oracle
+ORACLE_CACHE_ROWS = 256
+
+# Number of rows of distances computed at once when building the condensed distances
+BLOCK_SIZE = 1024
+
+INTEGER_TYPES = (int, np.integer)
+
+
+def get_dist_block(coord_a, coord_b):
+    """
+    Get the distances between every node of coord_a and every node of coord_b.
+
+    :returns: distance matrix of shape len(coord_a) x len(coord_b)
+    """
+    diff_x = coord_a[:, 0, np.newaxis] - coord_b[np.newaxis, :, 0]
+    diff_y = coord_a[:, 1, np.newaxis] - coord_b[np.newaxis, :, 1]
+
+    return np.sqrt(diff_x * diff_x + diff_y * diff_y)
+
+
+class Distance:
+    """
+    Abstract class to be inherited by the distance backends that do not store the dense N x N matrix of distances. They
+    are indexed like the dense matrix (a NumPy array), so that they can replace it anywhere:
+
+    - distances[i, j] with two nodes: distance between both nodes.
+    - distances[rows, cols] with arrays of nodes (broadcast together): array of distances, computed at once.
+    - distances[i] or distances[start:stop]: row (or rows) of the matrix of distances.
+    """
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+    def __len__(self):
+        return self.nodes
+
+    @property
+    def shape(self):
+        return self.nodes, self.nodes
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            node_a, node_b = key
+            if isinstance(node_a, INTEGER_TYPES) and isinstance(node_b, INTEGER_TYPES):
+                return self.get_distance(int(node_a), int(node_b))
+
+            return self.get_distances(*np.broadcast_arrays(np.asarray(node_a), np.asarray(node_b)))
+
+        if isinstance(key, slice):
+            return np.array([self.get_row(i) for i in range(*key.indices(self.nodes))]).reshape(-1, self.nodes)
+
+        return self.get_row(int(key))
+
+    def get_distance(self, node_a, node_b):
+        return float(self.get_distances(np.array(node_a), np.array(node_b)))
+
+    def get_distances(self, nodes_a, nodes_b):
+        """
+        Get the distances between the nodes of both arrays (of the same shape), element by element.
+        """
+        raise NotImplementedError
+
+    def get_row(self, node):
+        """
+        Get the distances from the given node to every node.
+        """
+        return self.get_distances(np.full(self.nodes, node), np.arange(self.nodes))
+
+
+class CondensedDistance(Distance):
+    """
+    Distances stored as the upper triangle of the (symmetric) matrix in a 1-D array of float32, row by row: (N - 1) N / 2
+    elements of 4 bytes instead of N x N elements of 8 bytes, i.e. a quarter of the memory of the dense matrix.
+    """
+    def __init__(self, data, nodes):
+        super().__init__(nodes)
+        self.data = data
+
+    @classmethod
+    def from_coordinates(cls, coord_list, block_size=BLOCK_SIZE):
+        """
+        Compute the condensed distances given a list of coordinates of each node, in blocks of rows.
+        """
+        coord = np.asarray(coord_list, dtype=float)
+        nodes = len(coord)
+        data = np.empty(nodes * (nodes - 1) // 2, dtype=np.float32)
+
+        for start in range(0, nodes, block_size):
+            block = get_dist_block(coord[start:start + block_size], coord)
+            for i, row in enumerate(block, start):
+                offset = cls.get_offset(i, nodes)
+                data[offset:offset + nodes - i - 1] = row[i + 1:]
+
+        return cls(data, nodes)
+
+    @classmethod
+    def from_matrix(cls, matrix):
+        """
+        Condense a (symmetric) dense matrix of distances.
+        """
+        matrix = np.asarray(matrix)
+        return cls(matrix[np.triu_indices(len(matrix), 1)].astype(np.float32), len(matrix))
+
+    def get_distance(self, node_a, node_b):
+        if node_a == node_b:
+            return 0.0
+        if node_a > node_b:
+            node_a, node_b = node_b, node_a
+
+        return float(self.data[self.get_offset(node_a, self.nodes) + node_b - node_a - 1])
+
+    def get_distances(self, nodes_a, nodes_b):
+        lower, upper = np.minimum(nodes_a, nodes_b).astype(np.int64), np.maximum(nodes_a, nodes_b).astype(np.int64)
+        if not len(self.data):  # a single node: every distance is from the node to itself
+            return np.zeros(lower.shape)
+
+        index = self.get_offset(lower, self.nodes) + np.maximum(upper - lower - 1, 0)
+
+        return np.where(lower == upper, 0, self.data[np.minimum(index, max(len(self.data) - 1, 0))]).astype(float)
+
+    # functional methods
+    @staticmethod
+    def get_offset(node, nodes):
+        """
+        Get the index of the first element of the given row (node) within the condensed array.
+        """
+        return node * (2 * nodes - node - 1) // 2
+
+
+class CoordinateDistance(Distance):
+    """
+    Distances computed on the fly from the coordinates of the nodes (oracle), so that the memory needed is O(N). The
+    last rows requested are kept in a small LRU cache, as local search methods use the rows of a few nodes repeatedly.
+    """
+    def __init__(self, coord_list, cache_rows=ORACLE_CACHE_ROWS):
+        super().__init__(len(coord_list))
+        self.coord = np.asarray(coord_list, dtype=float)
+        self.coord_x, self.coord_y = self.coord[:, 0].tolist(), self.coord[:, 1].tolist()
+        self.cache_rows = cache_rows
+        self.rows = OrderedDict()
+
+    def get_distance(self, node_a, node_b):
+        diff_x = self.coord_x[node_a] - self.coord_x[node_b]
+        diff_y = self.coord_y[node_a] - self.coord_y[node_b]
+
+        return math.sqrt(diff_x * diff_x + diff_y * diff_y)
+
+    def get_distances(self, nodes_a, nodes_b):
+        diff = self.coord[nodes_a] - self.coord[nodes_b]
+
+        return np.sqrt(diff[..., 0] * diff[..., 0] + diff[..., 1] * diff[..., 1])
+
+    def get_row(self, node):
+        row = self.rows.get(node)
+        if row is None:
+            row = get_dist_block(self.coord[node:node + 1], self.coord)[0]
+            row.flags.writeable = False
+            self.rows[node] = row
+
+            if len(self.rows) > self.cache_rows:
+                self.rows.popitem(last=False)
+        else:
+            self.rows.move_to_end(node)
+
+        return row
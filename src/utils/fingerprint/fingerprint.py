@@ -0,0 +1,85 @@
+from collections import OrderedDict
+import numpy as np
+
+
+def canonicalise_tours(tours):
+    """
+    Get the canonical form of every given tour (one per row of a 2-D array). The same cycle can be written starting at
+    any of its N nodes and in both directions, which gives 2N different tours with the same cost. The canonical form
+    starts at the smallest node (0) and follows the direction in which the second node is smaller than the last one.
+
+    :returns: 2-D array of canonical tours
+    """
+    tours = np.asarray(tours)
+    rows, size = tours.shape
+
+    # Rotation: start every tour at its smallest node
+    start = np.argmin(tours, axis=1) if size else np.zeros(rows, dtype=int)
+    canonical = np.take_along_axis(tours, (start[:, np.newaxis] + np.arange(size)) % size, axis=1)
+
+    # Orientation: reverse all but the starting node if the tour goes the other way round
+    if size > 2:
+        reverse = canonical[:, 1] > canonical[:, -1]
+        canonical[reverse, 1:] = canonical[reverse, :0:-1]
+
+    return canonical
+
+
+def get_fingerprints(tours):
+    """
+    Get a hashable fingerprint for every given tour (one per row of a 2-D array): the bytes of its canonical form, so
+    that tours describing the same cycle have the same fingerprint, and different cycles never do.
+
+    :returns: list of bytes (4 bytes per node)
+    """
+    canonical = np.ascontiguousarray(canonicalise_tours(tours), dtype=np.int32)
+
+    return [tour.tobytes() for tour in canonical]
+
+
+class FingerprintCache:
+    """
+    Bounded cache of the costs of the tours already evaluated, indexed by their fingerprint, to be shared across the
+    generations of GA. When full, the least recently used tours are evicted. The tours of a whole population are looked
+    up and stored at once.
+
+    It holds a fingerprint of 4N bytes per tour, and only pays off when evaluating a tour costs more than getting its
+    fingerprint (e.g. with the distance oracle, or large search spaces), as both are O(N).
+    """
+    def __init__(self, max_size):
+        assert max_size > 0, 'The size of the cache must be 1 or greater.'
+        self.max_size = max_size
+        self.costs = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.costs)
+
+    def lookup(self, fingerprints):
+        """
+        Get the costs of the tours with the given fingerprints. The tours found become the most recently used ones.
+
+        :returns: array of costs, nan for the tours that are not cached
+        """
+        costs = np.array([self.costs.get(i, np.nan) for i in fingerprints], dtype=float)
+
+        found = np.flatnonzero(~np.isnan(costs))
+        for i in found:
+            self.costs.move_to_end(fingerprints[i])
+
+        self.hits += len(found)
+        self.misses += len(costs) - len(found)
+
+        return costs
+
+    def store(self, fingerprints, costs):
+        """
+        Store the costs of the tours with the given fingerprints, evicting the least recently used ones if necessary.
+        """
+        for tour_fingerprint, cost in zip(fingerprints, np.asarray(costs, dtype=float).tolist()):
+            self.costs[tour_fingerprint] = cost
+            self.costs.move_to_end(tour_fingerprint)
+
+        for _ in range(len(self.costs) - self.max_size):
+            self.costs.popitem(last=False)
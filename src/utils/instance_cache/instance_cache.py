@@ -0,0 +1,73 @@
+import hashlib
+import os
+import tempfile
+import numpy as np
+
+from ..definitions.definitions import get_abs_path
+
+# Folder of the cache, ignored by git
+CACHE_DIR = get_abs_path('.cache', 'instances')
+
+# Version of the format of the cached arrays, part of the key so that a change of format invalidates the cache
+CACHE_VERSION = 1
+
+# Size of the chunks in which the files are read to be hashed
+CHUNK_SIZE = 1 << 20
+
+
+class InstanceCache:
+    """
+    On-disk cache of the arrays derived from the search spaces loaded from files (coordinates, distance matrix...), so
+    that they are only parsed and computed once. Each file is identified by the hash of its content, so that a file
+    that changes gets a new entry, and the arrays are stored as .npy files in a folder per file.
+
+    Arrays can be loaded memory-mapped (read-only): they are then read from disk lazily and shared by the page cache
+    across processes, instead of being allocated by each one.
+    """
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+
+    def get_key(self, path_file):
+        """
+        Get the key of the given file: the hash of its content.
+        """
+        digest = hashlib.blake2b(str(CACHE_VERSION).encode(), digest_size=16)
+        with open(path_file, 'rb') as in_file:
+            while chunk := in_file.read(CHUNK_SIZE):
+                digest.update(chunk)
+
+        return digest.hexdigest()
+
+    def load(self, key, name, mmap=False):
+        """
+        Load the array with the given name cached for the file with the given key.
+
+        :returns: the array (read-only if memory-mapped), or None if it is not cached
+        """
+        try:
+            return np.load(self.get_path(key, name), mmap_mode='r' if mmap else None, allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+
+    def store(self, key, name, array):
+        """
+        Store an array with the given name for the file with the given key. The array is written to a temporary file
+        first, so that other processes never load a partially written one. Failing to write the cache (e.g. read-only
+        file system) is not an error, as it only makes the next run slower, but the temporary file is removed.
+        """
+        out_file = None
+        try:
+            os.makedirs(os.path.join(self.directory, key), exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=os.path.join(self.directory, key), suffix='.npy',
+                                             delete=False) as out_file:
+                np.save(out_file, np.asarray(array), allow_pickle=False)
+            os.replace(out_file.name, self.get_path(key, name))
+        except OSError:
+            if out_file is not None:
+                try:
+                    os.unlink(out_file.name)
+                except OSError:
+                    pass
+
+    def get_path(self, key, name):
+        return os.path.join(self.directory, key, f'{name}.npy')
@@ -0,0 +1,381 @@
+from collections import deque
+
+# Minimum gain for a move to be considered an improvement (avoids cycling due to rounding errors)
+EPSILON = 1e-9
+
+# Maximum length of the segments moved by Or-opt
+OR_OPT_MAX_LENGTH = 3
+
+# Maximum number of exchanges of a Lin-Kernighan move (a k-opt move, k being up to the depth + 1)
+LK_MAX_DEPTH = 10
+
+# Number of candidates tried for the first exchange of a Lin-Kernighan move (the deeper ones take the best candidate)
+LK_BREADTH = 5
+
+# Number of nodes looked at between two checks of the stopping condition of optimise(), if any
+STOP_CHECK_INTERVAL = 256
+
+
+class LocalSearch:
+    """
+    Deterministic local search engine for the TSP that applies first-improvement 2-opt and Or-opt moves until none of
+    the moves it evaluates improves the tour.
+
+    - 2-opt removes two edges and reconnects the tour the other way round (inverting the path in between).
+    - Or-opt is the 3-opt move known as segment insertion: a segment of up to OR_OPT_MAX_LENGTH nodes is moved (as it is
+      or inverted) between two other adjacent nodes.
+
+    Only moves that create an edge between a node and one of its nearest neighbours, shorter than the edges removed
+    next to it, are evaluated (candidate lists and gain criterion), which are the ones likely to improve the tour. The
+    result is then a local optimum for 2-opt if the candidate lists hold every node, and an approximate local optimum
+    otherwise (and for Or-opt). Besides, each node has a don't-look bit: a node is not looked at again until one of its
+    edges changes, so that only a queue of active nodes is processed. As the bits may leave improving moves behind,
+    the whole tour is looked at again once they are all set, until no move is found.
+
+    The tour is stored as an array of nodes alongside the position of each node, so that the successor and predecessor
+    of a node are found in O(1). Inversions are applied to the shorter side of the tour.
+    """
+    def __init__(self, matrix, neighbours, or_opt_max_length=OR_OPT_MAX_LENGTH):
+        self.matrix = matrix
+        self.neighbours = [list(i) for i in neighbours]
+        self.or_opt_max_length = or_opt_max_length
+
+        self.tour = []
+        self.position = []
+        self.stopped = False
+
+    def optimise(self, tour, cost=None, active=None, should_stop=None):
+        """
+        Improve the given tour until no improving 2-opt or Or-opt move is found.
+
+        :param tour: list (or array) of nodes
+        :param cost: cost of the given tour, calculated if not given
+        :param active: nodes to look at initially (all the nodes by default). If given, the search stays around them
+        (e.g. after a kick) and the whole tour is not looked at again once all the don't-look bits are set
+        :param should_stop: function checked every STOP_CHECK_INTERVAL nodes looked at (e.g. the budget of a run). Once
+        it returns True, the search stops with the tour improved so far, and stopped is set.
+        :returns: tuple (improved tour, its cost)
+        """
+        self.stopped = False
+        self.tour = [int(i) for i in tour]
+        self.position = [0] * len(self.tour)
+        for i, node in enumerate(self.tour):
+            self.position[node] = i
+
+        if cost is None:
+            cost = sum(self.dist(self.tour[i - 1], self.tour[i]) for i in range(len(self.tour)))
+
+        if len(self.tour) < 4:
+            return self.tour, cost
+
+        queue = deque(self.tour if active is None else active)
+        queued = [False] * len(self.tour)
+        for node in queue:
+            queued[node] = True
+
+        checks, improved = 0, False
+        while queue:
+            if should_stop is not None and (checks := checks + 1) % STOP_CHECK_INTERVAL == 0 and should_stop():
+                self.stopped = True
+                break
+
+            node = queue.popleft()
+            queued[node] = False
+
+            gain, touched = self.improve(node)
+
+            if gain:
+                cost -= gain
+                improved = True
+                for i in touched:
+                    if not queued[i]:
+                        queued[i] = True
+                        queue.append(i)
+
+            if not queue and improved and active is None:
+                # Every don't-look bit is set: the whole tour is looked at again, until a pass finds no improving move
+                queue.extend(self.tour)
+                queued = [True] * len(self.tour)
+                improved = False
+
+        return self.tour, cost
+
+    def improve(self, node):
+        """
+        Look for an improving move around the given node: 2-opt first, then Or-opt.
+
+        :returns: tuple (gain of the move applied or 0, nodes whose edges have changed)
+        """
+        gain, touched = self.improve_two_opt(node)
+        if not gain:
+            gain, touched = self.improve_or_opt(node)
+
+        return gain, touched
+
+    def dist(self, node_a, node_b):
+        return self.matrix[node_a, node_b]
+
+    def next(self, node, forward=True):
+        """
+        Get the node that follows the given node in the tour, either forwards or backwards.
+        """
+        i = self.position[node] + (1 if forward else -1)
+        return self.tour[i % len(self.tour)]
+
+    def improve_two_opt(self, node_a):
+        """
+        Look for an improving 2-opt move that replaces the edges (a, b) and (c, d) by (a, c) and (b, d), c being one of
+        the nearest neighbours of a. Both directions of the tour are explored.
+
+        :returns: tuple (gain of the move applied or 0, nodes whose edges have changed)
+        """
+        for forward in (True, False):
+            node_b = self.next(node_a, forward)
+            dist_ab = self.dist(node_a, node_b)
+
+            for node_c in self.neighbours[node_a]:
+                # Sorted candidate list: no improvement is possible once the new edge is longer than the removed one
+                if (partial_gain := dist_ab - self.dist(node_a, node_c)) <= EPSILON:
+                    break
+
+                node_d = self.next(node_c, forward)
+                if node_c == node_b or node_d == node_a:
+                    continue
+
+                if (gain := partial_gain + self.dist(node_c, node_d) - self.dist(node_b, node_d)) > EPSILON:
+                    self.exchange(node_a, node_b, node_c, node_d)
+                    return gain, (node_a, node_b, node_c, node_d)
+
+        return 0, ()
+
+    def improve_or_opt(self, node_a):
+        """
+        Look for an improving Or-opt move that takes the segment of nodes from a to e (up to the maximum length, in any
+        direction) out from between p and n, and inserts it between c and d, c being one of the nearest neighbours of a
+        which becomes adjacent to it. The segment may be inserted as it is or inverted.
+
+        :returns: tuple (gain of the move applied or 0, nodes whose edges have changed)
+        """
+        for forward in (True, False):
+            node_p = self.next(node_a, not forward)
+            node_e = node_a
+
+            for length in range(1, min(self.or_opt_max_length, len(self.tour) - 3) + 1):
+                if length > 1:
+                    node_e = self.next(node_e, forward)
+                node_n = self.next(node_e, forward)
+                if node_n == node_p:
+                    break
+
+                segment = self.get_segment(node_a, node_e, forward)
+                removal_gain = self.dist(node_p, node_a) + self.dist(node_e, node_n) - self.dist(node_p, node_n)
+
+                for node_c in self.neighbours[node_a]:
+                    if (partial_gain := removal_gain - self.dist(node_a, node_c)) <= EPSILON:
+                        break
+                    if node_c in segment:
+                        continue
+
+                    # Both sides of c: a goes next to c, then the segment continues towards d
+                    for node_d in (self.next(node_c, True), self.next(node_c, False)):
+                        if node_d in segment or {node_c, node_d} == {node_p, node_n}:
+                            continue
+
+                        if (gain := partial_gain + self.dist(node_c, node_d) - self.dist(node_e, node_d)) > EPSILON:
+                            self.move_segment(node_p, node_a, node_e, node_n, node_c, node_d)
+                            return gain, (node_p, node_a, node_e, node_n, node_c, node_d)
+
+        return 0, ()
+
+    def get_segment(self, node_a, node_e, forward):
+        """
+        Get the set of nodes from a to e in the given direction.
+        """
+        segment, node = {node_a}, node_a
+        while node != node_e:
+            node = self.next(node, forward)
+            segment.add(node)
+
+        return segment
+
+    def exchange(self, node_a, node_b, node_c, node_d):
+        """
+        2-opt move: replace the edges (a, b) and (c, d) by (a, c) and (b, d). b and d follow a and c in the same
+        direction (both forwards or both backwards).
+        """
+        if self.next(node_a) == node_b:
+            self.invert(self.position[node_b], self.position[node_c])
+        else:
+            self.invert(self.position[node_a], self.position[node_d])
+
+    def move_segment(self, node_p, node_a, node_e, node_n, node_c, node_d):
+        """
+        Or-opt move: replace the edges (p, a), (e, n) and (c, d) by (p, n), (c, a) and (e, d). It is applied as a
+        sequence of 2-opt moves.
+        """
+        if self.next(node_p) == node_a:
+            forward_cd = self.next(node_c) == node_d
+        else:
+            forward_cd = self.next(node_c, False) == node_d
+
+        if forward_cd:
+            # p a..e n ... c d  ->  p c ... n e..a d  ->  p n ... c e..a d
+            self.exchange(node_p, node_a, node_c, node_d)
+            self.exchange(node_p, node_c, node_n, node_e)
+            # c e..a d  ->  c a..e d
+            self.exchange(node_c, node_e, node_a, node_d)
+        else:
+            # p a..e n ... d c  ->  p d ... n e..a c  ->  p n ... d e..a c
+            self.exchange(node_p, node_a, node_d, node_c)
+            self.exchange(node_p, node_d, node_n, node_e)
+
+    def invert(self, i, j):
+        """
+        Invert the path of the tour from position i to position j (forwards, possibly wrapping around the end of the
+        tour). If it is shorter, the rest of the tour is inverted instead, which results in the same cycle.
+        """
+        size = len(self.tour)
+        length = (j - i) % size + 1
+        if 2 * length > size:
+            i, j = (j + 1) % size, (i - 1) % size
+            length = size - length
+
+        if i + length <= size:
+            # The path does not wrap around the end of the tour: inverted as a slice
+            tour, position = self.tour, self.position
+            tour[i:i + length] = tour[i:i + length][::-1]
+            for k, node in enumerate(tour[i:i + length], i):
+                position[node] = k
+            return
+
+        for _ in range(length // 2):
+            node_i, node_j = self.tour[i], self.tour[j]
+            self.tour[i], self.tour[j] = node_j, node_i
+            self.position[node_j], self.position[node_i] = i, j
+            i = (i + 1) % size
+            j = (j - 1) % size
+
+
+class LinKernighanSearch(LocalSearch):
+    """
+    Local search engine that applies Lin-Kernighan moves (instead of 2-opt ones) and Or-opt moves until none of the
+    moves it evaluates improves the tour (an approximate local optimum for both).
+
+    A Lin-Kernighan move is a sequential k-opt move built as a chain of 2-opt exchanges. Starting from an edge (t1, t2)
+    to remove, each exchange adds an edge (t2, t3) to one of the nearest neighbours of t2 and removes the edge (t3, t4)
+    that keeps the tour closed through (t4, t1), which is the edge removed by the next exchange. The chain goes on while
+    the gain of the edges removed minus the edges added (but the closing one) is positive (gain criterion), an edge
+    added is never removed again and an edge removed is never added again. The move is then cut where the tour was the
+    shortest, undoing the exchanges after it.
+
+    The first exchange tries several candidates (breadth), and the deeper ones the candidate with the highest gain. As
+    these moves are costlier than 2-opt ones, the tour is first brought to a local optimum for 2-opt and Or-opt, which
+    leaves fewer (and shorter) improvements to the Lin-Kernighan moves.
+    """
+    def __init__(self, matrix, neighbours, max_depth=LK_MAX_DEPTH, breadth=LK_BREADTH,
+                 or_opt_max_length=OR_OPT_MAX_LENGTH):
+        super().__init__(matrix, neighbours, or_opt_max_length)
+        self.max_depth = max_depth
+        self.breadth = breadth
+        self.lin_kernighan = True
+
+    def optimise(self, tour, cost=None, active=None, should_stop=None):
+        self.lin_kernighan = False
+        tour, cost = super().optimise(tour, cost, active, should_stop)
+        if self.stopped:
+            return tour, cost
+
+        self.lin_kernighan = True
+        return super().optimise(tour, cost, active, should_stop)
+
+    def improve(self, node):
+        if not self.lin_kernighan:
+            return super().improve(node)
+
+        gain, touched = self.improve_lin_kernighan(node)
+        if not gain:
+            gain, touched = self.improve_or_opt(node)
+
+        return gain, touched
+
+    def improve_lin_kernighan(self, node_1):
+        """
+        Look for an improving Lin-Kernighan move starting by removing one of the edges of the given node t1.
+
+        :returns: tuple (gain of the move applied or 0, nodes whose edges have changed)
+        """
+        for node_2 in (self.next(node_1), self.next(node_1, False)):
+            dist_12 = self.dist(node_1, node_2)
+
+            tried = 0
+            for node_3 in self.neighbours[node_2]:
+                if tried == self.breadth or (open_gain := dist_12 - self.dist(node_2, node_3)) <= EPSILON:
+                    break
+
+                # Direction of (t1, t2) taken again, as undoing the exchanges of a move may have reversed the tour
+                forward = self.next(node_1) == node_2
+                node_4 = self.next(node_3, not forward)
+                if node_3 == node_1 or node_4 == node_2:
+                    continue
+
+                tried += 1
+                gain, exchanges = self.chain_exchanges(node_1, node_2, node_3, node_4, open_gain)
+                if gain > EPSILON:
+                    return gain, {node for exchange in exchanges for node in exchange}
+
+        return 0, ()
+
+    def chain_exchanges(self, node_1, node_2, node_3, node_4, open_gain):
+        """
+        Apply the chain of exchanges of a Lin-Kernighan move from its first exchange, replacing (t1, t2) and (t3, t4)
+        by (t2, t3) and (t4, t1), and keep it up to the exchange after which the tour is the shortest.
+
+        :param open_gain: length of (t1, t2) minus the length of (t2, t3)
+        :returns: tuple (gain of the exchanges kept or 0, exchanges kept)
+        """
+        exchanges = []
+        added, removed = set(), {(min(node_1, node_2), max(node_1, node_2))}
+        best_gain, best_depth = 0, 0
+
+        while True:
+            self.exchange(node_1, node_2, node_4, node_3)
+            exchanges.append((node_1, node_2, node_4, node_3))
+            added.add((min(node_2, node_3), max(node_2, node_3)))
+            removed.add((min(node_3, node_4), max(node_3, node_4)))
+
+            open_gain += self.dist(node_3, node_4)
+            if (gain := open_gain - self.dist(node_4, node_1)) > best_gain:
+                best_gain, best_depth = gain, len(exchanges)
+
+            if len(exchanges) == self.max_depth:
+                break
+
+            # Next exchange: (t1, t4) is the edge to remove, t4 taking the place of t2
+            node_2 = node_4
+            forward = self.next(node_1) == node_2
+            best_candidate, best_partial_gain = None, 0
+
+            for node_3 in self.neighbours[node_2]:
+                if (partial_gain := open_gain - self.dist(node_2, node_3)) <= EPSILON:
+                    break
+
+                node_4 = self.next(node_3, not forward)
+                if node_3 == node_1 or node_4 == node_2 or (min(node_2, node_3), max(node_2, node_3)) in removed \
+                        or (min(node_3, node_4), max(node_3, node_4)) in added:
+                    continue
+
+                if best_candidate is None or partial_gain + self.dist(node_3, node_4) > best_partial_gain:
+                    best_candidate, best_partial_gain = (node_3, node_4), partial_gain + self.dist(node_3, node_4)
+
+            if best_candidate is None:
+                break
+
+            node_3, node_4 = best_candidate
+            open_gain = best_partial_gain - self.dist(node_3, node_4)
+
+        # Undoing the exchanges after the shortest tour (all of them if none improves it)
+        for node_a, node_b, node_c, node_d in reversed(exchanges[best_depth:]):
+            self.exchange(node_a, node_c, node_b, node_d)
+
+        return best_gain, exchanges[:best_depth]
+
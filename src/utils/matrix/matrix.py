@@ -1,22 +1,103 @@
 import csv
-import itertools
 import math
 import numpy as np
 
 from ..definitions.definitions import get_abs_path
+from ..distances import distances
+from ..instance_cache import instance_cache
+from ..neighbours import neighbours
+from ..tsplib import tsplib
+
+# Number of rows of the distance matrix computed at once. It bounds the temporary arrays of the tiled build to
+# BLOCK_SIZE x N elements, instead of N x N, when the search space gets large.
+BLOCK_SIZE = 1024
 
 
 class Matrix:
     """
     This class obtains a distance matrix from a csv file and stores the coordinates of each node.
+
+    The search space can also be given in memory, either as a list of coordinates (coord_list) or as a precomputed
+    distance matrix (matrix). In the latter case, the coordinates are optional (they are only used for plotting).
+
+    The coordinates and the distance matrix of the files loaded are cached on disk (see utils.instance_cache) unless
+    cache is False, the matrix being memory-mapped when loaded from the cache.
+
+    The distances are stored by one of the following backends (distance), all of them indexed like the dense matrix
+    (see utils.distances):
+    - 'dense': N x N matrix (NumPy array).
+    - 'condensed': upper triangle of the matrix in float32, a quarter of the memory of the dense matrix.
+    - 'oracle': distances computed on the fly from the coordinates, in O(N) memory, for very large search spaces.
     """
-    def __init__(self, path_file=''):
-        if len(path_file) < 1:
+    def __init__(self, path_file='', coord_list=None, matrix=None, cache=True, distance='dense'):
+        assert distance in distances.DISTANCES, \
+            f'Unknown distance backend: {distance}. To choose from: {", ".join(distances.DISTANCES)}'
+
+        self.neighbours = {}  # cache of candidate lists of nearest neighbours, by number of neighbours
+        self.distance = distance
+
+        if matrix is not None:
+            self.coord_list = coord_list
+            self.matrix = matrix if isinstance(matrix, distances.Distance) else self.get_distances(matrix)
+            return
+
+        if coord_list is not None:
+            self.coord_list = [list(coord) for coord in coord_list]
+        elif len(path_file) < 1:
             self.coord_list = self.generate_random_search_space()
+        elif str(path_file).endswith('.tsp'):
+            self.load_tsplib_file(path_file)
+            return
+        elif cache:
+            self.load_cached_file(path_file)
+            return
         else:
             self.coord_list = self.load_file(path_file)
 
-        self.matrix = self.generate_matrix()
+        self.matrix = self.generate_distances()
+
+    def get_distances(self, matrix):
+        """
+        Store a precomputed distance matrix with the distance backend.
+        """
+        matrix = np.asarray(matrix, dtype=float)
+
+        assert matrix.ndim == 2 and matrix.shape[0] == matrix.shape[1], \
+            f'The distance matrix must be square. Shape given: {matrix.shape}'
+
+        if self.distance == 'condensed':
+            return distances.CondensedDistance.from_matrix(matrix)
+        if self.distance == 'oracle':
+            assert self.coord_list is not None, 'The distance oracle needs the coordinates of the nodes.'
+            return distances.CoordinateDistance(self.coord_list)
+
+        return matrix
+
+    def generate_distances(self):
+        """
+        Create the distances given a list of coordinates of each city with the distance backend.
+        """
+        if self.distance == 'condensed':
+            return distances.CondensedDistance.from_coordinates(self.coord_list)
+        if self.distance == 'oracle':
+            return distances.CoordinateDistance(self.coord_list)
+
+        return self.generate_matrix()
+
+    def get_neighbours(self, k=neighbours.K_NEAREST):
+        """
+        Get the candidate lists of the k nearest neighbours of each node. They are computed only once (from the
+        coordinates if available, otherwise from the distance matrix) and cached alongside the matrix.
+
+        :returns: array of shape N x k with the neighbours of each node, sorted by increasing distance
+        """
+        if k not in self.neighbours:
+            if self.coord_list is not None:
+                self.neighbours[k] = neighbours.get_nearest_neighbours(self.coord_list, k)
+            else:
+                self.neighbours[k] = neighbours.get_nearest_neighbours_from_matrix(self.matrix, k)
+
+        return self.neighbours[k]
 
     @classmethod
     def load_file(cls, file):
@@ -40,23 +121,64 @@ class Matrix:
 
         return cities_coordinates
 
-    def generate_matrix(self):
+    def load_tsplib_file(self, file):
+        """
+        Load the given TSPLIB .tsp file (see utils.tsplib). The distances are the ones defined by TSPLIB (e.g. rounded to
+        the nearest integer), so that the costs are comparable to the known optima.
+        """
+        assert self.distance != 'oracle', 'The distance oracle does not support the distances of TSPLIB files.'
+
+        instance = tsplib.load_instance(get_abs_path('data', file))
+        self.coord_list = instance.coord_list
+        self.matrix = self.get_distances(instance.matrix)
+
+    def load_cached_file(self, file):
+        """
+        Load the coordinates and the distance matrix of the given csv file from the instance cache, keyed by the content
+        of the file. Whatever is not cached yet is loaded or computed as usual, and then cached for the next time.
+        """
+        cache = instance_cache.InstanceCache()
+        key = cache.get_key(get_abs_path('data', file))
+
+        if (coord := cache.load(key, 'coordinates')) is not None:
+            self.coord_list = coord.tolist()
+        else:
+            self.coord_list = self.load_file(file)
+            cache.store(key, 'coordinates', np.asarray(self.coord_list, dtype=float))
+
+        if self.distance == 'oracle':
+            self.matrix = self.generate_distances()
+        elif (matrix := cache.load(key, self.distance, mmap=True)) is not None:
+            # Plain (read-only) array over the memory map, as indexing a np.memmap is much slower
+            self.matrix = np.asarray(matrix) if self.distance == 'dense' \
+                else distances.CondensedDistance(np.asarray(matrix), len(self.coord_list))
+        else:
+            self.matrix = self.generate_distances()
+            cache.store(key, self.distance, self.matrix if self.distance == 'dense' else self.matrix.data)
+
+    def generate_matrix(self, block_size=BLOCK_SIZE):
         """
         Create the distance matrix given a list of coordinates of each city.
 
-        Note: It would be resource efficient to compute and store (N+1)⋅N/2 elements instead of a matrix of N2.
-        This would be possible due to the properties of the symmetric matrix. But let's keep it simple by computing the
-        whole matrix.
+        The distances are computed with NumPy broadcasting. Small search spaces are built in one go, whereas larger
+        ones are built in tiles of block_size rows, so that the peak of temporary memory stays bounded by
+        block_size x N elements on top of the matrix itself.
+
+        Note: the condensed distance backend stores only the (N-1)⋅N/2 elements of the upper triangle of the symmetric
+        matrix, whereas the distance oracle stores none of them (see utils.distances).
 
         :returns: distance matrix
         """
-        num_of_cities = len(self.coord_list)
-        matrix = np.zeros(shape=(num_of_cities, num_of_cities))
-        for i, j in itertools.product(range(num_of_cities), range(num_of_cities)):
-            if i == j:
-                continue
-            dist = self.get_dist_two_nodes(self.coord_list, i, j)
-            matrix[i][j] = dist
+        coord = np.asarray(self.coord_list, dtype=float)
+        num_of_cities = len(coord)
+
+        if num_of_cities <= block_size:
+            return self.get_dist_block(coord, coord)
+
+        matrix = np.empty(shape=(num_of_cities, num_of_cities))
+        for start in range(0, num_of_cities, block_size):
+            stop = min(start + block_size, num_of_cities)
+            matrix[start:stop] = self.get_dist_block(coord[start:stop], coord)
         return matrix
 
     # functional method
@@ -74,18 +196,29 @@ class Matrix:
 
         return math.sqrt(pow((x_node_1 - x_node_2), 2) + pow((y_node_1 - y_node_2), 2))
 
+    @staticmethod
+    def get_dist_block(coord_a, coord_b):
+        """
+        Get the distances between every node of coord_a and every node of coord_b (vectorised version of
+        get_dist_two_nodes).
+
+        :returns: distance matrix of shape len(coord_a) x len(coord_b)
+        """
+        return distances.get_dist_block(coord_a, coord_b)
+
     @staticmethod
     def generate_random_search_space(nodes=25):
         """
         Generate a randomly generated search space given the number of nodes.
         :returns: list of coordinates of each node (city)
         """
-        np.random.seed(42)
+        # Local generator with a fixed seed, so that the search space is always the same without seeding the global one
+        random_state = np.random.RandomState(42)
 
         coord = []
         for _ in range(nodes):
-            x_node = np.random.uniform(0, 100)
-            y_node = np.random.uniform(0, 100)
+            x_node = random_state.uniform(0, 100)
+            y_node = random_state.uniform(0, 100)
             coord.append([x_node, y_node])
 
         return coord
@@ -0,0 +1,181 @@
+from collections import Counter, defaultdict
+import cProfile
+import io
+import json
+import os
+import pstats
+import tempfile
+import time
+import tracemalloc
+
+from ..observer.observer import Observer
+
+# Number of functions (cProfile) and allocation sites (tracemalloc) reported by the profiler
+PROFILE_TOP = 25
+
+
+class Metrics:
+    """
+    Instrumentation of a run of an algorithm: counters (evaluations, accepted and rejected moves, operator calls...)
+    and the time spent in each stage of the search (e.g. selection, crossover and mutation in GA).
+
+    Counters and timers are created on first use. Stages that are run many times per second (e.g. every move of SA) are
+    timed by the caller with perf_counter() and added up once with add_time(), coarser ones with the timer() context
+    manager.
+    """
+    def __init__(self):
+        self.counters = Counter()
+        self.times = defaultdict(float)
+        self.calls = Counter()
+
+    def count(self, name, value=1):
+        """
+        Increase the counter with the given name.
+        """
+        self.counters[name] += value
+
+    def add_time(self, stage, seconds, calls=1):
+        """
+        Add the given time, spent in the given number of calls, to the stage with the given name.
+        """
+        self.times[stage] += seconds
+        self.calls[stage] += calls
+
+    def timer(self, stage):
+        """
+        Context manager that adds the time spent within it to the stage with the given name.
+        """
+        return Timer(self, stage)
+
+    def reset(self):
+        self.counters.clear()
+        self.times.clear()
+        self.calls.clear()
+
+    def merge(self, metrics):
+        """
+        Add the counters and the times of the given metrics (either a Metrics object or the dictionary exported by
+        to_dict()), e.g. those of the islands of the island model.
+        """
+        if isinstance(metrics, Metrics):
+            metrics = metrics.to_dict()
+
+        self.counters.update(metrics['counters'])
+        for stage, timer in metrics['stages'].items():
+            self.times[stage] += timer['time']
+            self.calls[stage] += timer['calls']
+
+    def to_dict(self, wall_time=None):
+        """
+        Export the metrics as a dictionary serialisable to JSON. Given the wall time of the run, the rate per second of
+        each counter is added.
+        """
+        metrics = {
+            'counters': dict(self.counters),
+            'stages': {stage: {'time': self.times[stage], 'calls': self.calls[stage]} for stage in self.times},
+        }
+
+        if wall_time:
+            metrics['per_second'] = {name: value / wall_time for name, value in self.counters.items()}
+
+        return metrics
+
+
+class Timer:
+    """
+    Context manager timing a stage of the search (see Metrics.timer()).
+    """
+    __slots__ = ('metrics', 'stage', 'start')
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.metrics.add_time(self.stage, time.perf_counter() - self.start)
+
+
+class Profiler:
+    """
+    Context manager that profiles the code run within it: the time spent in each function (cProfile) and/or the memory
+    allocated by each line (tracemalloc). Both slow the code down, so they are only enabled on demand (see main.py).
+    """
+    def __init__(self, cpu=True, memory=False, top=PROFILE_TOP):
+        self.cpu = cpu
+        self.memory = memory
+        self.top = top
+        self.profile = None
+        self.snapshot = None
+        self.peak_memory = None
+
+    def __enter__(self):
+        if self.memory:
+            tracemalloc.start()
+        if self.cpu:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        return self
+
+    def __exit__(self, *args):
+        if self.cpu:
+            self.profile.disable()
+        if self.memory:
+            self.snapshot = tracemalloc.take_snapshot()
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    def report(self):
+        """
+        Get the report of the profile: the functions with the highest cumulative time and the lines that allocated the
+        most memory.
+        """
+        report = io.StringIO()
+
+        if self.profile is not None:
+            pstats.Stats(self.profile, stream=report).sort_stats('cumulative').print_stats(self.top)
+
+        if self.snapshot is not None:
+            report.write(f'Peak of traced memory: {self.peak_memory / 2 ** 20:.2f} MB\n')
+            for statistic in self.snapshot.statistics('lineno')[:self.top]:
+                report.write(f'{statistic}\n')
+
+        return report.getvalue()
+
+
+class MetricsObserver(Observer):
+    """
+    Observer that exports the metrics of the algorithm (along with its iterations and best cost so far) to a JSON file,
+    at most once every interval seconds while the algorithm runs, and once more when it finishes. The file is replaced
+    atomically, so that it can be read at any time (e.g. to follow a long run).
+    """
+    def __init__(self, path_file, interval=5.0):
+        super().__init__(interval)
+        self.path_file = path_file
+        self.start = time.perf_counter()
+
+    def update(self, algorithm, tour, cost):
+        self.export(algorithm, cost, finished=False)
+
+    def finish(self, algorithm, tour, cost, costs_list):
+        self.export(algorithm, cost, finished=True)
+
+    def export(self, algorithm, cost, finished):
+        wall_time = time.perf_counter() - self.start
+        metrics = {
+            'algorithm': algorithm.__doc__,
+            'finished': finished,
+            'cycles': algorithm.cycles,
+            'cost': float(cost),
+            'wall_time': wall_time,
+            'metrics': algorithm.metrics.to_dict(wall_time),
+        }
+
+        directory = os.path.dirname(os.path.abspath(self.path_file))
+        with tempfile.NamedTemporaryFile('w', dir=directory, suffix='.json', delete=False) as out_file:
+            json.dump(metrics, out_file, indent=2)
+        os.replace(out_file.name, self.path_file)
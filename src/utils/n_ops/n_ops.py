@@ -1,51 +1,137 @@
 from abc import ABCMeta, abstractmethod
-import random
+import numpy as np
 
+from ..rng import rng
 
-def get_operator_by_name(op_name):
-    ops_dict = {'rand_swap': RandomSwap(),
-                'rand_swap_adj': RandomSwapAdjacent(),
-                'inversion': Inversion(),
-                'two_opt': TwoOpt(),
-                'three_opt': ThreeOpt()}
+# Number of consecutive positions of the tour within which the cuts of the double bridge move are made
+DOUBLE_BRIDGE_WINDOW = 50
 
-    return ops_dict.get(op_name) or ops_dict.get('rand_swap')
+
+def get_operator_by_name(op_name, random_stream=None):
+    """
+    Get the operator with the given name, drawing its random numbers from the given stream (see utils.rng).
+    """
+    ops_dict = {'rand_swap': RandomSwap,
+                'rand_swap_adj': RandomSwapAdjacent,
+                'inversion': Inversion,
+                'two_opt': TwoOpt,
+                'three_opt': ThreeOpt,
+                'double_bridge': DoubleBridge,
+                'nn_swap': NeighbourSwap,
+                'nn_inversion': NeighbourInversion}
+
+    return (ops_dict.get(op_name) or ops_dict.get('rand_swap'))(random_stream=random_stream)
 
 
 class Operator:
     """
     Abstract class to be inherited by the different operators (random_swap, two-opt, inversion...)
+
+    The random moves are drawn from the given random stream (see utils.rng), usually the one of the algorithm, so that
+    the search is reproducible from its seed.
     """
     __metaclass__ = ABCMeta
 
-    @abstractmethod
-    def generate_candidate_solution(self, path: list) -> None:
+    def __init__(self, random_stream=None):
+        self.random_stream = random_stream or rng.RandomStream()
+
+    def generate_candidate_solution(self, path: list) -> list:
         """
         Given a list, generate a candidate solution based on the operator type.
         """
+        return self.apply_move(path, self.generate_move(path))
+
+    def generate_candidate_move(self, path: list, matrix) -> tuple:
+        """
+        Given a list, generate a move based on the operator type without applying it, along with the exact variation
+        of the cost of the tour that the move would produce. This avoids re-evaluating the whole tour (O(N)) for every
+        candidate solution, as only the few edges touched by the move are evaluated (O(1)).
+
+        :returns: tuple (move, delta), the move being applicable through apply_move()
+        """
+        move = self.generate_move(path)
+        return move, self.evaluate_move(path, move, matrix)
+
+    @abstractmethod
+    def generate_move(self, path: list) -> tuple:
+        """
+        Select the positions of the given list that the operator is going to modify.
+        """
+        return
+
+    @abstractmethod
+    def apply_move(self, path: list, move: tuple) -> list:
+        """
+        Modify the given list in place by applying a move obtained from generate_move().
+        """
+        return
+
+    @abstractmethod
+    def evaluate_move(self, path: list, move: tuple, matrix) -> float:
+        """
+        Get the variation of the cost of the tour if the move were applied to the given list.
+        """
         return
 
     # functional methods
-    @classmethod
-    def get_random_index(cls, range_list, num_indexes):
+    @staticmethod
+    def evaluate_swap(path, node_a, node_b, matrix):
+        """
+        Get the variation of the cost of the tour if the nodes at positions node_a and node_b were exchanged. Only the
+        (at most four) edges adjacent to both positions are evaluated, taking into account that they may be adjacent.
+        """
+        if node_a == node_b:
+            return 0
+
+        size = len(path)
+        edges = {(node_a - 1) % size, node_a, (node_b - 1) % size, node_b}
+
+        def city(i):
+            return path[node_b] if i == node_a else path[node_a] if i == node_b else path[i]
+
+        delta = 0
+        for i in edges:
+            j = (i + 1) % size
+            delta += matrix[city(i), city(j)] - matrix[path[i], path[j]]
+
+        return delta
+
+    @staticmethod
+    def evaluate_inversion(path, node_a, node_b, matrix):
+        """
+        Get the variation of the cost of the tour if the sub-array contained within node_a and node_b (node_a <= node_b)
+        were inverted. Only the two edges at both ends of the sub-array change, assuming a symmetric matrix.
+        """
+        size = len(path)
+        if node_b - node_a + 1 >= size - 1:
+            # Inverting the whole tour (or all of it but one node) only changes its direction.
+            return 0
+
+        prev_a, next_b = path[node_a - 1], path[(node_b + 1) % size]
+
+        return (matrix[prev_a, path[node_b]] + matrix[path[node_a], next_b]
+                - matrix[prev_a, path[node_a]] - matrix[path[node_b], next_b])
+
+    def get_random_index(self, range_list, num_indexes):
         """
         Get one or more randomly selected indexes from a given list.
         """
         assert num_indexes != 0, 'The number of indexes cannot be 0. It must be 1 or greater.'
 
+        randrange = self.random_stream.randrange
         if num_indexes == 1:
-            return random.randrange(range_list)
+            return randrange(range_list)
 
         assert num_indexes < range_list, 'More indexes to return than the size of current list.'
 
-        ret = [random.randrange(range_list)]
+        ret = [randrange(range_list)]
 
         for _ in range(num_indexes - 1):
-            next_rand_node = random.randrange(range_list)
+            next_rand_node = randrange(range_list)
 
             # Ensure that next_rand_node is not the same as the other random nodes generated
             while next_rand_node in ret:
-                next_rand_node = random.randrange(range_list)
+                next_rand_node = randrange(range_list)
 
             ret.append(next_rand_node)
 
@@ -55,57 +141,69 @@ class Operator:
 class RandomSwap(Operator):
     """Random Exchange"""
 
-    def generate_candidate_solution(self, path):
+    def generate_move(self, path):
         """
         Exchange two randomly selected (not necessarily adjacent) nodes.
         """
-        node_a, node_b = self.get_random_index(len(path), 2)
+        return tuple(self.get_random_index(len(path), 2))
 
+    def apply_move(self, path, move):
+        node_a, node_b = move
         path[node_a], path[node_b] = path[node_b], path[node_a]
 
         return path
 
+    def evaluate_move(self, path, move, matrix):
+        return self.evaluate_swap(path, *move, matrix)
+
 
 class RandomSwapAdjacent(Operator):
     """Random Exchange Adjacent"""
 
-    def generate_candidate_solution(self, path):
+    def generate_move(self, path):
         """
         Exchange two randomly selected adjacent nodes.
         """
         node_a = self.get_random_index(len(path) - 1, 1)
-        node_b = node_a + 1
 
+        return node_a, node_a + 1
+
+    def apply_move(self, path, move):
+        node_a, node_b = move
         path[node_a], path[node_b] = path[node_b], path[node_a]
 
         return path
 
+    def evaluate_move(self, path, move, matrix):
+        return self.evaluate_swap(path, *move, matrix)
+
 
 class Inversion(Operator):
     """Inversion"""
 
-    def generate_candidate_solution(self, path):
+    def generate_move(self, path):
         """
         Invert the sub-array contained within two randomly selected nodes.
         """
-        node_a, node_b = sorted(self.get_random_index(len(path), 2))
-
-        diff = node_b - node_a + 1
+        return tuple(sorted(self.get_random_index(len(path), 2)))
 
-        for i in range(diff // 2):
-            path[node_a + i], path[node_b - i] = path[node_b - i], path[node_a + i]
+    def apply_move(self, path, move):
+        node_a, node_b = move
+        path[node_a:node_b + 1] = path[node_a:node_b + 1][::-1]
 
         return path
 
+    def evaluate_move(self, path, move, matrix):
+        return self.evaluate_inversion(path, *move, matrix)
+
 
 class TwoOpt(Operator):
     """2-Opt"""
 
-    def generate_candidate_solution(self, path):
+    def generate_move(self, path):
         """
         Remove randomly 2 edges and replace all the possible permutations.
         """
-
         node_a = self.get_random_index(len(path) - 1, 1)
         node_b = node_a + 1
 
@@ -119,16 +217,197 @@ class TwoOpt(Operator):
         # Then only one permutation is to be compared with the original path
 
         # Swap node_b and node_c:
+        return node_b, node_c
+
+    def apply_move(self, path, move):
+        node_b, node_c = move
         path[node_b], path[node_c] = path[node_c], path[node_b]
 
         return path
 
+    def evaluate_move(self, path, move, matrix):
+        return self.evaluate_swap(path, *move, matrix)
+
 
 class ThreeOpt(Operator):
     """3-Opt"""
 
-    def generate_candidate_solution(self, path):
+    def generate_move(self, path):
         """
-        Remove randomly 3 edges and replace all the possible permutations.
+        Segment insertion (Or-opt), the 3-opt move that preserves the tour as a single cycle without inverting long
+        paths: a random segment of up to 3 nodes is removed and inserted, as it is or inverted, after another randomly
+        selected node of the tour.
+
+        :returns: tuple (start, end, node_c, invert), the segment being the positions start..end (start <= end)
         """
-        return
+        size = len(path)
+        if size < 4:
+            return 0, 0, 0, False
+
+        length = self.random_stream.randint(1, min(3, size - 3))
+        start = self.random_stream.randrange(size - length + 1)
+        end = start + length - 1
+        # Any position outside the segment but the one right before it (which would leave the tour unchanged)
+        node_c = (end + 1 + self.random_stream.randrange(size - length - 1)) % size
+
+        return start, end, node_c, self.random_stream.random() < 0.5
+
+    def apply_move(self, path, move):
+        start, end, node_c, invert = move
+        if start <= node_c <= end:
+            return path
+
+        segment = list(path[start:end + 1])
+        if invert:
+            segment.reverse()
+
+        if node_c > end:
+            path[start:node_c + 1] = list(path[end + 1:node_c + 1]) + segment
+        else:
+            path[node_c + 1:end + 1] = segment + list(path[node_c + 1:start])
+
+        return path
+
+    def evaluate_move(self, path, move, matrix):
+        """
+        Replace the edges (p, a), (e, n) and (c, d) by (p, n), (c, a) and (e, d), a..e being the segment.
+        """
+        start, end, node_c, invert = move
+        if start <= node_c <= end:
+            return 0
+
+        size = len(path)
+        node_a, node_e = (path[end], path[start]) if invert else (path[start], path[end])
+        prev_a, next_e = path[start - 1], path[(end + 1) % size]
+        city_c, next_c = path[node_c], path[(node_c + 1) % size]
+
+        return (matrix[prev_a, next_e] + matrix[city_c, node_a] + matrix[node_e, next_c]
+                - matrix[prev_a, path[start]] - matrix[path[end], next_e] - matrix[city_c, next_c])
+
+
+class DoubleBridge(Operator):
+    """Double Bridge"""
+
+    def generate_move(self, path):
+        """
+        Cut the tour into four segments A B C D and reconnect them as A C B D. This 4-opt move cannot be undone by 2-opt
+        or 3-opt moves, hence its use as the perturbation (kick) of iterated local search. The three cuts are made within
+        a random window of DOUBLE_BRIDGE_WINDOW positions, so that the local search only needs to repair a small region.
+
+        :returns: tuple (p1, p2, p3), the segments B and C being the positions p1..p2 - 1 and p2..p3 - 1
+        """
+        size = len(path)
+        if size < 8:
+            return 0, 0, 0
+
+        window = min(DOUBLE_BRIDGE_WINDOW, size)
+        start = self.random_stream.randrange(size - window + 1)
+
+        return tuple(start + 1 + i for i in sorted(self.get_random_index(window - 1, 3)))
+
+    def apply_move(self, path, move):
+        node_b, node_c, node_d = move
+        if not 0 < node_b < node_c < node_d < len(path):
+            return path
+
+        path[node_b:node_d] = list(path[node_c:node_d]) + list(path[node_b:node_c])
+
+        return path
+
+    def evaluate_move(self, path, move, matrix):
+        """
+        Replace the edges (a, b), (b', c) and (c', d) by (a, c), (c', b) and (b', d), b..b' and c..c' being the segments
+        B and C.
+        """
+        node_b, node_c, node_d = move
+        if not 0 < node_b < node_c < node_d < len(path):
+            return 0
+
+        end_a, start_b, end_b = path[node_b - 1], path[node_b], path[node_c - 1]
+        start_c, end_c, start_d = path[node_c], path[node_d - 1], path[node_d]
+
+        return (matrix[end_a, start_c] + matrix[end_c, start_b] + matrix[end_b, start_d]
+                - matrix[end_a, start_b] - matrix[end_b, start_c] - matrix[end_c, start_d])
+
+
+class NeighbourOperator(Operator):
+    """
+    Abstract class to be inherited by the operators restricted to candidate lists of nearest neighbours. Instead of
+    selecting positions uniformly at random, they select a random node and one of its nearest neighbours, and make them
+    adjacent in the tour. Most random moves connect far-apart nodes and are rejected, whereas these moves are promising.
+
+    The candidate lists (array of N x k nodes, see Matrix.get_neighbours()) are to be given before generating moves.
+    """
+    def __init__(self, neighbours=None, random_stream=None):
+        super().__init__(random_stream)
+        self.neighbours = neighbours
+
+    def get_random_neighbours(self, path):
+        """
+        Select a random position of the given list, and the position of a random nearest neighbour of its node.
+        """
+        assert self.neighbours is not None, 'The candidate lists of nearest neighbours have not been given.'
+
+        node_a = self.get_random_index(len(path), 1)
+        candidates = self.neighbours[path[node_a]]
+        city = candidates[self.get_random_index(len(candidates), 1)]
+
+        return node_a, self.get_position(path, city)
+
+    # functional methods
+    @staticmethod
+    def get_position(path, city):
+        """
+        Get the position of the given city in the list (either a list or a NumPy array).
+        """
+        if isinstance(path, list):
+            return path.index(city)
+
+        return int(np.flatnonzero(path == city)[0])
+
+
+class NeighbourSwap(NeighbourOperator):
+    """Nearest Neighbour Exchange"""
+
+    def generate_move(self, path):
+        """
+        Exchange the node following a randomly selected node with one of the nearest neighbours of the latter, so that
+        both become adjacent.
+        """
+        node_a, node_c = self.get_random_neighbours(path)
+
+        return (node_a + 1) % len(path), node_c
+
+    def apply_move(self, path, move):
+        node_b, node_c = move
+        path[node_b], path[node_c] = path[node_c], path[node_b]
+
+        return path
+
+    def evaluate_move(self, path, move, matrix):
+        return self.evaluate_swap(path, *move, matrix)
+
+
+class NeighbourInversion(NeighbourOperator):
+    """Nearest Neighbour Inversion"""
+
+    def generate_move(self, path):
+        """
+        Invert the sub-array between a randomly selected node and one of its nearest neighbours, so that both become
+        adjacent (2-opt move).
+        """
+        node_a, node_c = self.get_random_neighbours(path)
+
+        if node_a < node_c:
+            return node_a + 1, node_c
+
+        return node_c, max(node_a - 1, node_c)
+
+    def apply_move(self, path, move):
+        node_a, node_b = move
+        path[node_a:node_b + 1] = path[node_a:node_b + 1][::-1]
+
+        return path
+
+    def evaluate_move(self, path, move, matrix):
+        return self.evaluate_inversion(path, *move, matrix)
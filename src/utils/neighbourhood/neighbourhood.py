@@ -0,0 +1,157 @@
+import numpy as np
+
+# Maximum number of move deltas computed at once, to keep the temporary arrays bounded
+MAX_BLOCK_ELEMENTS = 1 << 22
+
+
+def get_swap_deltas(tour, matrix):
+    """
+    Get the variation of the cost of the tour for every exchange of two adjacent nodes, in one batch.
+
+    :returns: array of size N - 1, the i-th delta being the one of exchanging the nodes at positions i and i + 1
+    """
+    tour = np.asarray(tour)
+    size = len(tour)
+    if size < 3:
+        return np.zeros(max(size - 1, 0))
+
+    # p a b q -> p b a q
+    node_p, node_a = np.roll(tour, 1)[:-1], tour[:-1]
+    node_b, node_q = tour[1:], np.roll(tour, -2)[:-1]
+
+    return (matrix[node_p, node_b] + matrix[node_b, node_a] + matrix[node_a, node_q]
+            - matrix[node_p, node_a] - matrix[node_a, node_b] - matrix[node_b, node_q])
+
+
+def get_inversion_deltas(tour, matrix, start=0, stop=None):
+    """
+    Get the variation of the cost of the tour for every inversion of a sub-array (2-opt move) starting at the positions
+    start..stop - 1, in one batch. Only the two edges at both ends of each sub-array change, assuming a symmetric
+    matrix.
+
+    :returns: array of shape (stop - start) x N, the element (i, j) being the delta of inverting the sub-array
+    start + i..j. Moves that are not valid or do not change the tour (j <= i, whole tour) are set to infinity.
+    """
+    tour = np.asarray(tour)
+    size = len(tour)
+    stop = size if stop is None else stop
+
+    rows = np.arange(start, stop)
+    prev_i, node_i = tour[rows - 1], tour[rows]
+    next_j = np.roll(tour, -1)
+
+    deltas = matrix[prev_i[:, None], tour[None, :]] + matrix[node_i[:, None], next_j[None, :]]
+    deltas -= matrix[prev_i, node_i][:, None]
+    deltas -= matrix[tour, next_j][None, :]
+
+    cols = np.arange(size)
+    length = cols[None, :] - rows[:, None] + 1
+    deltas[(length < 2) | (length >= size - 1)] = np.inf
+
+    return deltas
+
+
+def get_batch_inversion_deltas(tours, matrices):
+    """
+    Batch version of get_inversion_deltas() for a stack of tours of the same size, each one with its own distance
+    matrix: the deltas of every inversion of every tour are computed at once.
+
+    :param tours: array of shape B x N
+    :param matrices: array of shape B x N x N
+    :returns: array of shape B x N x N, the element (b, i, j) being the delta of inverting the sub-array i..j of the
+    b-th tour. Moves that are not valid or do not change the tour (j <= i, whole tour) are set to infinity.
+    """
+    tours = np.asarray(tours)
+    batch, size = tours.shape
+
+    rows = np.arange(batch)[:, None]
+    prev, next_ = np.roll(tours, 1, axis=1), np.roll(tours, -1, axis=1)
+
+    deltas = matrices[rows[:, :, None], prev[:, :, None], tours[:, None, :]]
+    deltas += matrices[rows[:, :, None], tours[:, :, None], next_[:, None, :]]
+    deltas -= matrices[rows, prev, tours][:, :, None]
+    deltas -= matrices[rows, tours, next_][:, None, :]
+
+    cols = np.arange(size)
+    length = cols[None, :] - cols[:, None] + 1
+    deltas[:, (length < 2) | (length >= size - 1)] = np.inf
+
+    return deltas
+
+
+def get_best_swap(tour, matrix, admissible=None):
+    """
+    Get the best exchange of two adjacent nodes of the tour.
+
+    :param admissible: function (move, delta) -> bool that rules out moves (e.g. tabu moves), all admissible by default
+    :returns: tuple (move, delta), the move being the positions (i, i + 1), or (None, None) if there is none admissible
+    """
+    deltas = get_swap_deltas(tour, matrix)
+
+    for i in get_sorted_candidates(deltas, admissible):
+        if admissible is None or admissible((i, i + 1), deltas[i]):
+            return (i, i + 1), deltas[i]
+
+    return None, None
+
+
+def get_best_inversion(tour, matrix, admissible=None, max_block_elements=MAX_BLOCK_ELEMENTS):
+    """
+    Get the best inversion of a sub-array (2-opt move) of the tour. The O(N^2) deltas are computed in blocks of rows.
+
+    :param admissible: function (move, delta) -> bool that rules out moves (e.g. tabu moves), all admissible by default
+    :returns: tuple (move, delta), the move being the positions (i, j), i < j, of the sub-array to invert, or
+    (None, None) if there is none admissible
+    """
+    size = len(tour)
+    block_size = max(max_block_elements // max(size, 1), 1)
+    best_move, best_delta = None, None
+
+    for start in range(0, max(size - 2, 0), block_size):
+        deltas = get_inversion_deltas(tour, matrix, start, min(start + block_size, size))
+
+        for k in get_sorted_candidates(deltas, admissible):
+            move, delta = (start + k // size, k % size), deltas.flat[k]
+
+            if best_delta is not None and delta >= best_delta:
+                break
+            if admissible is None or admissible(move, delta):
+                best_move, best_delta = move, delta
+                break
+
+    return best_move, best_delta
+
+
+def get_neighbourhood_size(size, neighbourhood='swap'):
+    """
+    Get the number of moves scored by get_best_swap() ('swap') or get_best_inversion() ('two_opt') for a tour of the
+    given size.
+    """
+    if neighbourhood == 'two_opt':
+        return max(size - 3, 0) * (size + 2) // 2
+
+    return max(size - 1, 0)
+
+
+# functional methods
+def get_sorted_candidates(deltas, admissible=None):
+    """
+    Iterate over the (flat) indexes of the finite deltas in increasing order. The best one is found in O(N), and the
+    rest are only sorted if it is not admissible.
+    """
+    flat = deltas.ravel()
+    if not len(flat):
+        return
+
+    best = int(np.argmin(flat))
+    if not np.isfinite(flat[best]):
+        return
+    yield best
+
+    if admissible is None:
+        return
+
+    for i in np.argsort(flat, kind='stable')[1:]:
+        if not np.isfinite(flat[i]):
+            return
+        yield int(i)
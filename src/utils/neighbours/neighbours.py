@@ -0,0 +1,136 @@
+import math
+import numpy as np
+
+# Default number of nearest neighbours of each node in the candidate lists
+K_NEAREST = 10
+
+# Maximum number of candidate distances computed at once, to keep the temporary arrays bounded
+MAX_BLOCK_ELEMENTS = 1 << 22
+
+# Below this number of nodes, candidates are obtained by brute force (all the distances), which is faster
+MIN_GRID_NODES = 2048
+
+
+def get_nearest_neighbours(coord_list, k=K_NEAREST):
+    """
+    Get the k nearest neighbours of each node given the list of coordinates of each node.
+
+    Nodes are bucketed into a uniform grid of about two nodes per cell, so that the candidates of each node are the
+    nodes in the surrounding cells instead of all the nodes. The ring of surrounding cells is widened for the nodes
+    whose k-th neighbour could lie outside of it, which makes the result exact. All the distances are computed in
+    vectorised blocks.
+
+    :returns: array of shape N x k with the neighbours of each node, sorted by increasing distance
+    """
+    coord = np.asarray(coord_list, dtype=float)
+    nodes = len(coord)
+    k = min(k, nodes - 1)
+
+    if k < 1:
+        return np.empty((nodes, 0), dtype=np.int32)
+
+    if nodes < MIN_GRID_NODES:
+        return get_nearest_candidates(coord, np.arange(nodes), np.broadcast_to(np.arange(nodes), (nodes, nodes)), k)[0]
+
+    # Grid of cells_per_axis x cells_per_axis cells
+    cells_per_axis = max(int(math.sqrt(nodes / 2)), 1)
+    lower = coord.min(axis=0)
+    cell_size = np.maximum((coord.max(axis=0) - lower) / cells_per_axis, np.finfo(float).tiny)
+    cell_coord = np.minimum(((coord - lower) / cell_size).astype(np.int64), cells_per_axis - 1)
+
+    # Shortest distance to a node outside the ring of cells, per ring. An axis along which all the nodes lie in the same
+    # cells (e.g. nodes on a line) does not bound it, as no node can be outside the ring along that axis.
+    reach = np.where(coord.max(axis=0) > lower, cell_size, np.inf).min()
+
+    # Table of the nodes within each cell (one row per cell, padded with -1)
+    cell_ids = cell_coord[:, 0] * cells_per_axis + cell_coord[:, 1]
+    order = np.argsort(cell_ids, kind='stable')
+    counts = np.bincount(cell_ids, minlength=cells_per_axis ** 2)
+    rank = np.arange(nodes) - (np.cumsum(counts) - counts)[cell_ids[order]]
+    cell_table = np.full((cells_per_axis ** 2, counts.max()), -1, dtype=np.int64)
+    cell_table[cell_ids[order], rank] = order
+
+    neighbours = np.empty((nodes, k), dtype=np.int32)
+    pending = np.arange(nodes)
+    ring = 1
+    while len(pending):
+        if ring >= cells_per_axis:
+            # The ring covers the whole grid: every node is a candidate
+            candidates = np.broadcast_to(np.arange(nodes), (len(pending), nodes))
+            neighbours[pending] = get_nearest_candidates(coord, pending, candidates, k)[0]
+            break
+
+        # Candidates of each pending node: nodes in the (2 * ring + 1)^2 cells around its own cell
+        offsets = np.arange(-ring, ring + 1)
+        cells_x = cell_coord[pending, 0, np.newaxis, np.newaxis] + offsets[:, np.newaxis]
+        cells_y = cell_coord[pending, 1, np.newaxis, np.newaxis] + offsets[np.newaxis, :]
+        inside = (cells_x >= 0) & (cells_x < cells_per_axis) & (cells_y >= 0) & (cells_y < cells_per_axis)
+        cells = np.where(inside, cells_x * cells_per_axis + cells_y, -1).reshape(len(pending), -1)
+
+        found, kth_dist = np.empty((len(pending), k), dtype=np.int32), np.empty(len(pending))
+        block = max(MAX_BLOCK_ELEMENTS // (cells.shape[1] * cell_table.shape[1]), 1)
+        for start in range(0, len(pending), block):
+            block_cells = cells[start:start + block]
+            candidates = np.where(block_cells[:, :, np.newaxis] >= 0, cell_table[block_cells], -1)
+            found[start:start + block], kth_dist[start:start + block] = get_nearest_candidates(
+                coord, pending[start:start + block], candidates.reshape(len(block_cells), -1), k)
+
+        # Exact if the k-th neighbour is closer than any node outside the ring of cells
+        exact = kth_dist <= ring * reach
+        neighbours[pending[exact]] = found[exact]
+        pending = pending[~exact]
+        ring *= 2
+
+    return neighbours
+
+
+def get_nearest_neighbours_from_matrix(distances, k=K_NEAREST):
+    """
+    Get the k nearest neighbours of each node given the matrix of distances (when the coordinates are not available).
+
+    :returns: array of shape N x k with the neighbours of each node, sorted by increasing distance
+    """
+    nodes = len(distances)
+    k = min(k, nodes - 1)
+    neighbours = np.empty((nodes, max(k, 0)), dtype=np.int32)
+
+    if k < 1:
+        return neighbours
+
+    block = max(MAX_BLOCK_ELEMENTS // nodes, 1)
+    for start in range(0, nodes, block):
+        rows = np.arange(start, min(start + block, nodes))
+        dist = np.array(distances[start:start + block], dtype=float)
+        dist[np.arange(len(rows)), rows] = np.inf
+        nearest = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        nearest_dist = np.take_along_axis(dist, nearest, axis=1)
+        neighbours[rows] = np.take_along_axis(nearest, np.argsort(nearest_dist, axis=1, kind='stable'), axis=1)
+
+    return neighbours
+
+
+def get_nearest_candidates(coord, nodes, candidates, k):
+    """
+    Get the k nearest candidates of each given node. Each row of candidates holds the candidates of a node, -1 being
+    an empty slot.
+
+    :returns: tuple (array of the k nearest candidates of each node sorted by distance, distance to the k-th one)
+    """
+    valid = (candidates >= 0) & (candidates != nodes[:, np.newaxis])
+    candidate_coord = coord[np.maximum(candidates, 0)]
+    diff = candidate_coord - coord[nodes, np.newaxis]
+    dist = np.where(valid, np.sqrt(diff[..., 0] * diff[..., 0] + diff[..., 1] * diff[..., 1]), np.inf)
+
+    if dist.shape[1] < k:
+        padding = np.full((len(dist), k - dist.shape[1]), np.inf)
+        dist = np.concatenate((dist, padding), axis=1)
+        candidates = np.concatenate((candidates, np.full(padding.shape, -1)), axis=1)
+
+    nearest = np.argpartition(dist, k - 1, axis=1)[:, :k]
+    nearest_dist = np.take_along_axis(dist, nearest, axis=1)
+    order = np.argsort(nearest_dist, axis=1, kind='stable')
+
+    nearest = np.take_along_axis(np.take_along_axis(candidates, nearest, axis=1), order, axis=1)
+    nearest_dist = np.take_along_axis(nearest_dist, order, axis=1)
+
+    return nearest.astype(np.int32), nearest_dist[:, -1]
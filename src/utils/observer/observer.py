@@ -0,0 +1,57 @@
+from abc import ABCMeta, abstractmethod
+import time
+
+
+class Observer:
+    """
+    Abstract class to be inherited by the observers of the progress of an algorithm (plots, logs, progress reports...).
+
+    Updates are rate-limited by wall time rather than by iteration: an observer is updated at most once every interval
+    seconds, no matter how many times the algorithm notifies it in between. This keeps the cost of observing a fast
+    search loop bounded.
+    """
+    __metaclass__ = ABCMeta
+
+    def __init__(self, interval=0.0):
+        self.interval = interval
+        self.last_update = None
+
+    def notify(self, algorithm, tour, cost, force=False):
+        """
+        Update the observer with the given solution unless it has already been updated within the last interval.
+        """
+        now = time.perf_counter()
+        if force or self.last_update is None or now - self.last_update >= self.interval:
+            self.last_update = now
+            self.update(algorithm, list(tour), cost)
+
+    @abstractmethod
+    def update(self, algorithm, tour, cost):
+        """
+        Receive the best solution found so far by the algorithm.
+        """
+        return
+
+    def finish(self, algorithm, tour, cost, costs_list):
+        """
+        Receive the final solution of the algorithm and the history of its costs once the stopping criterion is met.
+        """
+        return
+
+
+class CallbackObserver(Observer):
+    """
+    Observer that calls the given function as callback(algorithm, tour, cost) on every (rate-limited) update, and
+    optionally on_finish(algorithm, tour, cost, costs_list) at the end of the run.
+    """
+    def __init__(self, callback, interval=0.0, on_finish=None):
+        super().__init__(interval)
+        self.callback = callback
+        self.on_finish = on_finish
+
+    def update(self, algorithm, tour, cost):
+        self.callback(algorithm, tour, cost)
+
+    def finish(self, algorithm, tour, cost, costs_list):
+        if self.on_finish is not None:
+            self.on_finish(algorithm, list(tour), cost, costs_list)
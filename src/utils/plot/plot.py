@@ -0,0 +1,94 @@
+import matplotlib.pyplot as plt
+
+from ..observer.observer import Observer
+
+
+class PlotObserver(Observer):
+    """
+    Observer that plots the best path found so far while the algorithm runs, and its learning process once it has
+    finished. This is the only module that depends on matplotlib, so that the algorithms can run headless.
+    """
+    def __init__(self, interval=0.1, pause=0.001):
+        super().__init__(interval)
+        self.pause = pause
+
+        plt.rcParams["figure.figsize"] = (10, 8)
+        plt.tight_layout()
+
+    def update(self, algorithm, tour, cost):
+        plt.cla()
+        self.plot_path(algorithm.matrix.coord_list, tour, f'{algorithm.__doc__} using {algorithm.n_op.__doc__}',
+                       f'Iteration: {algorithm.cycles} \nCost: {round(cost)}')
+        plt.pause(self.pause)
+
+    def finish(self, algorithm, tour, cost, costs_list):
+        # The last solution may have been skipped by the rate limit
+        self.notify(algorithm, tour, cost, force=True)
+        plt.show(block=True)
+
+        self.plot_convergence(costs_list, f'{algorithm.__doc__} minimisation convergence',
+                              x_label=f'Total iterations: {algorithm.cycles}', y_label='Cost')
+
+    @staticmethod
+    def get_limits(coord_list):
+        """
+        Get the limits of the axes given the coordinates of each city.
+        """
+        x_coord, y_coord = zip(*coord_list)
+        x_min, x_max = min(x_coord), max(x_coord)
+        y_min, y_max = min(y_coord), max(y_coord)
+
+        return (x_min - x_max * 0.1, x_max + x_max * 0.1), (y_min - y_max * 0.1, y_max + y_max * 0.1)
+
+    @classmethod
+    def plot_path(cls, coord_list, tour, title='', subtitle=''):
+        """
+        Plot the given path of nodes to visualise the result.
+        """
+        x_lim, y_lim = cls.get_limits(coord_list)
+        plt.xlim(*x_lim)
+        plt.ylim(*y_lim)
+
+        x_coord, y_coord = zip(*coord_list)
+        plt.scatter(x_coord, y_coord, color='black')
+
+        path_x = [x_coord[val] for val in tour]
+        path_y = [y_coord[val] for val in tour]
+
+        # adding the last city to come back to the starting point
+        path_x.append(path_x[0])
+        path_y.append(path_y[0])
+
+        plt.suptitle(title, fontsize=16)
+        plt.title(subtitle, fontsize=14)
+
+        plt.plot(path_x, path_y, color='green')
+
+    @classmethod
+    def plot_search_space(cls, coord_list, title='', subtitle=''):
+        """
+        Plot search space of all the cities without the tours.
+        """
+        plt.rcParams["figure.figsize"] = (10, 8)
+        plt.tight_layout()
+        x_lim, y_lim = cls.get_limits(coord_list)
+        plt.xlim(*x_lim)
+        plt.ylim(*y_lim)
+
+        plt.suptitle(title, fontsize=16)
+        plt.title(subtitle, fontsize=14)
+
+        x_coord, y_coord = zip(*coord_list)
+        plt.scatter(x_coord, y_coord, color='black')
+        plt.show()
+
+    @staticmethod
+    def plot_convergence(costs_list, title, x_label='', y_label=''):
+        """
+        Plot learning process (decrease of travelling cost) of algorithm over time.
+        """
+        plt.suptitle(title, fontsize=16)
+        plt.xlabel(x_label, fontsize=12)
+        plt.ylabel(y_label, fontsize=12)
+        plt.plot(costs_list)
+        plt.show()
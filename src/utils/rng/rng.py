@@ -0,0 +1,77 @@
+import numpy as np
+
+# Number of random numbers drawn at once by a RandomStream
+BUFFER_SIZE = 4096
+
+
+def get_generator(seed=None):
+    """
+    Get an independent random generator (PCG64) from the given seed: None (fresh entropy), an integer, a SeedSequence
+    or a generator, which is returned as it is.
+    """
+    if isinstance(seed, np.random.Generator):
+        return seed
+
+    return np.random.Generator(np.random.PCG64(seed))
+
+
+def spawn_seeds(seed, size):
+    """
+    Get the given number of independent seeds derived from the given one (e.g. one for each restart or island), so that
+    parallel runs are both reproducible and statistically independent.
+
+    :returns: list of integers
+    """
+    return [int(i.generate_state(1)[0]) for i in np.random.SeedSequence(seed).spawn(size)]
+
+
+class RandomStream:
+    """
+    Random numbers of an algorithm (and its operators), drawn from its own generator so that runs are reproducible from
+    their seed and isolated from one another, instead of sharing the global state of the random modules.
+
+    The numbers used one by one in the search loops are drawn from the generator in batches of buffer_size and served
+    from a buffer, as a single draw from NumPy costs much more than a batch divided by its size. Arrays of random numbers
+    are drawn from the generator directly.
+    """
+    def __init__(self, seed=None, buffer_size=BUFFER_SIZE):
+        self.generator = get_generator(seed)
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.index = 0
+
+    def random(self):
+        """
+        Get a random float in [0, 1).
+        """
+        if self.index == len(self.buffer):
+            self.buffer = self.generator.random(self.buffer_size).tolist()
+            self.index = 0
+
+        value = self.buffer[self.index]
+        self.index += 1
+        return value
+
+    def randrange(self, stop):
+        """
+        Get a random integer in [0, stop).
+        """
+        return int(self.random() * stop)
+
+    def randint(self, start, stop):
+        """
+        Get a random integer in [start, stop], both included.
+        """
+        return start + self.randrange(stop - start + 1)
+
+    def choice(self, sequence):
+        """
+        Get a random element of the given non-empty sequence.
+        """
+        return sequence[self.randrange(len(sequence))]
+
+    def spawn(self, size):
+        """
+        Get the given number of independent seeds derived from this stream (see spawn_seeds()).
+        """
+        return spawn_seeds(int(self.generator.integers(2 ** 63)), size)
@@ -0,0 +1,93 @@
+import numpy as np
+
+from ..rng import rng
+
+
+def get_selection_by_name(selection_name):
+    """
+    Get the selection scheme with the given name. All of them are called as selection(fitness, size, tournament_size,
+    generator), the random numbers being drawn from the given NumPy generator (see utils.rng).
+    """
+    selection_dict = {
+        'roulette': roulette_wheel,
+        'sus': stochastic_universal_sampling,
+        'tournament': tournament
+    }
+    return selection_dict.get(selection_name) or selection_dict.get('roulette')
+
+
+def roulette_wheel(fitness, size, tournament_size=None, generator=None):
+    """
+    Roulette Wheel selection: each chromosome is selected with a probability proportional to its fitness. Each of the
+    random numbers is located in the cumulative sum of the fitness scores by binary search (O(P log P) in total).
+
+    Warning: this approach may lead to premature convergence, as super-chromosomes with high fitness values will
+    quickly dominate the population.
+
+    :returns: array with the indexes of the selected chromosomes
+    """
+    cumulative_fitness = get_cumulative_fitness(fitness)
+    pointers = rng.get_generator(generator).random(size) * cumulative_fitness[-1]
+
+    return np.minimum(np.searchsorted(cumulative_fitness, pointers, side='right'), len(fitness) - 1)
+
+
+def stochastic_universal_sampling(fitness, size, tournament_size=None, generator=None):
+    """
+    Stochastic Universal Sampling: like the roulette wheel, but the chromosomes are selected by equally spaced pointers
+    from a single random number. Each chromosome is then selected a number of times within one of its expected number
+    of selections, which reduces the bias of the roulette wheel.
+
+    :returns: array with the indexes of the selected chromosomes
+    """
+    cumulative_fitness = get_cumulative_fitness(fitness)
+    pointers = (rng.get_generator(generator).random() + np.arange(size)) * (cumulative_fitness[-1] / max(size, 1))
+
+    return np.minimum(np.searchsorted(cumulative_fitness, pointers, side='right'), len(fitness) - 1)
+
+
+def tournament(fitness, size, tournament_size=3, generator=None):
+    """
+    k-Tournament selection: each selected chromosome is the fittest of k chromosomes drawn at random. It only depends on
+    the ranking of the fitness scores, and the selection pressure grows with k. Its cost is O(P k).
+
+    :returns: array with the indexes of the selected chromosomes
+    """
+    contestants = rng.get_generator(generator).integers(0, len(fitness), size=(size, max(tournament_size, 1)))
+    winners = np.argmax(fitness[contestants], axis=1)
+
+    return contestants[np.arange(size), winners]
+
+
+def get_elites(fitness, size):
+    """
+    Get the indexes of the chromosomes ordered so that the given number of fittest chromosomes come first, the fittest
+    of all being the first one. The population is partitioned in O(P) instead of being sorted.
+
+    :returns: array with all the indexes of the population
+    """
+    population_size = len(fitness)
+    if not population_size:
+        return np.arange(0)
+
+    if 0 < size < population_size:
+        order = np.argpartition(-fitness, size - 1)
+    else:
+        order = np.arange(population_size)
+
+    # Fittest chromosome first
+    best = np.argmax(fitness[order[:max(size, 1)]])
+    order[0], order[best] = order[best], order[0]
+
+    return order
+
+
+# functional methods
+def get_cumulative_fitness(fitness):
+    """
+    Cumulative sum of the fitness scores. If all of them are zero, every chromosome gets the same chance.
+    """
+    if not fitness.sum() > 0:
+        fitness = np.ones(len(fitness))
+
+    return np.cumsum(fitness)
@@ -0,0 +1,58 @@
+from collections import Counter
+
+# During diversification, moves made more than this times the average frequency are avoided
+FREQUENCY_FACTOR = 3
+
+
+class TabuMemory:
+    """
+    Memory of the tabu search keyed by the attributes of the moves (the pair of nodes of each move), regardless of the
+    order of the nodes.
+
+    - Short-term memory: the iteration until which each pair is tabu, so that checking whether a move is tabu takes
+      O(1) regardless of the tenure. Expired pairs are purged once they outnumber the ones that may still be tabu.
+    - Long-term memory: the number of times each pair has been moved (frequency memory), to avoid the most frequent
+      moves when diversifying the search.
+    """
+    def __init__(self, tenure):
+        self.tenure = tenure
+        self.iteration = 0
+        self.expiry = {}
+        self.frequency = Counter()
+        self.moves = 0
+
+    def __len__(self):
+        return sum(1 for i in self.expiry.values() if i > self.iteration)
+
+    def step(self):
+        """
+        Move on to the next iteration.
+        """
+        self.iteration += 1
+
+        if len(self.expiry) > 2 * self.tenure:
+            self.expiry = {key: i for key, i in self.expiry.items() if i > self.iteration}
+
+    def add(self, node_a, node_b):
+        """
+        Make the pair of nodes tabu for the tenure and record the move in the frequency memory.
+        """
+        key = self.get_key(node_a, node_b)
+        self.expiry[key] = self.iteration + self.tenure
+        self.frequency[key] += 1
+        self.moves += 1
+
+    def is_tabu(self, node_a, node_b):
+        return self.expiry.get(self.get_key(node_a, node_b), 0) > self.iteration
+
+    def is_frequent(self, node_a, node_b):
+        """
+        Check whether the pair of nodes has been moved much more often than the average pair.
+        """
+        frequency = self.frequency.get(self.get_key(node_a, node_b), 0)
+        return frequency > 1 and frequency > FREQUENCY_FACTOR * self.moves / len(self.frequency)
+
+    # functional methods
+    @staticmethod
+    def get_key(node_a, node_b):
+        return (node_a, node_b) if node_a < node_b else (node_b, node_a)
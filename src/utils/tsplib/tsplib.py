@@ -0,0 +1,210 @@
+from dataclasses import dataclass
+import numpy as np
+
+# Length of the optimal tours of some TSPLIB instances (symmetric TSP), used to report the gap of a solution
+OPTIMA = {
+    'burma14': 3323,
+    'ulysses16': 6859,
+    'gr17': 2085,
+    'ulysses22': 7013,
+    'bayg29': 1610,
+    'bays29': 2020,
+    'att48': 10628,
+    'eil51': 426,
+    'berlin52': 7542,
+    'st70': 675,
+    'eil76': 538,
+    'pr76': 108159,
+    'gr96': 55209,
+    'rat99': 1211,
+    'kroA100': 21282,
+    'kroB100': 22141,
+    'kroC100': 20749,
+    'kroD100': 21294,
+    'kroE100': 22068,
+    'rd100': 7910,
+    'eil101': 629,
+    'lin105': 14379,
+    'pr107': 44303,
+    'ch130': 6110,
+    'ch150': 6528,
+    'tsp225': 3916,
+    'a280': 2579,
+    'pcb442': 50778,
+}
+
+# Radius of the Earth and value of pi as defined by TSPLIB for the GEO distances
+EARTH_RADIUS = 6378.388
+PI = 3.141592
+
+# Number of weights given by each format of explicit distance matrix, given the dimension n
+EDGE_WEIGHT_FORMATS = {
+    'FULL_MATRIX': lambda n: n * n,
+    'UPPER_ROW': lambda n: n * (n - 1) // 2,
+    'LOWER_ROW': lambda n: n * (n - 1) // 2,
+    'UPPER_DIAG_ROW': lambda n: n * (n + 1) // 2,
+    'LOWER_DIAG_ROW': lambda n: n * (n + 1) // 2,
+}
+
+
+@dataclass
+class Instance:
+    """
+    TSP instance loaded from a TSPLIB file.
+    """
+    name: str
+    dimension: int
+    edge_weight_type: str
+    coord_list: list  # coordinates of each node (display coordinates for explicit instances), None if not given
+    matrix: np.ndarray  # distance matrix, with the distances rounded as defined by TSPLIB
+
+    @property
+    def optimum(self):
+        return OPTIMA.get(self.name)
+
+
+def load_instance(path_file):
+    """
+    Load a TSPLIB .tsp file of a symmetric TSP. The file is read line by line. The distances supported are EUC_2D,
+    CEIL_2D, GEO, ATT and EXPLICIT (FULL_MATRIX, UPPER_ROW, LOWER_ROW, UPPER_DIAG_ROW and LOWER_DIAG_ROW).
+
+    :returns: Instance
+    """
+    specification = {}
+    coord, weights = None, None
+
+    with open(path_file, 'r', encoding='utf-8') as in_file:
+        lines = iter(in_file)
+        for line in lines:
+            if not (line := line.strip()) or line == 'EOF':
+                continue
+
+            section = line.split()[0].rstrip(':')
+            dimension = int(specification.get('DIMENSION', 0))
+
+            if section in ('NODE_COORD_SECTION', 'DISPLAY_DATA_SECTION'):
+                coord = read_coordinates(lines, dimension)
+            elif section == 'EDGE_WEIGHT_SECTION':
+                fmt = specification.get('EDGE_WEIGHT_FORMAT', 'FULL_MATRIX')
+                assert fmt in EDGE_WEIGHT_FORMATS, f'Unsupported EDGE_WEIGHT_FORMAT: {fmt}'
+                weights = read_numbers(lines, EDGE_WEIGHT_FORMATS[fmt](dimension))
+            elif ':' in line:
+                key, value = line.split(':', 1)
+                specification[key.strip()] = value.strip()
+
+    assert specification.get('TYPE', 'TSP') == 'TSP', f'Unsupported TYPE: {specification.get("TYPE")}'
+
+    dimension = int(specification['DIMENSION'])
+    edge_weight_type = specification.get('EDGE_WEIGHT_TYPE', 'EUC_2D')
+
+    if edge_weight_type == 'EXPLICIT':
+        assert weights is not None, 'EDGE_WEIGHT_SECTION not found'
+        matrix = get_explicit_distances(weights, dimension, specification.get('EDGE_WEIGHT_FORMAT', 'FULL_MATRIX'))
+    else:
+        assert coord is not None, 'NODE_COORD_SECTION not found'
+        matrix = get_distances(coord, edge_weight_type)
+
+    return Instance(name=specification.get('NAME', ''), dimension=dimension, edge_weight_type=edge_weight_type,
+                    coord_list=None if coord is None else coord.tolist(), matrix=matrix)
+
+
+def load_tour(path_file):
+    """
+    Load a TSPLIB .tour file (e.g. the optimal tour of an instance, .opt.tour).
+
+    :returns: list of the nodes of the tour, indexed from 0
+    """
+    tour = []
+    with open(path_file, 'r', encoding='utf-8') as in_file:
+        lines = iter(in_file)
+        for line in lines:
+            if line.strip().startswith('TOUR_SECTION'):
+                for line_tour in lines:
+                    for node in line_tour.split():
+                        if int(node) < 0:
+                            return tour
+                        tour.append(int(node) - 1)
+
+    return tour
+
+
+def get_distances(coord, edge_weight_type):
+    """
+    Get the distance matrix given the coordinates of each node, with the distance function of the given TSPLIB type.
+
+    :returns: matrix of integer distances (as floats)
+    """
+    if edge_weight_type == 'GEO':
+        # Coordinates given as DDD.MM (degrees and minutes)
+        degrees = np.trunc(coord)
+        radians = PI * (degrees + 5.0 * (coord - degrees) / 3.0) / 180.0
+        latitude, longitude = radians[:, 0], radians[:, 1]
+
+        q1 = np.cos(longitude[:, np.newaxis] - longitude[np.newaxis, :])
+        q2 = np.cos(latitude[:, np.newaxis] - latitude[np.newaxis, :])
+        q3 = np.cos(latitude[:, np.newaxis] + latitude[np.newaxis, :])
+        matrix = np.trunc(EARTH_RADIUS * np.arccos(np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1, 1)) + 1.0)
+        np.fill_diagonal(matrix, 0)
+
+        return matrix
+
+    diff_x = coord[:, 0, np.newaxis] - coord[np.newaxis, :, 0]
+    diff_y = coord[:, 1, np.newaxis] - coord[np.newaxis, :, 1]
+    squared = diff_x * diff_x + diff_y * diff_y
+
+    if edge_weight_type == 'EUC_2D':
+        return np.trunc(np.sqrt(squared) + 0.5)
+    if edge_weight_type == 'CEIL_2D':
+        return np.ceil(np.sqrt(squared))
+    if edge_weight_type == 'ATT':
+        # Pseudo-Euclidean distance: rounded up unless it is an integer
+        distances = np.sqrt(squared / 10.0)
+        rounded = np.trunc(distances + 0.5)
+        return np.where(rounded < distances, rounded + 1, rounded)
+
+    raise ValueError(f'Unsupported EDGE_WEIGHT_TYPE: {edge_weight_type}')
+
+
+def get_explicit_distances(weights, dimension, edge_weight_format):
+    """
+    Get the distance matrix given the weights of an EDGE_WEIGHT_SECTION in the given format.
+    """
+    if edge_weight_format == 'FULL_MATRIX':
+        return weights.reshape(dimension, dimension)
+
+    matrix = np.zeros((dimension, dimension))
+    diagonal = 'DIAG' in edge_weight_format
+    rows, cols = np.triu_indices(dimension, 0 if diagonal else 1)
+
+    if edge_weight_format.startswith('LOWER'):
+        # Row by row of the lower triangle, which is the upper triangle column by column
+        order = np.lexsort((rows, cols))
+        rows, cols = rows[order], cols[order]
+
+    matrix[rows, cols] = weights
+    matrix[cols, rows] = weights
+
+    return matrix
+
+
+# functional methods
+def read_coordinates(lines, dimension):
+    """
+    Read the coordinates of the given number of nodes from the lines of a section ("id x y" per line).
+    """
+    coord = np.empty((dimension, 2))
+    for i in range(dimension):
+        coord[i] = [float(value) for value in next(lines).split()[1:3]]
+
+    return coord
+
+
+def read_numbers(lines, count):
+    """
+    Read the given number of numbers from the lines of a section (any number of them per line).
+    """
+    numbers = []
+    while len(numbers) < count:
+        numbers.extend(float(value) for value in next(lines).split())
+
+    return np.array(numbers[:count])
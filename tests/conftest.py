@@ -0,0 +1,33 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+# The modules of the project are imported as the scripts of src/ import them (e.g. from utils.matrix import matrix)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from utils.matrix import matrix  # noqa: E402
+
+
+@pytest.fixture
+def make_search_space():
+    """
+    Factory of search spaces of random coordinates (Matrix objects), reproducible from their seed.
+    """
+    def make(size, seed=0, distance='dense'):
+        coord_list = np.random.default_rng(seed).uniform(0, 100, size=(size, 2)).tolist()
+        return matrix.Matrix(coord_list=coord_list, distance=distance)
+
+    return make
+
+
+def get_tour_cost(tour, distances):
+    """
+    Cost of the whole tour, computed from scratch (including the edge from the last city back to the first one).
+    """
+    return sum(distances[tour[i], tour[(i + 1) % len(tour)]] for i in range(len(tour)))
+
+
+@pytest.fixture
+def tour_cost():
+    return get_tour_cost
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from batch_solver import BatchSolver
+from utils.matrix import matrix
+
+# Instances of 3 different sizes, one of them given as a Matrix object
+SIZES = (5, 12, 12, 30, 30, 30, 12)
+
+
+def get_instances(sizes=SIZES, seed=0):
+    generator = np.random.default_rng(seed)
+    instances = [generator.uniform(0, 100, size=(size, 2)) for size in sizes]
+    instances[1] = matrix.Matrix(coord_list=instances[1].tolist())
+
+    return instances
+
+
+def get_distances(instance):
+    return instance.matrix if isinstance(instance, matrix.Matrix) else matrix.Matrix(coord_list=instance.tolist()).matrix
+
+
+def get_best_two_opt_delta(tour, distances):
+    """
+    Best delta of all the inversions of the tour, by brute force.
+    """
+    size, best = len(tour), 0.0
+    for i in range(1, size):
+        for j in range(i + 1, size):
+            node_a, node_b, node_c, node_d = tour[i - 1], tour[i], tour[j], tour[(j + 1) % size]
+            best = min(best, distances[node_a, node_c] + distances[node_b, node_d] - distances[node_a, node_b]
+                       - distances[node_c, node_d])
+
+    return best
+
+
+@pytest.mark.parametrize('method, polish', (('sa', False), ('sa', True), ('two_opt', False)))
+@pytest.mark.parametrize('init', ('random', 'greedy'))
+def test_costs_of_the_tours_returned(tour_cost, method, polish, init):
+    instances = get_instances()
+    results = BatchSolver(instances, method=method, polish=polish, init=init, seed=1).solve()
+
+    assert len(results) == len(instances)
+    for instance, result in zip(instances, results):
+        distances = get_distances(instance)
+        assert sorted(result.tour) == list(range(len(distances)))
+        assert result.cost == pytest.approx(tour_cost(result.tour, distances))
+
+
+@pytest.mark.parametrize('method, polish', (('sa', True), ('two_opt', False)))
+def test_two_opt_local_optima(method, polish):
+    instances = get_instances()
+    results = BatchSolver(instances, method=method, polish=polish, seed=1).solve()
+
+    for instance, result in zip(instances, results):
+        assert get_best_two_opt_delta(result.tour, get_distances(instance)) > -1e-6
+
+
+def test_annealing_improves_the_initial_tours(tour_cost):
+    instances = get_instances((30,) * 20)
+    results = BatchSolver(instances, method='sa', seed=1).solve()
+    random_costs = [tour_cost(np.random.default_rng(1).permutation(30), get_distances(i)) for i in instances]
+
+    assert all(result.cost < cost for result, cost in zip(results, random_costs))
+
+
+@pytest.mark.parametrize('method', ('sa', 'two_opt'))
+def test_same_seed_same_results(method):
+    first = BatchSolver(get_instances(), method=method, seed=3).solve()
+    second = BatchSolver(get_instances(), method=method, seed=3).solve()
+
+    assert [(i.tour, i.cost, i.cycles) for i in first] == [(i.tour, i.cost, i.cycles) for i in second]
+
+
+def test_deterministic_search_matches_per_instance_runs():
+    instances = get_instances()
+    batch = BatchSolver(instances, method='two_opt', init='greedy', seed=3, max_elements=2000).solve()
+
+    # Without random draws, the result of an instance does not depend on the rest of its batch, nor on how it is split
+    for instance, result in zip(instances, batch):
+        single = BatchSolver([instance], method='two_opt', init='greedy', seed=3).solve()[0]
+        assert (single.tour, single.cost) == (result.tour, pytest.approx(result.cost))
+
+
+def test_random_draws_are_shared_by_the_batch():
+    instances = get_instances((20,) * 4)
+    batch = BatchSolver(instances, method='sa', seed=3).solve()
+    single = BatchSolver(instances[:1], method='sa', seed=3).solve()[0]
+
+    # A single generator draws the moves of the whole batch at each step (see BatchSolver): the random draws of an
+    # instance, and so its result, depend on the instances solved alongside it
+    assert single.tour != batch[0].tour
@@ -0,0 +1,74 @@
+import pytest
+
+from hill_climbing import HillClimbing
+from island_model import IslandGeneticAlgorithm
+from lin_kernighan import LinKernighan
+from simulated_annealing import SimulatedAnnealing
+from utils.budget import budget
+
+
+def test_budget_cooling_schedule_stops_by_time_limit(make_search_space):
+    algorithm = SimulatedAnnealing(make_search_space(200), cooling_schedule='budget', seed=1)
+    result = algorithm.solve(polish=True, time_limit=0.2)
+
+    # The temperature reaches Tmin as the time runs out: the run has been stopped by the budget, and not polished
+    assert result.stop_reason == budget.TIME_LIMIT
+    assert 'polish' not in result.metrics['stages']
+    assert result.wall_time < 0.2 + 0.1
+
+
+def test_budget_cooling_schedule_stops_by_max_evaluations(make_search_space):
+    algorithm = SimulatedAnnealing(make_search_space(50), cooling_schedule='budget', seed=1)
+    result = algorithm.solve(polish=True, max_evaluations=2000)
+
+    assert result.stop_reason == budget.MAX_EVALUATIONS
+    assert 'polish' not in result.metrics['stages']
+
+
+def test_polish_without_budget(make_search_space, tour_cost):
+    search_space = make_search_space(50)
+    result = SimulatedAnnealing(search_space, seed=1).solve(polish=True)
+
+    assert result.stop_reason == budget.CONVERGED
+    assert result.metrics['stages']['polish']['calls'] == 1
+    assert result.cost == pytest.approx(tour_cost(result.tour, search_space.matrix))
+
+
+def test_cancelled_run_is_not_polished(make_search_space):
+    algorithm = HillClimbing(make_search_space(50), seed=1)
+    algorithm.cancel()
+    result = algorithm.solve(polish=True)
+
+    assert result.stop_reason == budget.CANCELLED
+    assert 'polish' not in result.metrics['stages']
+
+
+def test_islands_stop_within_the_time_limit(make_search_space):
+    algorithm = IslandGeneticAlgorithm(make_search_space(60), population_rate=10, islands=2, migration_interval=1000,
+                                       seed=1)
+    result = algorithm.solve(time_limit=0.5)
+
+    # The islands get the deadline with their orders, instead of evolving for a whole migration interval
+    assert result.stop_reason == budget.TIME_LIMIT
+    assert result.wall_time < 0.5 + 0.3
+
+
+def test_islands_share_the_maximum_number_of_evaluations(make_search_space):
+    algorithm = IslandGeneticAlgorithm(make_search_space(30), population_rate=5, islands=3, migration_interval=1000,
+                                       seed=1)
+    result = algorithm.solve(max_evaluations=5000)
+
+    # Each island may go over its share by the evaluations of one generation (offspring and mutated chromosomes)
+    assert result.stop_reason == budget.MAX_EVALUATIONS
+    assert 5000 <= result.metrics['counters']['evaluations'] <= 5000 + 3 * 2 * algorithm.nodes * 5
+
+
+def test_lin_kernighan_stops_its_initial_optimisation(make_search_space):
+    search_space = make_search_space(3000)
+    search_space.get_neighbours()  # candidate lists computed beforehand, not to count them in the time limit
+
+    result = LinKernighan(search_space, init='random', seed=1).solve(time_limit=0.05)
+
+    assert result.stop_reason == budget.TIME_LIMIT
+    assert result.wall_time < 0.05 + 0.1
+    assert sorted(result.tour) == list(range(3000))
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from chromosome import Chromosome
+from population import Population
+
+SIZES = (1, 2, 31, 32, 33, 64, 65, 129)
+
+
+def list_encode(tour):
+    """
+    Original encoding, looking up and removing each node from a canonical list.
+    """
+    canonical_tour = list(range(len(tour)))
+    res = []
+    for val in tour:
+        idx = canonical_tour.index(val)
+        res.append(idx)
+        canonical_tour.pop(idx)
+
+    return res
+
+
+def list_decode(ordinal):
+    """
+    Original decoding, taking out each node from a canonical list.
+    """
+    canonical_tour = list(range(len(ordinal)))
+    return [canonical_tour.pop(idx) for idx in ordinal]
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_encode_tour_matches_list_encoding(size):
+    tours = np.argsort(np.random.default_rng(size).random((20, size)), axis=1).tolist()
+
+    for tour in tours:
+        ordinal = Chromosome.encode_tour(tour)
+        assert ordinal == list_encode(tour)
+        assert Chromosome.decode_ordinal(ordinal) == tour
+        assert list_decode(ordinal) == tour
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_batched_codec_round_trip(size):
+    tours = np.argsort(np.random.default_rng(size).random((50, size)), axis=1).astype(np.int32)
+
+    ordinals = Chromosome.encode_tours(tours)
+    assert ordinals.tolist() == [list_encode(tour) for tour in tours.tolist()]
+    assert Chromosome.decode_ordinals(ordinals).tolist() == tours.tolist()
+
+
+def test_batched_codec_keeps_dtype_and_shape():
+    tours = np.argsort(np.random.default_rng(0).random((3, 10)), axis=1).astype(np.int32)
+
+    ordinals = Population.encode(tours)
+    assert ordinals.dtype == np.int32 and ordinals.shape == tours.shape
+    assert Population.decode(ordinals).dtype == np.int32
+
+
+def test_ordinal_bounds():
+    tour = np.random.default_rng(1).permutation(40).tolist()
+
+    # The i-th ordinal counts the nodes not visited yet, so it is smaller than N - i
+    ordinal = Chromosome.encode_tour(tour)
+    assert all(0 <= idx < len(tour) - i for i, idx in enumerate(ordinal))
+    assert Chromosome.encode_tour(list(range(40))) == [0] * 40
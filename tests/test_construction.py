@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from utils.construction import construction
+from utils.matrix import matrix
+from utils.rng import rng
+
+SIZES = (1, 2, 3, 4, 10, 57, 200)
+
+# Construction heuristics that need the coordinates of the nodes (and not only their distances)
+COORDINATE_ONLY = ('hilbert',)
+
+
+def build(name, search_space, seed=0):
+    return construction.get_construction_by_name(name)(search_space, rng.RandomStream(seed))
+
+
+def assert_permutation(tour, nodes):
+    assert sorted(tour) == list(range(nodes))
+    assert all(isinstance(node, int) for node in tour)
+
+
+@pytest.mark.parametrize('name', construction.CONSTRUCTIONS)
+@pytest.mark.parametrize('size', SIZES)
+@pytest.mark.parametrize('distance', ('dense', 'condensed', 'oracle'))
+def test_valid_tour(make_search_space, name, size, distance):
+    assert_permutation(build(name, make_search_space(size, distance=distance)), size)
+
+
+@pytest.mark.parametrize('name', construction.CONSTRUCTIONS)
+def test_duplicate_points(name):
+    generator = np.random.default_rng(1)
+    points = generator.uniform(0, 100, size=(20, 2))
+    coord_list = np.concatenate((points, points, points[:5], np.zeros((10, 2)))).tolist()
+
+    assert_permutation(build(name, matrix.Matrix(coord_list=coord_list)), len(coord_list))
+
+
+@pytest.mark.parametrize('name', construction.CONSTRUCTIONS)
+def test_all_points_equal(name):
+    assert_permutation(build(name, matrix.Matrix(coord_list=[[5.0, 5.0]] * 30)), 30)
+
+
+@pytest.mark.parametrize('name', construction.CONSTRUCTIONS)
+@pytest.mark.parametrize('axis', (0, 1))
+def test_collinear_points(name, axis):
+    coord = np.zeros((60, 2))
+    coord[:, axis] = np.random.default_rng(2).permutation(60)
+    search_space = matrix.Matrix(coord_list=coord.tolist())
+
+    tour = build(name, search_space)
+    assert_permutation(tour, 60)
+
+    # Apart from the random tour, going along the line and back is the optimal tour (twice the length of the line)
+    if name != 'random':
+        cost = sum(search_space.matrix[tour[i - 1], tour[i]] for i in range(len(tour)))
+        assert cost <= 2 * 59 * 1.5
+
+
+@pytest.mark.parametrize('name', construction.CONSTRUCTIONS)
+def test_matrix_only(make_search_space, name):
+    search_space = matrix.Matrix(matrix=make_search_space(40).matrix)
+
+    if name in COORDINATE_ONLY:
+        with pytest.raises(AssertionError):
+            build(name, search_space)
+    else:
+        assert_permutation(build(name, search_space), 40)
+
+
+@pytest.mark.parametrize('name', ('nearest_neighbour', 'greedy', 'christofides', 'hilbert'))
+def test_better_than_random(make_search_space, tour_cost, name):
+    search_space = make_search_space(200, seed=3)
+    random_costs = [tour_cost(build('random', search_space, seed), search_space.matrix) for seed in range(10)]
+
+    # On uniformly distributed nodes, random tours are several times longer than any of the heuristic ones
+    assert tour_cost(build(name, search_space), search_space.matrix) < min(random_costs) / 3
+
+
+def test_greedy_and_christofides_better_than_nearest_neighbour(make_search_space, tour_cost):
+    search_space = make_search_space(500, seed=4)
+    nearest_neighbour = np.mean([tour_cost(build('nearest_neighbour', search_space, seed), search_space.matrix)
+                                 for seed in range(5)])
+
+    assert tour_cost(build('greedy', search_space), search_space.matrix) < nearest_neighbour
+    assert tour_cost(build('christofides', search_space), search_space.matrix) < nearest_neighbour
+
+
+def test_same_seed_same_tour(make_search_space):
+    search_space = make_search_space(100)
+
+    assert build('nearest_neighbour', search_space, 5) == build('nearest_neighbour', search_space, 5)
+    assert build('random', search_space, 5) == build('random', search_space, 5)
+    assert build('random', search_space, 5) != build('random', search_space, 6)
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from utils.crossover_ops import crossover_ops
+from utils.rng import rng
+
+SIZES = (1, 2, 3, 5, 16, 61)
+
+
+def get_parents(pairs, size, seed=0):
+    generator = np.random.default_rng(seed)
+    return (np.argsort(generator.random((pairs, size)), axis=1).astype(np.int32),
+            np.argsort(generator.random((pairs, size)), axis=1).astype(np.int32))
+
+
+def get_operator(name, search_space, seed=0):
+    operator = crossover_ops.get_crossover_by_name(name, rng.RandomStream(seed))
+    if isinstance(operator, crossover_ops.EdgeAssemblyCrossover):
+        operator.neighbours = search_space.get_neighbours()
+
+    return operator
+
+
+def assert_permutations(children, parents):
+    assert children.shape == parents.shape and children.dtype == parents.dtype
+    np.testing.assert_array_equal(np.sort(children, axis=1), np.sort(parents, axis=1))
+
+
+@pytest.mark.parametrize('name', ('ox', 'pmx', 'eax'))
+@pytest.mark.parametrize('size', SIZES)
+def test_offspring_are_permutations(name, size, make_search_space):
+    search_space = make_search_space(size, seed=size)
+    operator = get_operator(name, search_space, seed=size)
+
+    for seed in range(3):
+        parents_1, parents_2 = get_parents(20, size, seed)
+        for children in operator.crossover(parents_1, parents_2, search_space.matrix):
+            assert_permutations(children, parents_1)
+
+
+@pytest.mark.parametrize('name', ('ox', 'pmx', 'eax'))
+def test_no_pairs(name, make_search_space):
+    search_space = make_search_space(10)
+    parents_1, parents_2 = get_parents(0, 10)
+
+    for children in get_operator(name, search_space).crossover(parents_1, parents_2, search_space.matrix):
+        assert children.shape == (0, 10)
+
+
+@pytest.mark.parametrize('name', ('ox', 'pmx', 'eax'))
+def test_identical_parents_are_kept(name, make_search_space):
+    search_space = make_search_space(30)
+    parents, _ = get_parents(10, 30)
+
+    for children in get_operator(name, search_space).crossover(parents, parents.copy(), search_space.matrix):
+        np.testing.assert_array_equal(children, parents)
+
+
+@pytest.mark.parametrize('name', ('ox', 'pmx'))
+def test_segment_is_kept_in_place(name):
+    operator = crossover_ops.get_crossover_by_name(name, rng.RandomStream(0))
+    parents_1, parents_2 = get_parents(50, 20)
+
+    # The segments are drawn before mating: draw them again from a stream with the same seed
+    segments = crossover_ops.get_crossover_by_name(name, rng.RandomStream(0)).get_segments(50, 20)
+    children_1, children_2 = operator.crossover(parents_1, parents_2, None)
+
+    np.testing.assert_array_equal(children_1[segments], parents_1[segments])
+    np.testing.assert_array_equal(children_2[segments], parents_2[segments])
+
+
+def test_ox_keeps_the_order_of_the_other_parent():
+    operator = crossover_ops.OrderCrossover(rng.RandomStream(0))
+    parents_1, parents_2 = get_parents(50, 20)
+    segments = crossover_ops.OrderCrossover(rng.RandomStream(0)).get_segments(50, 20)
+    children, _ = operator.crossover(parents_1, parents_2, None)
+
+    for child, parent_1, parent_2, segment in zip(children, parents_1, parents_2, segments):
+        if not segment.any():
+            continue
+
+        # From the end of the segment, the nodes outside of it follow the order of the second parent
+        end = len(segment) - np.argmax(segment[::-1])
+        kept = set(parent_1[segment].tolist())
+        assert [i for i in np.roll(child, -end).tolist() if i not in kept] == \
+            [i for i in np.roll(parent_2, -end).tolist() if i not in kept]
+
+
+def test_one_point_has_no_operator():
+    assert crossover_ops.get_crossover_by_name('one_point') is None
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from utils.distances import distances
+from utils.matrix import matrix
+
+BACKENDS = distances.DISTANCES
+
+# The condensed distances are stored in float32
+TOLERANCE = {'dense': 1e-12, 'condensed': 1e-6, 'oracle': 1e-12}
+
+
+def get_reference(coord_list):
+    """
+    Dense matrix of distances computed pair by pair, as the original loop did.
+    """
+    nodes = len(coord_list)
+    return np.array([[matrix.Matrix.get_dist_two_nodes(coord_list, i, j) for j in range(nodes)] for i in range(nodes)])
+
+
+@pytest.mark.parametrize('distance', BACKENDS)
+@pytest.mark.parametrize('size', (1, 2, 3, 17, 120))
+def test_every_distance(distance, size, make_search_space):
+    search_space = make_search_space(size, seed=size, distance=distance)
+    reference = get_reference(search_space.coord_list)
+    rtol = TOLERANCE[distance]
+
+    assert len(search_space.matrix) == size and search_space.matrix.shape == (size, size)
+
+    # Single pairs of nodes, given as Python or NumPy integers
+    for i in range(size):
+        for j in range(size):
+            assert isinstance(search_space.matrix[i, j], float)
+            assert search_space.matrix[i, j] == pytest.approx(reference[i, j], rel=rtol)
+            assert search_space.matrix[np.int32(i), np.int64(j)] == pytest.approx(reference[i, j], rel=rtol)
+
+    # Rows, blocks of rows and the whole matrix
+    for i in range(size):
+        np.testing.assert_allclose(search_space.matrix[i], reference[i], rtol=rtol)
+    np.testing.assert_allclose(search_space.matrix[:], reference, rtol=rtol)
+    np.testing.assert_allclose(search_space.matrix[1:size:2], reference[1:size:2], rtol=rtol)
+    assert search_space.matrix[size:].shape == (0, size)
+
+
+@pytest.mark.parametrize('distance', BACKENDS)
+def test_arrays_of_nodes(distance, make_search_space):
+    search_space = make_search_space(50, distance=distance)
+    reference = get_reference(search_space.coord_list)
+    generator = np.random.default_rng(0)
+    rtol = TOLERANCE[distance]
+
+    # Element by element, broadcast together and along tours (as the costs of the tours are computed)
+    nodes_a, nodes_b = generator.integers(0, 50, size=(2, 7, 9))
+    np.testing.assert_allclose(search_space.matrix[nodes_a, nodes_b], reference[nodes_a, nodes_b], rtol=rtol)
+    np.testing.assert_allclose(search_space.matrix[nodes_a[:, :1], nodes_b[0]], reference[nodes_a[:, :1], nodes_b[0]],
+                               rtol=rtol)
+
+    tour = generator.permutation(50)
+    np.testing.assert_allclose(search_space.matrix[tour, np.roll(tour, -1)], reference[tour, np.roll(tour, -1)],
+                               rtol=rtol)
+    assert search_space.matrix[tour, tour].tolist() == [0] * 50
+
+
+@pytest.mark.parametrize('distance', BACKENDS)
+def test_from_precomputed_matrix(distance, make_search_space):
+    dense = make_search_space(40, seed=1)
+    search_space = matrix.Matrix(coord_list=dense.coord_list, matrix=dense.matrix, distance=distance)
+
+    np.testing.assert_allclose(search_space.matrix[:], dense.matrix, rtol=TOLERANCE[distance])
+
+
+def test_dense_builds(make_search_space):
+    search_space = make_search_space(150, seed=2)
+    reference = get_reference(search_space.coord_list)
+
+    for block_size in (1, 7, 150, 1000):
+        np.testing.assert_allclose(search_space.generate_matrix(block_size), reference, rtol=1e-12)
+
+
+def test_condensed_blocks(make_search_space):
+    coord_list = make_search_space(70, seed=3).coord_list
+    condensed = distances.CondensedDistance.from_coordinates(coord_list)
+
+    for block_size in (1, 9, 70):
+        np.testing.assert_array_equal(distances.CondensedDistance.from_coordinates(coord_list, block_size).data,
+                                      condensed.data)
+    assert condensed.data.dtype == np.float32 and len(condensed.data) == 70 * 69 // 2
+
+
+def test_oracle_cache_rows(make_search_space):
+    coord_list = make_search_space(30, seed=4).coord_list
+    oracle = distances.CoordinateDistance(coord_list, cache_rows=4)
+    reference = get_reference(coord_list)
+
+    for i in list(range(30)) + [29, 3, 28, 3]:
+        np.testing.assert_allclose(oracle[i], reference[i], rtol=1e-12)
+        assert len(oracle.rows) <= 4
+
+    assert list(oracle.rows) == [27, 29, 28, 3]
+    with pytest.raises(ValueError):
+        oracle[3][0] = 1.0
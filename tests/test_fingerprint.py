@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from genetic_algorithm import GeneticAlgorithm
+from population import Population
+from utils.fingerprint import fingerprint
+
+
+def test_same_cycle_same_fingerprint():
+    tour = np.random.default_rng(0).permutation(20)
+    tours = np.array([tour, np.roll(tour, 7), tour[::-1], np.roll(tour[::-1], 3)])
+
+    fingerprints = fingerprint.get_fingerprints(tours)
+
+    assert len(set(fingerprints)) == 1
+    assert fingerprints[0] == fingerprint.canonicalise_tours(tours)[0].astype(np.int32).tobytes()
+
+
+def test_different_cycles_different_fingerprints():
+    tours = np.array([np.random.default_rng(seed).permutation(8) for seed in range(200)])
+
+    fingerprints = fingerprint.get_fingerprints(tours)
+    canonical = {tuple(tour) for tour in fingerprint.canonicalise_tours(tours)}
+
+    assert len(set(fingerprints)) == len(canonical)
+
+
+def test_cache_lookup_and_store():
+    cache = fingerprint.FingerprintCache(3)
+    cache.store([b'a', b'b'], [1.0, 2.0])
+
+    costs = cache.lookup([b'b', b'c', b'a'])
+
+    np.testing.assert_array_equal(costs, [2.0, np.nan, 1.0])
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_cache_evicts_least_recently_used():
+    cache = fingerprint.FingerprintCache(3)
+    cache.store([b'a', b'b', b'c'], [1.0, 2.0, 3.0])
+    cache.lookup([b'a'])
+
+    # b is the least recently used tour, as a has just been looked up
+    cache.store([b'd'], [4.0])
+
+    assert len(cache) == 3
+    np.testing.assert_array_equal(cache.lookup([b'a', b'b', b'c', b'd']), [1.0, np.nan, 3.0, 4.0])
+
+    # A batch larger than the cache only keeps its last tours
+    cache.store([b'e', b'f', b'g', b'h'], [5.0, 6.0, 7.0, 8.0])
+    assert list(cache.costs) == [b'f', b'g', b'h']
+
+
+def test_population_evaluates_cache_misses_only(make_search_space):
+    distances = make_search_space(30).matrix
+    generator = np.random.default_rng(0)
+    tours = np.argsort(generator.random((50, 30)), axis=1)
+    cache = fingerprint.FingerprintCache(100)
+
+    first = Population(distances, tours, cache=cache)
+    assert first.evaluated == 50
+
+    # Half of the tours again (rotated and reversed), and 25 new ones
+    seen = np.roll(tours[:25, ::-1], 5, axis=1)
+    new = np.argsort(generator.random((25, 30)), axis=1)
+    second = Population(distances, np.concatenate((seen, new)), cache=cache)
+
+    assert second.evaluated == 25
+    assert cache.hits == 25
+    np.testing.assert_allclose(second.costs, Population(distances, second.tours).costs)
+
+
+def test_genetic_algorithm_counts_cache_hits(make_search_space):
+    search_space = make_search_space(10)
+    result = GeneticAlgorithm(search_space, stop=20, population_rate=10, cache_size=1000, seed=1).solve()
+    counters = result.metrics['counters']
+
+    assert counters['cache_hits'] > 0
+    assert result.cost == pytest.approx(Population(search_space.matrix, np.array([result.tour])).costs[0])
+
+
+def test_cache_disabled_by_default(make_search_space):
+    algorithm = GeneticAlgorithm(make_search_space(10), stop=5, population_rate=10, seed=1)
+
+    assert algorithm.cache is None
+    assert 'cache_hits' not in algorithm.solve().metrics['counters']
@@ -0,0 +1,138 @@
+import os
+import numpy as np
+import pytest
+
+from utils.instance_cache import instance_cache
+from utils.matrix import matrix
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return instance_cache.InstanceCache(str(tmp_path / 'cache'))
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path_file = tmp_path / 'instance.csv'
+    path_file.write_text('1.0,2.0\n3.0,4.0\n5.0,6.5\n', encoding='utf-8')
+    return path_file
+
+
+def test_miss_then_hit(cache, csv_file):
+    key = cache.get_key(csv_file)
+    array = np.arange(12, dtype=float).reshape(3, 4)
+
+    assert cache.load(key, 'dense') is None
+
+    cache.store(key, 'dense', array)
+    np.testing.assert_array_equal(cache.load(key, 'dense'), array)
+    assert cache.load(key, 'coordinates') is None
+
+    # Memory-mapped: read lazily from disk, and read-only
+    mapped = cache.load(key, 'dense', mmap=True)
+    np.testing.assert_array_equal(mapped, array)
+    assert not mapped.flags.writeable
+
+
+def test_key_of_the_content(cache, csv_file, tmp_path):
+    key = cache.get_key(csv_file)
+
+    # Same content in another file: same key. A change of content: another key, so that nothing is loaded for it
+    copy = tmp_path / 'copy.csv'
+    copy.write_bytes(csv_file.read_bytes())
+    assert cache.get_key(copy) == key
+
+    cache.store(key, 'dense', np.ones((3, 3)))
+    csv_file.write_text('1.0,2.0\n3.0,4.0\n5.0,6.0\n', encoding='utf-8')
+
+    assert cache.get_key(csv_file) != key
+    assert cache.load(cache.get_key(csv_file), 'dense') is None
+
+
+def test_key_of_the_version(cache, csv_file, monkeypatch):
+    key = cache.get_key(csv_file)
+    monkeypatch.setattr(instance_cache, 'CACHE_VERSION', instance_cache.CACHE_VERSION + 1)
+
+    assert cache.get_key(csv_file) != key
+
+
+def test_corrupted_entry_is_a_miss(cache, csv_file):
+    key = cache.get_key(csv_file)
+    cache.store(key, 'dense', np.ones((3, 3)))
+
+    with open(cache.get_path(key, 'dense'), 'wb') as out_file:
+        out_file.write(b'not an array')
+
+    assert cache.load(key, 'dense') is None
+    assert cache.load(key, 'dense', mmap=True) is None
+
+
+def test_store_overwrites(cache, csv_file):
+    key = cache.get_key(csv_file)
+    cache.store(key, 'dense', np.ones((3, 3)))
+    cache.store(key, 'dense', np.zeros((3, 3)))
+
+    np.testing.assert_array_equal(cache.load(key, 'dense'), np.zeros((3, 3)))
+    assert os.listdir(os.path.join(cache.directory, key)) == ['dense.npy']
+
+
+def test_store_in_read_only_directory(tmp_path, csv_file):
+    directory = tmp_path / 'read_only'
+    directory.mkdir()
+    directory.chmod(0o555)
+    try:
+        if os.access(directory, os.W_OK):
+            pytest.skip('File permissions are not enforced for this user (e.g. root)')
+
+        cache = instance_cache.InstanceCache(str(directory))
+        key = cache.get_key(csv_file)
+        cache.store(key, 'dense', np.ones((3, 3)))
+
+        assert cache.load(key, 'dense') is None
+        assert os.listdir(directory) == []
+    finally:
+        directory.chmod(0o755)
+
+
+def test_store_failing(tmp_path, csv_file):
+    # A regular file where the folder of the cache should be: no entry can be written, whatever the permissions
+    not_a_directory = tmp_path / 'file'
+    not_a_directory.write_text('', encoding='utf-8')
+    cache = instance_cache.InstanceCache(str(not_a_directory / 'cache'))
+
+    key = cache.get_key(csv_file)
+    cache.store(key, 'dense', np.ones((3, 3)))
+
+    assert cache.load(key, 'dense') is None
+
+
+def test_store_failing_removes_the_temporary_file(cache, csv_file, monkeypatch):
+    def replace(source, destination):
+        raise PermissionError(destination)
+
+    key = cache.get_key(csv_file)
+    monkeypatch.setattr(instance_cache.os, 'replace', replace)
+    cache.store(key, 'dense', np.ones((3, 3)))
+
+    assert cache.load(key, 'dense') is None
+    assert os.listdir(os.path.join(cache.directory, key)) == []
+
+
+@pytest.mark.parametrize('distance', ('dense', 'condensed'))
+def test_matrix_loaded_from_the_cache(tmp_path, monkeypatch, distance):
+    cache = instance_cache.InstanceCache(str(tmp_path))
+    monkeypatch.setattr(matrix.instance_cache, 'InstanceCache', lambda: cache)
+
+    first = matrix.Matrix('TSP_50_nodes.csv', distance=distance)
+    np.testing.assert_array_equal(first.matrix[:], matrix.Matrix('TSP_50_nodes.csv', cache=False,
+                                                                 distance=distance).matrix[:])
+    key = os.listdir(tmp_path)[0]
+    assert sorted(os.listdir(tmp_path / key)) == sorted(['coordinates.npy', f'{distance}.npy'])
+
+    # The second time, both the coordinates and the distances come from the cache
+    monkeypatch.setattr(matrix.Matrix, 'load_file',
+                        staticmethod(lambda file: pytest.fail('The csv file should not be parsed')))
+    second = matrix.Matrix('TSP_50_nodes.csv', distance=distance)
+
+    assert second.coord_list == first.coord_list
+    np.testing.assert_array_equal(second.matrix[:], first.matrix[:])
@@ -0,0 +1,120 @@
+import itertools
+import threading
+import time
+import numpy as np
+import pytest
+
+from lin_kernighan import LinKernighan
+from utils.budget import budget
+from utils.construction import construction
+
+
+def assert_valid_result(result, search_space, tour_cost):
+    nodes = len(search_space.matrix)
+
+    assert sorted(result.tour) == list(range(nodes))
+    assert result.cost == pytest.approx(tour_cost(result.tour, search_space.matrix))
+    assert result.convergence[-1] == result.cost
+    assert all(later <= earlier for earlier, later in zip(result.convergence, result.convergence[1:]))
+
+
+@pytest.mark.parametrize('size', (1, 2, 3, 4, 5, 8, 50, 300))
+@pytest.mark.parametrize('init', ('random', 'greedy'))
+def test_valid_tour(make_search_space, tour_cost, size, init):
+    search_space = make_search_space(size)
+    result = LinKernighan(search_space, init=init, seed=1).solve()
+
+    assert_valid_result(result, search_space, tour_cost)
+    assert result.stop_reason == budget.CONVERGED
+
+
+@pytest.mark.parametrize('distance', ('condensed', 'oracle'))
+def test_distance_backends(make_search_space, tour_cost, distance):
+    search_space = make_search_space(200, distance=distance)
+    result = LinKernighan(search_space, seed=1).solve()
+
+    assert_valid_result(result, search_space, tour_cost)
+
+
+@pytest.mark.parametrize('size', (4, 5, 6, 7))
+def test_optimal_tour_of_small_instances(make_search_space, tour_cost, size):
+    for seed in range(5):
+        search_space = make_search_space(size, seed=seed)
+        optimal = min(tour_cost((0,) + tour, search_space.matrix) for tour in itertools.permutations(range(1, size)))
+
+        assert LinKernighan(search_space, init='random', seed=seed).solve().cost == pytest.approx(optimal)
+
+
+def test_better_than_initial_tour(make_search_space, tour_cost):
+    search_space = make_search_space(300)
+    greedy = tour_cost(construction.greedy_edge(search_space), search_space.matrix)
+
+    # Lin-Kernighan tours are about 2% longer than the optimal ones, greedy ones about 15-20%
+    assert LinKernighan(search_space, seed=1).solve().cost < greedy * 0.92
+
+
+def test_same_seed_same_result(make_search_space):
+    search_space = make_search_space(200)
+    first = LinKernighan(search_space, init='random', seed=7).solve()
+    second = LinKernighan(search_space, init='random', seed=7).solve()
+
+    assert (first.tour, first.cost, first.convergence) == (second.tour, second.cost, second.convergence)
+
+
+def test_time_limit(make_search_space, tour_cost):
+    search_space = make_search_space(500)
+    search_space.get_neighbours()
+
+    # Kicks until the time limit runs out, as no run of 10^9 kicks without improvement can end first
+    result = LinKernighan(search_space, stop=10 ** 9, seed=1).solve(time_limit=0.5)
+
+    assert result.stop_reason == budget.TIME_LIMIT
+    assert 0.5 <= result.wall_time < 0.5 + 0.1
+    assert result.cycles > 0
+    assert_valid_result(result, search_space, tour_cost)
+
+
+def test_max_evaluations(make_search_space, tour_cost):
+    search_space = make_search_space(200)
+    result = LinKernighan(search_space, stop=10 ** 9, seed=1).solve(max_evaluations=50)
+
+    # One evaluation per kick
+    assert result.stop_reason == budget.MAX_EVALUATIONS
+    assert result.cycles == result.metrics['counters']['evaluations'] == 50
+    assert_valid_result(result, search_space, tour_cost)
+
+
+def test_cancel_before_run(make_search_space, tour_cost):
+    search_space = make_search_space(200)
+    algorithm = LinKernighan(search_space, stop=10 ** 9, seed=1)
+    algorithm.cancel()
+    result = algorithm.solve()
+
+    # The initial optimisation is stopped at its first check, and no kick is made
+    assert result.stop_reason == budget.CANCELLED
+    assert result.cycles == 0
+    assert_valid_result(result, search_space, tour_cost)
+
+
+# Cancelled while kicking (200 nodes), or during the initial optimisation (2000 nodes)
+@pytest.mark.parametrize('size', (200, 2000))
+def test_cancel_from_another_thread(make_search_space, tour_cost, size):
+    search_space = make_search_space(size)
+    algorithm = LinKernighan(search_space, stop=10 ** 9, seed=1)
+    timer = threading.Timer(0.3, algorithm.cancel)
+
+    start = time.perf_counter()
+    timer.start()
+    result = algorithm.solve(time_limit=30)
+    elapsed = time.perf_counter() - start
+    timer.join()
+
+    assert result.stop_reason == budget.CANCELLED
+    assert elapsed < 0.3 + 0.1
+    assert (result.cycles > 0) == (size == 200)
+    assert_valid_result(result, search_space, tour_cost)
+
+    # The best solution so far, as seen from the other thread, is the one returned
+    snapshot = algorithm.snapshot()
+    assert (snapshot.tour, snapshot.cost) == (result.tour, result.cost)
+    assert np.isclose(snapshot.cost, tour_cost(snapshot.tour, search_space.matrix))
@@ -0,0 +1,143 @@
+import math
+import numpy as np
+import pytest
+
+from utils.local_search import local_search
+from utils.matrix import matrix
+
+ENGINES = (local_search.LocalSearch, local_search.LinKernighanSearch)
+
+
+def get_engine(engine, search_space, k=10):
+    return engine(search_space.matrix, search_space.get_neighbours(k))
+
+
+def get_circle(nodes):
+    """
+    Search space of nodes on a circle, in order: the optimal tour is the polygon, and any other tour has two crossing
+    edges, which a 2-opt move removes.
+    """
+    angles = 2 * math.pi * np.arange(nodes) / nodes
+    return matrix.Matrix(coord_list=np.column_stack((np.cos(angles), np.sin(angles))).tolist())
+
+
+def get_best_two_opt_delta(tour, distances):
+    """
+    Best delta of all the 2-opt moves of the tour, by brute force.
+    """
+    size, best = len(tour), 0.0
+    for i in range(size - 1):
+        for j in range(i + 2, size if i else size - 1):
+            node_a, node_b, node_c, node_d = tour[i], tour[i + 1], tour[j], tour[(j + 1) % size]
+            best = min(best, distances[node_a, node_c] + distances[node_b, node_d] - distances[node_a, node_b]
+                       - distances[node_c, node_d])
+
+    return best
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('size', (1, 3, 4, 5, 6, 30, 300))
+def test_cost_and_permutation(engine, size, make_search_space, tour_cost):
+    search_space = make_search_space(size, seed=size)
+    tour = np.random.default_rng(size).permutation(size)
+
+    optimised, cost = get_engine(engine, search_space).optimise(tour)
+
+    # The cost updated by the gain of every move is the cost of the tour returned, which is a permutation of the nodes
+    assert sorted(optimised) == list(range(size))
+    assert cost == pytest.approx(tour_cost(optimised, search_space.matrix), abs=1e-9)
+    assert cost <= tour_cost(tour, search_space.matrix) + 1e-9
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_active_nodes(engine, make_search_space, tour_cost):
+    search_space = make_search_space(200, seed=1)
+    search = get_engine(engine, search_space)
+    tour, cost = search.optimise(np.random.default_rng(1).permutation(200))
+
+    # Double bridge kick, improved again only around its nodes
+    kicked = tour[:50] + tour[150:] + tour[100:150] + tour[50:100]
+    active = [tour[i] for i in (49, 50, 99, 100, 149, 150)]
+    optimised, kicked_cost = search.optimise(kicked, None, active)
+
+    assert sorted(optimised) == list(range(200))
+    assert kicked_cost == pytest.approx(tour_cost(optimised, search_space.matrix), abs=1e-9)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_no_improving_move_is_left(seed, make_search_space):
+    search_space = make_search_space(40, seed=seed)
+    search = get_engine(local_search.LocalSearch, search_space, k=39)
+    tour, _ = search.optimise(np.random.default_rng(seed).permutation(40))
+
+    # With full candidate lists, no 2-opt move improves the tour
+    assert get_best_two_opt_delta(tour, search_space.matrix) > -1e-9
+
+    # Nor any of the 2-opt and Or-opt moves evaluated by the engine, from any node (see the don't-look bits)
+    for node in range(40):
+        assert search.improve_two_opt(node) == (0, ()) and search.improve_or_opt(node) == (0, ())
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('seed', range(10))
+def test_no_move_evaluated_improves(engine, seed, make_search_space):
+    search_space = make_search_space(150, seed=seed)
+    search = get_engine(engine, search_space)
+    search.optimise(np.random.default_rng(seed).permutation(150))
+
+    for node in range(150):
+        assert search.improve(node) == (0, ())
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_two_opt_removes_crossings(engine, tour_cost):
+    search_space = get_circle(50)
+    polygon = tour_cost(list(range(50)), search_space.matrix)
+
+    for seed in range(5):
+        tour, cost = get_engine(engine, search_space).optimise(np.random.default_rng(seed).permutation(50))
+        assert cost == pytest.approx(polygon)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_square(engine, tour_cost):
+    # The only crossing tour of 4 nodes is the one going along the diagonals
+    search_space = get_circle(4)
+    tour, cost = get_engine(engine, search_space, k=3).optimise([0, 2, 1, 3])
+
+    assert cost == pytest.approx(tour_cost(list(range(4)), search_space.matrix))
+    assert cost == pytest.approx(tour_cost(tour, search_space.matrix))
+
+
+@pytest.mark.parametrize('length', (1, 2, 3))
+def test_or_opt_moves_segments(length, tour_cost, monkeypatch):
+    search_space = get_circle(40)
+    search = get_engine(local_search.LocalSearch, search_space)
+    monkeypatch.setattr(search, 'improve_two_opt', lambda node: (0, ()))
+
+    # A segment of the polygon taken out of its place, and inverted: only Or-opt can put it back
+    segment = list(range(10, 10 + length))
+    rest = [i for i in range(40) if i not in segment]
+    tour = rest[:25] + segment[::-1] + rest[25:]
+
+    optimised, cost = search.optimise(tour)
+    assert cost == pytest.approx(tour_cost(list(range(40)), search_space.matrix))
+    assert cost == pytest.approx(tour_cost(optimised, search_space.matrix))
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_should_stop(engine, make_search_space, tour_cost):
+    search_space = make_search_space(2000, seed=2)
+    search = get_engine(engine, search_space)
+    tour = np.random.default_rng(2).permutation(2000)
+
+    calls = []
+    optimised, cost = search.optimise(tour, should_stop=lambda: calls.append(1) or len(calls) == 3)
+
+    assert search.stopped and len(calls) == 3
+    assert sorted(optimised) == list(range(2000))
+    assert cost == pytest.approx(tour_cost(optimised, search_space.matrix), abs=1e-6)
+
+    search = get_engine(engine, make_search_space(300, seed=2))
+    search.optimise(np.random.default_rng(2).permutation(300), should_stop=lambda: False)
+    assert not search.stopped
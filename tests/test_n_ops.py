@@ -0,0 +1,45 @@
+import pytest
+
+from utils.n_ops import n_ops
+from utils.rng import rng
+
+OPERATORS = ('rand_swap', 'rand_swap_adj', 'inversion', 'two_opt', 'three_opt', 'double_bridge', 'nn_swap',
+             'nn_inversion')
+
+
+@pytest.mark.parametrize('size', (5, 8, 13, 60))
+@pytest.mark.parametrize('name', OPERATORS)
+def test_move_delta_matches_full_evaluation(name, size, make_search_space, tour_cost):
+    search_space = make_search_space(size, seed=size)
+    distances = search_space.matrix
+    operator = n_ops.get_operator_by_name(name, rng.RandomStream(size))
+    if isinstance(operator, n_ops.NeighbourOperator):
+        operator.neighbours = search_space.get_neighbours()
+
+    tour = rng.get_generator(size).permutation(size).tolist()
+    for _ in range(200):
+        cost = tour_cost(tour, distances)
+        move, delta = operator.generate_candidate_move(tour, distances)
+        operator.apply_move(tour, move)
+
+        assert sorted(tour) == list(range(size))
+        assert delta == pytest.approx(tour_cost(tour, distances) - cost, abs=1e-9)
+
+
+@pytest.mark.parametrize('size', (4, 5, 9))
+def test_swap_and_inversion_deltas_of_every_move(size, make_search_space, tour_cost):
+    distances = make_search_space(size, seed=1).matrix
+    tour = list(range(size))
+    cost = tour_cost(tour, distances)
+
+    for node_a in range(size):
+        for node_b in range(size):
+            swapped = list(tour)
+            swapped[node_a], swapped[node_b] = swapped[node_b], swapped[node_a]
+            assert n_ops.Operator.evaluate_swap(tour, node_a, node_b, distances) == \
+                pytest.approx(tour_cost(swapped, distances) - cost, abs=1e-9)
+
+            if node_a <= node_b:
+                inverted = tour[:node_a] + tour[node_a:node_b + 1][::-1] + tour[node_b + 1:]
+                assert n_ops.Operator.evaluate_inversion(tour, node_a, node_b, distances) == \
+                    pytest.approx(tour_cost(inverted, distances) - cost, abs=1e-9)
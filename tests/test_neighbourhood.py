@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from utils.neighbourhood import neighbourhood
+
+
+def invert(tour, node_i, node_j):
+    return tour[:node_i] + tour[node_i:node_j + 1][::-1] + tour[node_j + 1:]
+
+
+@pytest.mark.parametrize('size', (3, 4, 5, 12, 40))
+def test_swap_deltas_match_full_evaluation(size, make_search_space, tour_cost):
+    distances = make_search_space(size, seed=size).matrix
+    tour = np.random.default_rng(size).permutation(size).tolist()
+    cost = tour_cost(tour, distances)
+
+    deltas = neighbourhood.get_swap_deltas(tour, distances)
+    assert len(deltas) == size - 1
+    for i, delta in enumerate(deltas):
+        swapped = list(tour)
+        swapped[i], swapped[i + 1] = swapped[i + 1], swapped[i]
+        assert delta == pytest.approx(tour_cost(swapped, distances) - cost, abs=1e-9)
+
+
+@pytest.mark.parametrize('size', (4, 5, 12, 40))
+def test_inversion_deltas_match_full_evaluation(size, make_search_space, tour_cost):
+    distances = make_search_space(size, seed=size).matrix
+    tour = np.random.default_rng(size).permutation(size).tolist()
+    cost = tour_cost(tour, distances)
+
+    deltas = neighbourhood.get_inversion_deltas(tour, distances)
+    assert deltas.shape == (size, size)
+    for node_i in range(size):
+        for node_j in range(size):
+            length = node_j - node_i + 1
+            if length < 2 or length >= size - 1:
+                assert deltas[node_i, node_j] == np.inf
+            else:
+                assert deltas[node_i, node_j] == \
+                    pytest.approx(tour_cost(invert(tour, node_i, node_j), distances) - cost, abs=1e-9)
+
+    # The valid moves are the ones counted by get_neighbourhood_size()
+    assert np.isfinite(deltas).sum() == neighbourhood.get_neighbourhood_size(size, 'two_opt')
+
+
+def test_inversion_deltas_by_blocks_of_rows(make_search_space):
+    distances = make_search_space(30).matrix
+    tour = np.random.default_rng(0).permutation(30)
+
+    deltas = neighbourhood.get_inversion_deltas(tour, distances)
+    np.testing.assert_array_equal(neighbourhood.get_inversion_deltas(tour, distances, 7, 19), deltas[7:19])
+
+
+def test_batch_inversion_deltas_match_single_tours(make_search_space):
+    search_spaces = [make_search_space(25, seed=seed).matrix for seed in range(4)]
+    tours = np.argsort(np.random.default_rng(0).random((4, 25)), axis=1)
+
+    deltas = neighbourhood.get_batch_inversion_deltas(tours, np.stack(search_spaces))
+    for tour, distances, tour_deltas in zip(tours, search_spaces, deltas):
+        np.testing.assert_allclose(tour_deltas, neighbourhood.get_inversion_deltas(tour, distances), atol=1e-9)
+
+
+@pytest.mark.parametrize('max_block_elements', (1, 64, neighbourhood.MAX_BLOCK_ELEMENTS))
+def test_best_moves_are_the_steepest(max_block_elements, make_search_space, tour_cost):
+    distances = make_search_space(20, seed=3).matrix
+    tour = np.random.default_rng(3).permutation(20).tolist()
+
+    move, delta = neighbourhood.get_best_inversion(tour, distances, max_block_elements=max_block_elements)
+    assert delta == pytest.approx(neighbourhood.get_inversion_deltas(tour, distances).min())
+    assert delta == pytest.approx(tour_cost(invert(tour, *move), distances) - tour_cost(tour, distances), abs=1e-9)
+
+    move, delta = neighbourhood.get_best_swap(tour, distances)
+    assert move[1] == move[0] + 1 and delta == pytest.approx(neighbourhood.get_swap_deltas(tour, distances).min())
+
+
+def test_best_moves_skip_the_inadmissible_ones(make_search_space):
+    distances = make_search_space(15, seed=4).matrix
+    tour = np.random.default_rng(4).permutation(15).tolist()
+    deltas = neighbourhood.get_inversion_deltas(tour, distances)
+
+    best, _ = neighbourhood.get_best_inversion(tour, distances)
+    move, delta = neighbourhood.get_best_inversion(tour, distances, admissible=lambda move, _: move != best)
+    assert move != best and delta == pytest.approx(np.sort(deltas, axis=None)[1])
+
+    assert neighbourhood.get_best_swap(tour, distances, admissible=lambda *_: False) == (None, None)
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from utils.neighbours import neighbours
+
+
+def get_brute_force_distances(coord):
+    """
+    Distances to the k nearest neighbours of each node, from all the distances.
+    """
+    coord = np.asarray(coord, dtype=float)
+    distances = np.sqrt(((coord[:, np.newaxis] - coord[np.newaxis]) ** 2).sum(axis=2))
+    np.fill_diagonal(distances, np.inf)
+
+    return distances
+
+
+def assert_nearest(found, distances, k):
+    nodes = len(distances)
+    k = min(k, nodes - 1)
+    assert found.shape == (nodes, max(k, 0))
+    if k < 1:
+        return
+
+    # The neighbours may differ on ties: compare their distances, which must be the k smallest ones in order
+    rows = np.arange(nodes)[:, np.newaxis]
+    assert (found != rows).all()
+    assert all(len(set(i)) == k for i in found.tolist())
+    np.testing.assert_allclose(distances[rows, found], np.sort(distances, axis=1)[:, :k], rtol=1e-12)
+
+
+@pytest.mark.parametrize('nodes', (1, 2, 3, 11, 200))
+@pytest.mark.parametrize('k', (1, 5, 10))
+def test_small_search_spaces(nodes, k):
+    coord = np.random.default_rng(nodes).uniform(0, 100, size=(nodes, 2))
+    distances = get_brute_force_distances(coord)
+
+    assert_nearest(neighbours.get_nearest_neighbours(coord.tolist(), k), distances, k)
+    assert_nearest(neighbours.get_nearest_neighbours_from_matrix(np.where(np.isinf(distances), 0, distances), k),
+                   distances, k)
+
+
+@pytest.mark.parametrize('layout', ('uniform', 'clustered', 'line', 'point', 'integer'))
+def test_grid_matches_brute_force(layout, monkeypatch):
+    # Lower the threshold of the grid so that it is used on a search space small enough for brute force
+    monkeypatch.setattr(neighbours, 'MIN_GRID_NODES', 1)
+    generator = np.random.default_rng(0)
+    nodes = 1500
+
+    if layout == 'uniform':
+        coord = generator.uniform(0, 1000, size=(nodes, 2))
+    elif layout == 'clustered':
+        # Dense clusters far away from each other, which widens the ring of cells of many nodes
+        centres = generator.uniform(0, 1e5, size=(5, 2))
+        coord = centres[generator.integers(0, 5, nodes)] + generator.normal(0, 10, size=(nodes, 2))
+    elif layout == 'line':
+        coord = np.column_stack((np.full(nodes, 5.0), generator.uniform(0, 1000, nodes)))
+    elif layout == 'point':
+        coord = np.ones((nodes, 2))
+    else:
+        # Many ties and duplicate nodes
+        coord = generator.integers(0, 30, size=(nodes, 2)).astype(float)
+
+    assert_nearest(neighbours.get_nearest_neighbours(coord.tolist(), 10), get_brute_force_distances(coord), 10)
+
+
+def test_grid_in_blocks(monkeypatch):
+    monkeypatch.setattr(neighbours, 'MIN_GRID_NODES', 1)
+    monkeypatch.setattr(neighbours, 'MAX_BLOCK_ELEMENTS', 1000)
+    coord = np.random.default_rng(1).uniform(0, 100, size=(400, 2))
+
+    assert_nearest(neighbours.get_nearest_neighbours(coord.tolist(), 7), get_brute_force_distances(coord), 7)
+
+
+def test_matrix_in_blocks(monkeypatch):
+    monkeypatch.setattr(neighbours, 'MAX_BLOCK_ELEMENTS', 100)
+    coord = np.random.default_rng(2).uniform(0, 100, size=(60, 2))
+    distances = get_brute_force_distances(coord)
+
+    assert_nearest(neighbours.get_nearest_neighbours_from_matrix(np.where(np.isinf(distances), 0, distances), 10),
+                   distances, 10)
+
+
+def test_search_space_neighbours(make_search_space):
+    search_space = make_search_space(100)
+    distances = get_brute_force_distances(search_space.coord_list)
+
+    assert_nearest(search_space.get_neighbours(8), distances, 8)
+    assert search_space.get_neighbours(8) is search_space.get_neighbours(8)
+
+    search_space.coord_list = None
+    assert_nearest(search_space.get_neighbours(6), distances, 6)
@@ -0,0 +1,129 @@
+import random
+import threading
+import numpy as np
+import pytest
+
+from genetic_algorithm import GeneticAlgorithm
+from hill_climbing import HillClimbing
+from island_model import IslandGeneticAlgorithm
+from lin_kernighan import LinKernighan
+from multi_start import MultiStartRunner
+from simulated_annealing import SimulatedAnnealing
+from tabu_search import TabuSearch
+from utils.rng import rng
+
+# Algorithms with small settings, so that each run takes a fraction of a second
+ALGORITHMS = {
+    'sa': (SimulatedAnnealing, {'stop': 50, 'alpha': 0.99}),
+    'hc': (HillClimbing, {'climb_type': 'simple'}),
+    'ts': (TabuSearch, {'stop': 20}),
+    'ga': (GeneticAlgorithm, {'stop': 10, 'population_rate': 5, 'selection': 'tournament', 'crossover': 'ox'}),
+    'lk': (LinKernighan, {'stop': 20, 'init': 'random'}),
+}
+
+
+def get_outcome(result):
+    """
+    Everything in a result but the times, which vary from run to run.
+    """
+    return (result.tour, result.cost, result.cycles, result.convergence, result.stop_reason,
+            result.metrics['counters'])
+
+
+def solve(name, search_space, seed, polish=False):
+    algorithm, kwargs = ALGORITHMS[name]
+    return algorithm(search_space, seed=seed, **kwargs).solve(polish=polish)
+
+
+@pytest.mark.parametrize('name', ALGORITHMS)
+def test_same_seed_same_result(make_search_space, name):
+    search_space = make_search_space(40)
+    first = solve(name, search_space, 11, polish=True)
+    second = solve(name, search_space, 11, polish=True)
+
+    assert get_outcome(first) == get_outcome(second)
+
+
+@pytest.mark.parametrize('name', ALGORITHMS)
+def test_different_seeds_different_results(make_search_space, name):
+    search_space = make_search_space(40)
+
+    assert get_outcome(solve(name, search_space, 11)) != get_outcome(solve(name, search_space, 12))
+
+
+@pytest.mark.parametrize('name', ALGORITHMS)
+def test_independent_streams_do_not_interfere(make_search_space, name):
+    search_space = make_search_space(40)
+    alone = get_outcome(solve(name, search_space, 11))
+
+    # Same seed, with other algorithms created and run in between, and the global random states consumed
+    algorithm, kwargs = ALGORITHMS[name]
+    seeded = algorithm(search_space, seed=11, **kwargs)
+    for other in ALGORITHMS:
+        solve(other, search_space, 11)
+    random.random()
+    np.random.random(100)
+
+    assert get_outcome(seeded.solve()) == alone
+
+
+def test_concurrent_runs_do_not_interfere(make_search_space):
+    search_space = make_search_space(40)
+    alone = {name: get_outcome(solve(name, search_space, 5)) for name in ALGORITHMS}
+
+    # All the algorithms run at once in threads, each one drawing from its own stream
+    outcomes = {}
+    threads = [threading.Thread(target=lambda i=name: outcomes.update({i: get_outcome(solve(i, search_space, 5))}))
+               for name in ALGORITHMS]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert outcomes == alone
+
+
+def test_operators_share_the_stream_of_their_algorithm(make_search_space):
+    algorithm = GeneticAlgorithm(make_search_space(20), population_rate=2, crossover='ox', seed=1)
+
+    assert algorithm.n_op.random_stream is algorithm.random_stream
+    assert algorithm.crossover_op.random_stream is algorithm.random_stream
+    assert algorithm.generator is algorithm.random_stream.generator
+
+
+def test_random_stream():
+    stream, generator = rng.RandomStream(3, buffer_size=16), rng.get_generator(3)
+
+    # Served from a buffer, the numbers are the same as the ones drawn one at a time from a generator with the same seed
+    assert [stream.random() for _ in range(40)] == [float(generator.random()) for _ in range(40)]
+    assert all(0 <= stream.randrange(7) < 7 for _ in range(100))
+    assert {stream.randint(2, 4) for _ in range(200)} == {2, 3, 4}
+
+
+def test_spawned_seeds():
+    seeds = rng.spawn_seeds(42, 8)
+
+    assert seeds == rng.spawn_seeds(42, 8)
+    assert seeds[:4] == rng.spawn_seeds(42, 4)
+    assert len(set(seeds)) == 8
+    assert rng.RandomStream(42).spawn(4) == rng.RandomStream(42).spawn(4)
+
+
+def test_island_model_same_seed_same_result(make_search_space):
+    search_space = make_search_space(20)
+    kwargs = {'stop': 5, 'population_rate': 5, 'islands': 2, 'migration_interval': 3, 'seed': 9}
+
+    first = IslandGeneticAlgorithm(search_space, **kwargs).solve()
+    second = IslandGeneticAlgorithm(search_space, **kwargs).solve()
+
+    assert (first.tour, first.cost, first.convergence) == (second.tour, second.cost, second.convergence)
+
+
+def test_multi_start_same_seed_same_results(make_search_space):
+    search_space = make_search_space(30)
+    runs = [MultiStartRunner(SimulatedAnnealing, restarts=3, workers=2, seed=4, file=search_space, stop=50).run()
+            for _ in range(2)]
+
+    assert runs[0].seeds == runs[1].seeds
+    assert [get_outcome(i) for i in runs[0].results] == [get_outcome(i) for i in runs[1].results]
+    assert len({i.cost for i in runs[0].results}) > 1
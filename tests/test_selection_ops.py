@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+from utils.rng import rng
+from utils.selection_ops import selection_ops
+
+SCHEMES = ('roulette', 'sus', 'tournament')
+
+
+def select(name, fitness, size, tournament_size=3, seed=0):
+    generator = rng.RandomStream(seed).generator
+    return selection_ops.get_selection_by_name(name)(np.asarray(fitness, dtype=float), size, tournament_size, generator)
+
+
+def get_counts(selected, population_size):
+    return np.bincount(selected, minlength=population_size)
+
+
+@pytest.mark.parametrize('name', SCHEMES)
+def test_same_stream_same_selection(name):
+    fitness = np.random.default_rng(0).uniform(0, 10, 50)
+
+    np.testing.assert_array_equal(select(name, fitness, 40, seed=3), select(name, fitness, 40, seed=3))
+    assert not np.array_equal(select(name, fitness, 40, seed=3), select(name, fitness, 40, seed=4))
+
+
+@pytest.mark.parametrize('name', SCHEMES)
+@pytest.mark.parametrize('size', (0, 1, 7, 100))
+def test_indexes_in_range(name, size):
+    selected = select(name, np.random.default_rng(0).uniform(0, 10, 20), size)
+
+    assert selected.shape == (size,)
+    assert np.issubdtype(selected.dtype, np.integer)
+    assert ((0 <= selected) & (selected < 20)).all()
+
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('size', (10, 37, 100))
+def test_sus_counts_within_one_of_expected(seed, size):
+    fitness = np.random.default_rng(seed).uniform(0, 10, 30)
+    counts = get_counts(select('sus', fitness, size, seed=seed), 30)
+    expected = fitness / fitness.sum() * size
+
+    # Equally spaced pointers: each chromosome is selected either floor or ceil of its expected number of times
+    assert counts.sum() == size
+    assert (counts >= np.floor(expected - 1e-9)).all() and (counts <= np.ceil(expected + 1e-9)).all()
+
+
+def test_sus_draws_a_single_random_number():
+    stream = rng.RandomStream(5)
+    selection_ops.stochastic_universal_sampling(np.ones(10), 1000, generator=stream.generator)
+
+    expected = rng.RandomStream(5).generator
+    expected.random()
+    assert stream.generator.random() == expected.random()
+
+
+def test_roulette_proportions():
+    fitness = np.array([1.0, 2.0, 3.0, 4.0])
+    counts = get_counts(select('roulette', fitness, 100000), 4)
+
+    np.testing.assert_allclose(counts / 100000, fitness / fitness.sum(), atol=0.01)
+
+
+@pytest.mark.parametrize('tournament_size', (1, 2, 3, 5))
+def test_tournament_proportions(tournament_size):
+    # Distinct fitness scores: the chromosome of rank r (0 the worst) wins when all contestants are of rank r or lower
+    # and not all of them are lower, i.e. with probability ((r + 1)^k - r^k) / P^k
+    population_size = 5
+    fitness = np.random.default_rng(1).permutation(population_size).astype(float)
+    counts = get_counts(select('tournament', fitness, 100000, tournament_size), population_size)
+
+    ranks = np.argsort(np.argsort(fitness))
+    expected = ((ranks + 1) ** tournament_size - ranks ** tournament_size) / population_size ** tournament_size
+    np.testing.assert_allclose(counts / 100000, expected, atol=0.01)
+
+
+def test_tournament_winners_are_the_fittest_contestants():
+    fitness = np.random.default_rng(2).uniform(0, 10, 30)
+    selected = select('tournament', fitness, 50, 4, seed=7)
+
+    contestants = rng.RandomStream(7).generator.integers(0, 30, size=(50, 4))
+    np.testing.assert_array_equal(fitness[selected], fitness[contestants].max(axis=1))
+
+
+@pytest.mark.parametrize('fitness', (np.full(8, 2.5), np.zeros(8)), ids=('equal', 'zero'))
+def test_equal_or_zero_fitness(fitness):
+    # Every chromosome gets the same chance: SUS selects each one exactly the same number of times
+    assert (get_counts(select('sus', fitness, 80), 8) == 10).all()
+
+    for name in ('roulette', 'tournament'):
+        counts = get_counts(select(name, fitness, 80000), 8)
+        np.testing.assert_allclose(counts / 80000, 1 / 8, atol=0.01)
+
+
+@pytest.mark.parametrize('name', ('roulette', 'sus'))
+def test_zero_fitness_never_selected(name):
+    # As in the GA, where the fitness of the worst chromosome is 0 (see GeneticAlgorithm.fitness_function())
+    fitness = np.array([0.0, 3.0, 0.0, 1.0, 0.0, 0.0])
+    counts = get_counts(select(name, fitness, 10000), 6)
+
+    assert (counts[fitness == 0] == 0).all()
+    if name == 'sus':
+        assert counts.tolist() == [0, 7500, 0, 2500, 0, 0]
+
+
+def test_tournament_never_selects_the_worst_of_distinct_scores():
+    fitness = np.arange(10, dtype=float)
+    counts = get_counts(select('tournament', fitness, 10000, 2), 10)
+
+    # The worst chromosome only wins a tournament against itself: about P^-k of the selections
+    assert counts[0] < 10000 / 100 * 1.5
+    assert counts[9] == counts.max()
+
+
+def test_unknown_scheme_is_roulette():
+    assert selection_ops.get_selection_by_name('unknown') is selection_ops.roulette_wheel
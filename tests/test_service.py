@@ -0,0 +1,189 @@
+import asyncio
+import json
+import os
+import time
+import pytest
+
+import service
+
+VALID_JOB = {'id': 1, 'algorithm': 'sa', 'coordinates': [[0, 0], [1, 0], [1, 1], [0, 1]], 'seed': 7,
+             'args': {'operator': 'two_opt'}, 'time_limit': 5}
+
+MALFORMED_JOBS = [
+    ['not', 'an', 'object'],
+    {**VALID_JOB, 'id': [1]},
+    {**VALID_JOB, 'id': {'a': 1}},
+    {**VALID_JOB, 'id': 1.5},
+    {**VALID_JOB, 'id': True},
+    {**VALID_JOB, 'algorithm': 'unknown'},
+    {key: value for key, value in VALID_JOB.items() if key != 'algorithm'},
+    {key: value for key, value in VALID_JOB.items() if key != 'coordinates'},
+    {**VALID_JOB, 'file': 'TSP_50_nodes.csv'},
+    {**VALID_JOB, 'coordinates': 'abc'},
+    {**{key: value for key, value in VALID_JOB.items() if key != 'coordinates'}, 'file': 5},
+    {**{key: value for key, value in VALID_JOB.items() if key != 'coordinates'}, 'distances': {'a': 1}},
+    {**VALID_JOB, 'distance': 'sparse'},
+    {**VALID_JOB, 'args': [1, 2]},
+    {**VALID_JOB, 'args': {'seed': 3}},
+    {**VALID_JOB, 'seed': '7'},
+    {**VALID_JOB, 'seed': 7.0},
+    {**VALID_JOB, 'time_limit': 0},
+    {**VALID_JOB, 'time_limit': 'soon'},
+    {**VALID_JOB, 'max_evaluations': -1},
+    {**VALID_JOB, 'max_evaluations': False},
+]
+
+
+class FakeWriter:
+    """
+    Writer of a connection that keeps the messages sent to the client.
+    """
+    def __init__(self):
+        self.messages = []
+        self.closed = False
+
+    def write(self, data):
+        self.messages.extend(json.loads(line) for line in data.decode().splitlines())
+
+    async def drain(self):
+        pass
+
+    def is_closing(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+
+def communicate(*lines):
+    """
+    Send the given lines to a service (without workers) as one client, until the client disconnects.
+
+    :returns: tuple (messages received by the client, jobs queued)
+    """
+    async def run():
+        solver_service = service.SolverService(workers=1)
+        solver_service.queue = asyncio.Queue()
+
+        reader = asyncio.StreamReader()
+        for line in lines:
+            reader.feed_data((line if isinstance(line, str) else json.dumps(line)).encode() + b'\n')
+        reader.feed_eof()
+
+        writer = FakeWriter()
+        await solver_service.handle_client(reader, writer)
+        assert writer.closed
+
+        queued = []
+        while not solver_service.queue.empty():
+            queued.append(solver_service.queue.get_nowait())
+
+        return writer.messages, queued
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('job', [VALID_JOB, {key: value for key, value in VALID_JOB.items() if key != 'id'},
+                                 {**VALID_JOB, 'id': 'a', 'seed': None, 'max_evaluations': 1000, 'distance': 'oracle'},
+                                 {'algorithm': 'ga', 'distances': [[0, 1], [1, 0]]}])
+def test_valid_jobs(job):
+    service.check_job(job)
+
+
+@pytest.mark.parametrize('job', MALFORMED_JOBS)
+def test_malformed_jobs(job):
+    with pytest.raises(service.JobError):
+        service.check_job(job)
+
+
+@pytest.mark.parametrize('job_id, valid', [(1, True), ('a', True), (0, True), (True, False), (1.0, False),
+                                           (None, False), ([1], False), ({'a': 1}, False)])
+def test_job_ids(job_id, valid):
+    assert service.is_job_id(job_id) is valid
+
+
+def test_malformed_jobs_are_reported_one_by_one():
+    messages, queued = communicate({'type': 'solve', 'jobs': MALFORMED_JOBS + [VALID_JOB]})
+
+    # An error per malformed job (with its id if it can be used), and the connection is still served afterwards
+    assert [message['type'] for message in messages] == ['error'] * len(MALFORMED_JOBS) + ['queued']
+    assert all(message['error'] for message in messages[:-1])
+    assert messages[0]['id'] is None and messages[5]['id'] == 1
+    assert messages[-1] == {'type': 'queued', 'id': 1}
+    assert [job.spec for job in queued] == [VALID_JOB]
+
+
+def test_malformed_messages_keep_the_connection():
+    messages, queued = communicate('{not json', '[1, 2]', {'type': 'unknown'}, {'type': 'solve', 'jobs': 'abc'},
+                                   {'type': 'cancel', 'id': [1]}, {'type': 'cancel', 'id': 99},
+                                   {'type': 'solve', 'jobs': [VALID_JOB, VALID_JOB]},
+                                   {'type': 'solve', 'jobs': [{**VALID_JOB, 'id': 2}]})
+
+    assert [message['type'] for message in messages] == ['error'] * 4 + ['queued', 'error', 'queued']
+    assert messages[0]['error'].startswith('Invalid JSON')
+    assert messages[5] == {'type': 'error', 'id': 1, 'error': 'There is already a job with id 1'}
+    assert [job.id for job in queued] == [1, 2]
+
+    # The jobs of the client are cancelled once it disconnects
+    assert all(job.cancelled for job in queued)
+
+
+def test_cancel_sets_the_flag_of_the_slot_of_the_job():
+    solver_service = service.SolverService(workers=3)
+    solver_service.cancelled = [False] * 3
+    running = service.Job(key=5, id=1, spec=VALID_JOB, client=None, slot=1)
+    queued = service.Job(key=6, id=2, spec=VALID_JOB, client=None)
+    solver_service.jobs[running.key] = running
+
+    # A job not started yet is only marked as cancelled, so that it is skipped
+    solver_service.cancel(queued)
+    assert queued.cancelled and solver_service.cancelled == [False] * 3
+
+    solver_service.cancel(running)
+    assert running.cancelled and solver_service.cancelled == [False, True, False]
+
+
+def test_cancel_running_job(tmp_path):
+    path = str(tmp_path / 'service.sock')
+    coordinates = [[float(i % 17), float(i * 7 % 23)] for i in range(200)]
+    long_job = {'id': 'long', 'algorithm': 'sa', 'coordinates': coordinates, 'seed': 1,
+                'args': {'cooling_schedule': 'budget'}, 'time_limit': 30}
+    next_job = {**long_job, 'id': 'next', 'time_limit': 0.3, 'progress': False}
+
+    async def receive(reader, message_type):
+        while (message := json.loads(await reader.readline()))['type'] != message_type:
+            pass
+        return message
+
+    async def run():
+        solver_service = service.SolverService(workers=1, interval=0.05)
+        serving = asyncio.create_task(solver_service.serve(path=path))
+        while not os.path.exists(path):
+            await asyncio.sleep(0.05)
+
+        reader, writer = await asyncio.open_unix_connection(path, limit=service.MAX_MESSAGE_SIZE)
+        try:
+            writer.write(service.encode({'type': 'solve', 'jobs': [long_job]}))
+            await asyncio.wait_for(receive(reader, 'progress'), 30)
+
+            start = time.perf_counter()
+            writer.write(service.encode({'type': 'cancel', 'id': 'long'}))
+            cancelled = await asyncio.wait_for(receive(reader, 'result'), 5)
+            elapsed = time.perf_counter() - start
+
+            # The next job of the same worker (and slot) is not cancelled by the flag of the previous one
+            writer.write(service.encode({'type': 'solve', 'jobs': [next_job]}))
+            finished = await asyncio.wait_for(receive(reader, 'result'), 30)
+        finally:
+            writer.close()
+            solver_service.stop()
+            await serving
+
+        return cancelled, elapsed, finished
+
+    cancelled, elapsed, finished = asyncio.run(run())
+
+    assert (cancelled['id'], cancelled['stop_reason']) == ('long', 'cancelled')
+    assert elapsed < 1
+    assert sorted(cancelled['tour']) == list(range(200))
+    assert (finished['id'], finished['stop_reason']) == ('next', 'time_limit')
@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+
+from tabu_search import TabuSearch
+from utils.neighbourhood import neighbourhood
+from utils.tabu_memory import tabu_memory
+
+
+def step(memory, iterations):
+    for _ in range(iterations):
+        memory.step()
+
+
+@pytest.mark.parametrize('tenure', (1, 2, 7))
+def test_tenure_expiry(tenure):
+    memory = tabu_memory.TabuMemory(tenure)
+    memory.step()
+    memory.add(3, 5)
+
+    # Tabu during the next tenure - 1 iterations, and no longer after tenure iterations
+    for _ in range(tenure - 1):
+        memory.step()
+        assert memory.is_tabu(3, 5)
+    assert len(memory) == 1
+
+    memory.step()
+    assert not memory.is_tabu(3, 5)
+    assert len(memory) == 0
+
+
+def test_zero_tenure():
+    memory = tabu_memory.TabuMemory(0)
+    memory.add(3, 5)
+
+    assert not memory.is_tabu(3, 5)
+
+
+def test_pairs_regardless_of_order():
+    memory = tabu_memory.TabuMemory(5)
+    memory.add(5, 3)
+
+    assert memory.is_tabu(3, 5) and memory.is_tabu(5, 3)
+    assert not memory.is_tabu(3, 4)
+
+
+def test_adding_again_renews_the_tenure():
+    memory = tabu_memory.TabuMemory(3)
+    memory.add(1, 2)
+    step(memory, 2)
+    memory.add(2, 1)
+    step(memory, 2)
+
+    assert memory.is_tabu(1, 2)
+    step(memory, 1)
+    assert not memory.is_tabu(1, 2)
+
+
+def test_expired_pairs_are_purged():
+    memory = tabu_memory.TabuMemory(4)
+    for i in range(100):
+        memory.step()
+        memory.add(i, i + 1)
+
+        # Only the last tenure pairs are tabu, and the memory does not grow with the number of moves
+        assert memory.is_tabu(max(i - 3, 0), max(i - 3, 0) + 1)
+        assert not memory.is_tabu(i - 4, i - 3)
+        assert len(memory) == min(i + 1, 4)
+        assert len(memory.expiry) <= 2 * 4 + 1
+
+    assert memory.moves == 100
+
+
+def test_frequent_pairs():
+    memory = tabu_memory.TabuMemory(2)
+    for node in range(10):
+        memory.add(node, node + 1)
+    for _ in range(10):
+        memory.add(0, 1)
+
+    # (0, 1): 11 of 20 moves made over 10 pairs, more than FREQUENCY_FACTOR times the average of 2
+    assert memory.is_frequent(1, 0)
+    assert not memory.is_frequent(4, 5)
+    assert not memory.is_frequent(20, 21)
+
+
+def get_tabu_search(make_search_space, neighbourhood_name):
+    algorithm = TabuSearch(make_search_space(20), neighbourhood=neighbourhood_name, seed=1)
+    tour = np.random.default_rng(1).permutation(20).tolist()
+    cost = algorithm.evaluate_solution(tour)
+
+    best_move, best_delta = (neighbourhood.get_best_inversion if neighbourhood_name == 'two_opt'
+                             else neighbourhood.get_best_swap)(tour, algorithm.matrix.matrix)
+    assert best_delta < 0
+
+    # The best move of the neighbourhood is made tabu
+    algorithm.tabu_memory.add(tour[best_move[0]], tour[best_move[1]])
+
+    return algorithm, tour, cost, best_move, best_delta
+
+
+@pytest.mark.parametrize('neighbourhood_name', ('swap', 'two_opt'))
+def test_tabu_move_not_admissible(make_search_space, neighbourhood_name):
+    algorithm, tour, cost, best_move, best_delta = get_tabu_search(make_search_space, neighbourhood_name)
+
+    # It does not improve the best solution found so far (the tour itself)
+    move, delta = algorithm.get_best_move(tour, cost, cost + best_delta)
+
+    assert move != best_move
+    assert delta >= best_delta
+    assert not algorithm.tabu_memory.is_tabu(tour[move[0]], tour[move[1]])
+
+
+@pytest.mark.parametrize('neighbourhood_name', ('swap', 'two_opt'))
+def test_aspiration(make_search_space, neighbourhood_name):
+    algorithm, tour, cost, best_move, best_delta = get_tabu_search(make_search_space, neighbourhood_name)
+
+    # It improves the best solution found so far: tabu, but admissible
+    move, delta = algorithm.get_best_move(tour, cost, cost)
+
+    assert (move, delta) == (best_move, best_delta)
+
+
+@pytest.mark.parametrize('neighbourhood_name', ('swap', 'two_opt'))
+def test_diversification_avoids_frequent_moves(make_search_space, neighbourhood_name):
+    algorithm, tour, cost, best_move, best_delta = get_tabu_search(make_search_space, neighbourhood_name)
+    memory = algorithm.tabu_memory
+    for node in range(20):
+        memory.add(node, (node + 1) % 20)
+    for _ in range(20):
+        memory.add(tour[best_move[0]], tour[best_move[1]])
+    step(memory, algorithm.tabu_tenure)
+
+    # No longer tabu but frequent: only avoided when diversifying, and unless it improves the best solution
+    assert not memory.is_tabu(tour[best_move[0]], tour[best_move[1]])
+    assert algorithm.get_best_move(tour, cost, cost + best_delta)[0] == best_move
+    assert algorithm.get_best_move(tour, cost, cost + best_delta, diversify=True)[0] != best_move
+    assert algorithm.get_best_move(tour, cost, cost, diversify=True)[0] == best_move
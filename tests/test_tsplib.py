@@ -0,0 +1,144 @@
+import math
+import numpy as np
+import pytest
+
+from utils.matrix import matrix
+from utils.tsplib import tsplib
+
+# Coordinates of burma14 (GEO) and its optimal tour, from TSPLIB
+BURMA14 = [(16.47, 96.10), (16.47, 94.44), (20.09, 92.54), (22.39, 93.37), (25.23, 97.24), (22.00, 96.05),
+           (20.47, 97.02), (17.20, 96.29), (16.30, 97.38), (14.05, 98.12), (16.53, 97.38), (21.52, 95.59),
+           (19.41, 97.13), (20.09, 94.55)]
+BURMA14_TOUR = [1, 2, 14, 3, 4, 5, 6, 12, 7, 13, 8, 11, 9, 10]
+
+
+# Distance functions as written in the TSPLIB documentation (one pair of nodes at a time)
+def nint(value):
+    return int(value + 0.5)
+
+
+def euc_2d(node_a, node_b):
+    return nint(math.hypot(node_a[0] - node_b[0], node_a[1] - node_b[1]))
+
+
+def ceil_2d(node_a, node_b):
+    return math.ceil(math.hypot(node_a[0] - node_b[0], node_a[1] - node_b[1]))
+
+
+def att(node_a, node_b):
+    distance = math.sqrt(((node_a[0] - node_b[0]) ** 2 + (node_a[1] - node_b[1]) ** 2) / 10.0)
+    rounded = nint(distance)
+    return rounded + 1 if rounded < distance else rounded
+
+
+def geo(node_a, node_b):
+    def to_radians(value):
+        degrees = int(value)
+        return tsplib.PI * (degrees + 5.0 * (value - degrees) / 3.0) / 180.0
+
+    latitude_a, longitude_a = to_radians(node_a[0]), to_radians(node_a[1])
+    latitude_b, longitude_b = to_radians(node_b[0]), to_radians(node_b[1])
+    q1 = math.cos(longitude_a - longitude_b)
+    q2 = math.cos(latitude_a - latitude_b)
+    q3 = math.cos(latitude_a + latitude_b)
+
+    return int(tsplib.EARTH_RADIUS * math.acos(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3)) + 1.0)
+
+
+FUNCTIONS = {'EUC_2D': euc_2d, 'CEIL_2D': ceil_2d, 'ATT': att, 'GEO': geo}
+
+
+def write_instance(path, name, coord, edge_weight_type):
+    lines = [f'NAME: {name}', 'TYPE: TSP', f'DIMENSION: {len(coord)}', f'EDGE_WEIGHT_TYPE : {edge_weight_type}',
+             'NODE_COORD_SECTION']
+    lines += [f'{i} {x} {y}' for i, (x, y) in enumerate(coord, 1)]
+    path.write_text('\n'.join(lines + ['EOF', '']), encoding='utf-8')
+
+    return path
+
+
+def get_coordinates(edge_weight_type, nodes=40, seed=0):
+    generator = np.random.default_rng(seed)
+    if edge_weight_type == 'GEO':
+        # DDD.MM coordinates: degrees and minutes (below 60)
+        degrees = generator.integers(-80, 80, size=(nodes, 2))
+        return (degrees + np.sign(degrees) * generator.integers(0, 60, size=(nodes, 2)) / 100).round(2).tolist()
+
+    return generator.uniform(0, 5000, size=(nodes, 2)).round(3).tolist()
+
+
+@pytest.mark.parametrize('edge_weight_type', FUNCTIONS)
+def test_distance_formulas(edge_weight_type, tmp_path):
+    coord = get_coordinates(edge_weight_type)
+    instance = tsplib.load_instance(write_instance(tmp_path / 'random.tsp', 'random', coord, edge_weight_type))
+    function = FUNCTIONS[edge_weight_type]
+
+    assert instance.dimension == len(coord) and instance.edge_weight_type == edge_weight_type
+    np.testing.assert_allclose(instance.coord_list, coord)
+    expected = [[0 if i == j else function(coord[i], coord[j]) for j in range(len(coord))] for i in range(len(coord))]
+    np.testing.assert_array_equal(instance.matrix, expected)
+
+
+@pytest.mark.parametrize('edge_weight_type', ('EUC_2D', 'ATT'))
+def test_rounding_of_integer_distances(edge_weight_type, tmp_path):
+    # 3-4-5 triangles: the distances are integers, which are not rounded up
+    scale = 10 ** 0.5 if edge_weight_type == 'ATT' else 1
+    coord = [(0, 0), (3 * scale, 4 * scale), (0, 0.5), (0, 0.49)]
+    instance = tsplib.load_instance(write_instance(tmp_path / 'integer.tsp', 'integer', coord, edge_weight_type))
+
+    assert instance.matrix[0, 1] == 5
+    if edge_weight_type == 'EUC_2D':
+        assert instance.matrix[0, 2] == 1 and instance.matrix[0, 3] == 0
+
+
+def test_burma14(tmp_path):
+    path = write_instance(tmp_path / 'burma14.tsp', 'burma14', BURMA14, 'GEO')
+    instance = tsplib.load_instance(path)
+
+    tour = [i - 1 for i in BURMA14_TOUR]
+    assert instance.optimum == 3323
+    assert sum(instance.matrix[tour[i - 1], tour[i]] for i in range(len(tour))) == instance.optimum
+
+    # Loaded by Matrix, the distances are the integer ones of TSPLIB
+    search_space = matrix.Matrix(str(path))
+    np.testing.assert_array_equal(search_space.matrix, instance.matrix)
+    assert search_space.coord_list == instance.coord_list
+
+
+@pytest.mark.parametrize('edge_weight_format', tuple(tsplib.EDGE_WEIGHT_FORMATS))
+def test_explicit_formats(edge_weight_format, tmp_path):
+    dimension = 7
+    generator = np.random.default_rng(1)
+    full = generator.integers(1, 1000, size=(dimension, dimension))
+    full = np.triu(full, 1) + np.triu(full, 1).T
+
+    rows, cols = {'FULL_MATRIX': np.indices((dimension, dimension)).reshape(2, -1),
+                  'UPPER_ROW': np.triu_indices(dimension, 1),
+                  'UPPER_DIAG_ROW': np.triu_indices(dimension),
+                  'LOWER_ROW': np.tril_indices(dimension, -1),
+                  'LOWER_DIAG_ROW': np.tril_indices(dimension)}[edge_weight_format]
+    weights = full[rows, cols].tolist()
+
+    # Any number of weights per line
+    lines = ['NAME: explicit', 'TYPE: TSP', f'DIMENSION: {dimension}', 'EDGE_WEIGHT_TYPE: EXPLICIT',
+             f'EDGE_WEIGHT_FORMAT: {edge_weight_format}', 'EDGE_WEIGHT_SECTION']
+    lines += [' '.join(str(i) for i in weights[start:start + 5]) for start in range(0, len(weights), 5)]
+    (tmp_path / 'explicit.tsp').write_text('\n'.join(lines + ['EOF', '']), encoding='utf-8')
+
+    instance = tsplib.load_instance(tmp_path / 'explicit.tsp')
+    np.testing.assert_array_equal(instance.matrix, full)
+    assert instance.coord_list is None
+
+
+def test_unsupported_edge_weight_type(tmp_path):
+    with pytest.raises(ValueError):
+        tsplib.load_instance(write_instance(tmp_path / 'man.tsp', 'man', [(0, 0), (1, 1)], 'MAN_2D'))
+
+
+def test_load_tour(tmp_path):
+    path = tmp_path / 'burma14.opt.tour'
+    path.write_text('\n'.join(['NAME : burma14.opt.tour', 'TYPE : TOUR', 'DIMENSION : 14', 'TOUR_SECTION'] +
+                              [' '.join(str(i) for i in BURMA14_TOUR[:7]), *map(str, BURMA14_TOUR[7:]), '-1', 'EOF']),
+                    encoding='utf-8')
+
+    assert tsplib.load_tour(path) == [i - 1 for i in BURMA14_TOUR]